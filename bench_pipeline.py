@@ -0,0 +1,214 @@
+"""
+文字起こしパイプライン全体のベンチマーク。
+
+    uv run bench_pipeline.py --models tiny base small                   # 計測して表示
+    uv run bench_pipeline.py --durations 60 300 --speakers 3            # 合成音声の長さと話者数を変える
+    uv run bench_pipeline.py --audio meeting.mp3 --hf-token hf_xxx      # 実際の音声も含める（話者分離あり）
+    uv run bench_pipeline.py --save pipeline_baseline.json              # 基準値として保存
+    uv run bench_pipeline.py --baseline pipeline_baseline.json          # 基準値より悪化していれば終了コード1
+
+音声ごとに Transcriber（文字起こし → 話者割当 → 整形）と SimpleSummarizer を実行し、次の項目を記録する。
+- RTF（実時間比）: 処理全体にかかった時間 / 音声の長さ（小さいほど速い）
+- スループット: 1秒あたりに処理できた音声の秒数
+- ピークRSS: プロセスの最大メモリ使用量
+- 段階ごとの経過時間（モデル読込・デコード・Whisper・話者分離・要約など）
+
+合成音声は create_dummy_audio.py で作るため、同じ長さ・話者数・シードなら毎回同じ入力になる。
+モデルごとに別プロセスで実行するため、ピークRSSは他のモデルの影響を受けない。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_inputs(durations, speakers, seed, audio_paths):
+    """
+    ベンチマークに使う入力の一覧を返す。合成音声は {"synthetic": ...}、実際の音声は {"path": ...} で表す。
+    """
+    inputs = [{"name": f"synthetic-{duration:g}s-{speakers}spk", "synthetic": {
+        "duration": duration, "speakers": speakers, "seed": seed}} for duration in durations]
+    inputs += [{"name": os.path.basename(path), "path": os.path.abspath(path)} for path in audio_paths]
+    return inputs
+
+
+def load_input(item):
+    from src.audio import SAMPLE_RATE, DecodedAudio
+
+    if "synthetic" in item:
+        from create_dummy_audio import generate_conversation
+
+        spec = item["synthetic"]
+        samples, _ = generate_conversation(spec["duration"], spec["speakers"], SAMPLE_RATE, spec["seed"])
+        return DecodedAudio.from_samples(samples, item["name"] + ".wav")
+    return item["path"]
+
+
+def run_worker(model_name, inputs, hf_token):
+    """
+    1つのモデルで全ての入力を処理し、結果をJSONで標準出力に書く（子プロセスで実行される）。
+    """
+    from src.stage_timer import StageTimer, peak_rss
+    from src.summarizer import SimpleSummarizer
+    from src.transcriber import Transcriber
+
+    # 2回目以降がキャッシュで速くならないよう、キャッシュは使いません
+    transcriber = Transcriber(cache=None)
+    summarizer = SimpleSummarizer()
+
+    files = []
+    for item in inputs:
+        timer = StageTimer()
+        start = time.perf_counter()
+        try:
+            audio = load_input(item)
+            result = transcriber.transcribe(audio, model_name, hf_token=hf_token, timer=timer)
+            with timer.stage("simple_summary"):
+                summarizer.summarize(result["text"])
+        except Exception as e:
+            files.append({"name": item["name"], "error": f"{type(e).__name__}: {e}"})
+            continue
+        elapsed = time.perf_counter() - start
+
+        audio_seconds = result["timing"].get("audio_seconds")
+        timing = timer.to_dict(audio_seconds)
+        stages = {}
+        for stage in timing["stages"]:
+            stages[stage["stage"]] = stages.get(stage["stage"], 0.0) + stage["wall_seconds"]
+        files.append({
+            "name": item["name"],
+            "audio_seconds": audio_seconds,
+            "wall_seconds": elapsed,
+            "rtf": elapsed / audio_seconds if audio_seconds else None,
+            "throughput": audio_seconds / elapsed if audio_seconds and elapsed else None,
+            "peak_rss_mb": timing["peak_rss_mb"],
+            "stages": stages,
+            "segments": len(result.get("segments", [])),
+        })
+
+    peak = peak_rss()
+    result = {"model": model_name, "files": files, "peak_rss_mb": peak / 1024 ** 2 if peak is not None else None}
+    print("RESULT " + json.dumps(result, ensure_ascii=False), flush=True)
+
+
+def benchmark(model_name, inputs, hf_token):
+    command = [sys.executable, os.path.abspath(__file__), "--worker", model_name,
+               "--inputs", json.dumps(inputs, ensure_ascii=False)]
+    env = dict(os.environ)
+    if hf_token:
+        # トークンがコマンドラインに残らないよう環境変数で渡します
+        env["MOJIOKOSHI_BENCH_HF_TOKEN"] = hf_token
+    proc = subprocess.run(command, capture_output=True, text=True, cwd=ROOT, env=env)
+    marker = [line for line in proc.stdout.splitlines() if line.startswith("RESULT ")]
+    if proc.returncode != 0 or not marker:
+        reason = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no result"
+        return {"model": model_name, "error": reason}
+    return json.loads(marker[0][len("RESULT "):])
+
+
+def run_benchmark(models, inputs, hf_token):
+    return {
+        "python": sys.version.split()[0],
+        "inputs": inputs,
+        "models": [benchmark(model_name, inputs, hf_token) for model_name in models],
+    }
+
+
+def flatten_metrics(results):
+    """
+    比較対象の数値だけを {名前: 値} の形で取り出す。どの項目も値が大きいほど悪い。
+    """
+    metrics = {}
+    for model in results["models"]:
+        if "error" in model:
+            continue
+        if model.get("peak_rss_mb") is not None:
+            metrics[f"{model['model']}.peak_rss_mb"] = model["peak_rss_mb"]
+        for item in model["files"]:
+            if item.get("rtf") is not None:
+                metrics[f"{model['model']}.{item['name']}.rtf"] = item["rtf"]
+    return metrics
+
+
+def compare(results, baseline, tolerance):
+    """
+    基準値より tolerance の割合以上悪化した項目と、基準値では成功していたのに失敗した実行を検出する。
+    """
+    regressions = []
+    current = flatten_metrics(results)
+    for name, base_value in flatten_metrics(baseline).items():
+        value = current.get(name)
+        if value is None:
+            regressions.append(f"{name}: missing (was {base_value:.3f})")
+        elif base_value > 0 and value > base_value * (1 + tolerance):
+            regressions.append(f"{name}: {base_value:.3f} -> {value:.3f}")
+    return regressions
+
+
+def print_results(results):
+    print(f"{'model':<14}{'input':<28}{'RTF':>8}{'x realtime':>12}{'peak RSS':>10}  slowest stages")
+    for model in results["models"]:
+        if "error" in model:
+            print(f"{model['model']:<14}skipped ({model['error']})")
+            continue
+        for item in model["files"]:
+            if "error" in item:
+                print(f"{model['model']:<14}{item['name']:<28}failed ({item['error']})")
+                continue
+            rss = f"{item['peak_rss_mb']:.0f}MB" if item["peak_rss_mb"] is not None else "-"
+            slowest = sorted(item["stages"].items(), key=lambda s: s[1], reverse=True)[:3]
+            stages = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in slowest)
+            print(f"{model['model']:<14}{item['name']:<28}{item['rtf']:>8.3f}{item['throughput']:>11.1f}x"
+                  f"{rss:>10}  {stages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MojiOkoshi パイプラインベンチマーク")
+    parser.add_argument("--models", nargs="+", default=["tiny", "base", "small"], help="計測するWhisperモデル名")
+    parser.add_argument("--durations", nargs="*", type=float, default=[60.0], help="合成音声の長さ（秒）")
+    parser.add_argument("--speakers", type=int, default=2, help="合成音声の話者数")
+    parser.add_argument("--seed", type=int, default=0, help="合成音声の乱数シード")
+    parser.add_argument("--audio", nargs="*", default=[], help="一緒に計測する実際の音声ファイル")
+    parser.add_argument("--hf-token", default=None, help="話者分離も計測する場合のHugging Faceトークン")
+    parser.add_argument("--save", help="結果をJSONに保存する")
+    parser.add_argument("--baseline", help="比較する基準値のJSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="許容する悪化率（0.2 = 20%%）")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--inputs", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, json.loads(args.inputs), os.environ.get("MOJIOKOSHI_BENCH_HF_TOKEN"))
+        return
+
+    inputs = build_inputs(args.durations, args.speakers, args.seed, args.audio)
+    if not inputs:
+        print("Nothing to benchmark: specify --durations and/or --audio")
+        sys.exit(1)
+
+    results = run_benchmark(args.models, inputs, args.hf_token)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+        print(f"Saved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Pipeline regressions detected:")
+            for item in regressions:
+                print(f"  - {item}")
+            sys.exit(1)
+        print("No pipeline regressions.")
+
+
+if __name__ == "__main__":
+    main()
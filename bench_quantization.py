@@ -0,0 +1,187 @@
+"""
+int8 動的量子化モデルと float32 モデルの比較ベンチマーク。
+
+    uv run bench_quantization.py --test-set bench_data --model small
+    uv run bench_quantization.py --test-set bench_data --model small --save quantization.json
+
+テストセットは音声ファイルと、同じ名前の正解テキスト（例: meeting.wav と meeting.txt）を置いたフォルダ。
+モデルごとに別プロセスで文字起こしし、次の項目を比較する。
+- RTF（実時間比）: 文字起こしにかかった時間 / 音声の長さ（小さいほど速い）
+- ピークRSS: プロセスの最大メモリ使用量
+- WER: 単語誤り率（日本語など空白で区切らない言語では文字誤り率）
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 日本語・中国語の文字を含むテキストは文字単位で比較します
+CJK_PATTERN = re.compile(r"[぀-ヿ㐀-鿿]")
+PUNCTUATION_PATTERN = re.compile(r"[\s、。，．,.!?！？「」『』()（）\"'・…-]+")
+
+
+def tokenize(text):
+    if CJK_PATTERN.search(text):
+        return list(PUNCTUATION_PATTERN.sub("", text))
+    return [word for word in PUNCTUATION_PATTERN.split(text.lower()) if word]
+
+
+def edit_distance(reference, hypothesis):
+    """
+    トークン列同士の編集距離（置換・挿入・削除の回数）を返す。
+    """
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_token in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_token in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_token != hyp_token),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def find_test_set(directory):
+    """
+    正解テキストのある音声ファイルの (音声パス, 正解テキスト) のリストを返す。
+    """
+    from src.audio import SUPPORTED_EXTENSIONS
+
+    items = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        reference_path = os.path.join(directory, stem + ".txt")
+        if ext.lower() in SUPPORTED_EXTENSIONS and os.path.exists(reference_path):
+            with open(reference_path, "r", encoding="utf-8") as f:
+                items.append((os.path.join(directory, name), f.read()))
+    return items
+
+
+def run_worker(model_name, test_set, threads):
+    """
+    1つのモデルでテストセットを文字起こしし、結果をJSONで標準出力に書く（子プロセスで実行される）。
+    """
+    import torch
+    from src.audio import DecodedAudio
+    from src.stage_timer import peak_rss
+    from src.transcriber import Transcriber
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    transcriber = Transcriber()
+    start = time.perf_counter()
+    transcriber.load_model(model_name)
+    load_seconds = time.perf_counter() - start
+
+    files = []
+    for path, reference in find_test_set(test_set):
+        audio = DecodedAudio(path)
+        duration = len(audio.samples) / 16000
+        start = time.perf_counter()
+        # セグメントのテキストは前後の空白を除いてあるので、単語がつながらないよう空白で区切ります（日本語では比較時に除かれます）
+        hypothesis = " ".join(event.text for event in transcriber.iter_segments(audio, model_name))
+        elapsed = time.perf_counter() - start
+
+        ref_tokens = tokenize(reference)
+        files.append({
+            "file": os.path.basename(path),
+            "duration": duration,
+            "elapsed": elapsed,
+            "errors": edit_distance(ref_tokens, tokenize(hypothesis)),
+            "reference_tokens": len(ref_tokens),
+            "hypothesis": hypothesis,
+        })
+
+    peak = peak_rss()
+    result = {"model": model_name, "load_seconds": load_seconds, "files": files,
+              "peak_rss_mb": peak / 1024 ** 2 if peak is not None else None}
+    print("RESULT " + json.dumps(result, ensure_ascii=False), flush=True)
+
+
+def summarize(result):
+    files = result["files"]
+    duration = sum(f["duration"] for f in files)
+    reference_tokens = sum(f["reference_tokens"] for f in files)
+    return {
+        "model": result["model"],
+        "load_seconds": result["load_seconds"],
+        "audio_seconds": duration,
+        "rtf": sum(f["elapsed"] for f in files) / duration if duration else None,
+        "peak_rss_mb": result["peak_rss_mb"],
+        "wer": sum(f["errors"] for f in files) / reference_tokens if reference_tokens else None,
+        "files": files,
+    }
+
+
+def benchmark(model_name, test_set, threads):
+    command = [sys.executable, os.path.abspath(__file__), "--worker", model_name, "--test-set", test_set]
+    if threads:
+        command += ["--threads", str(threads)]
+    proc = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+    marker = [line for line in proc.stdout.splitlines() if line.startswith("RESULT ")]
+    if proc.returncode != 0 or not marker:
+        reason = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no result"
+        return {"model": model_name, "error": reason}
+    return summarize(json.loads(marker[0][len("RESULT "):]))
+
+
+def print_results(results):
+    baseline = results[0]
+    print(f"{'model':<16}{'RTF':>8}{'peak RSS':>12}{'WER':>8}{'load':>8}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['model']:<16}skipped ({result['error']})")
+            continue
+        rss = f"{result['peak_rss_mb']:.0f}MB" if result["peak_rss_mb"] is not None else "-"
+        wer = f"{result['wer'] * 100:.1f}%" if result["wer"] is not None else "-"
+        print(f"{result['model']:<16}{result['rtf']:>8.3f}{rss:>12}{wer:>8}{result['load_seconds']:>7.1f}s")
+
+    for result in results[1:]:
+        if "error" in result or "error" in baseline:
+            continue
+        print(f"{result['model']} vs {baseline['model']}: "
+              f"speed x{baseline['rtf'] / result['rtf']:.2f}", end="")
+        if result["peak_rss_mb"] and baseline["peak_rss_mb"]:
+            print(f", peak RSS {result['peak_rss_mb'] - baseline['peak_rss_mb']:+.0f}MB", end="")
+        if result["wer"] is not None and baseline["wer"] is not None:
+            print(f", WER {(result['wer'] - baseline['wer']) * 100:+.1f}pt", end="")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MojiOkoshi int8 量子化ベンチマーク")
+    parser.add_argument("--test-set", required=True, help="音声ファイルと正解テキスト（同名の .txt）を置いたフォルダ")
+    parser.add_argument("--model", default="small", help="比較するWhisperモデル名")
+    parser.add_argument("--threads", type=int, default=None, help="torchのCPUスレッド数")
+    parser.add_argument("--save", help="結果をJSONに保存する")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.test_set, args.threads)
+        return
+
+    if not find_test_set(args.test_set):
+        print(f"No audio files with reference .txt found in {args.test_set}")
+        sys.exit(1)
+
+    # 量子化モデルの初回作成にかかる時間は load に含まれます（2回目以降はディスクから読み込み）
+    results = [benchmark(name, args.test_set, args.threads) for name in (args.model, args.model + "-int8")]
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+        print(f"Saved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
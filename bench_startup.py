@@ -0,0 +1,206 @@
+"""
+起動時間ベンチマーク。
+
+    uv run bench_startup.py                                  # 計測して表示
+    uv run bench_startup.py --save startup_baseline.json     # 基準値として保存
+    uv run bench_startup.py --baseline startup_baseline.json # 基準値より遅くなっていれば終了コード1
+
+計測する項目:
+- 最初のウィンドウが表示されるまでの時間（プロセス起動から）
+- 主要モジュールのインポート時間と、その内訳（python -X importtime）
+- 起動時に whisper / torch / pyannote が読み込まれていないか
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# インポート時間を計測するモジュール
+MODULES = ["src.app", "src.transcriber", "src.cli"]
+
+# 起動時に読み込まれてはいけない重いモジュール
+HEAVY_MODULES = ["torch", "whisper", "pyannote.audio", "openai", "google.generativeai"]
+
+FIRST_WINDOW_SCRIPT = """
+import time
+t0 = time.perf_counter()
+from src.app import App
+app = App()
+app.update_idletasks()
+app.update()
+print(f"FIRST_WINDOW {time.perf_counter() - t0:.6f}", flush=True)
+app.destroy()
+"""
+
+
+def parse_importtime(stderr):
+    """
+    python -X importtime の出力を、読み込み順の (モジュール名, self_ms, cumulative_ms, 階層) のリストに変換する。
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_part, cumulative_part, raw_name = line.split(":", 1)[1].split("|", 2)
+            self_us = int(self_part)
+            cumulative_us = int(cumulative_part)
+        except ValueError:
+            continue
+        # 先頭の1文字は区切りの空白、その後の空白2つごとに階層が1段深くなります
+        raw_name = raw_name[1:]
+        depth = (len(raw_name) - len(raw_name.lstrip())) // 2
+        entries.append((raw_name.strip(), self_us / 1000, cumulative_us / 1000, depth))
+    return entries
+
+
+def direct_children(entries, module):
+    """
+    module が直接インポートしたモジュールを返す。
+    importtime は読み込みが終わった順に出力するため、子は親の直前に並ぶ。
+    """
+    for index, (name, _, _, depth) in enumerate(entries):
+        if name != module:
+            continue
+        children = []
+        for child_name, _, cumulative, child_depth in reversed(entries[:index]):
+            if child_depth <= depth:
+                break
+            if child_depth == depth + 1:
+                children.append((child_name, cumulative))
+        return children
+    return []
+
+
+def measure_import(module, repeat=3, top=10):
+    totals = []
+    entries = []
+    heavy_loaded = []
+    for _ in range(repeat):
+        check = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", check],
+                              capture_output=True, text=True, cwd=ROOT)
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"}
+        entries = parse_importtime(proc.stderr)
+        totals.append(next((cumulative for name, _, cumulative, _ in entries if name == module), 0.0))
+        heavy_loaded = [m for m in proc.stdout.strip().split(",") if m]
+
+    # 直接インポートしているモジュールを累積時間の大きい順に並べます
+    children = sorted(direct_children(entries, module), key=lambda item: item[1], reverse=True)
+    return {
+        "total_ms": statistics.median(totals),
+        "top": [{"module": name, "cumulative_ms": ms} for name, ms in children[:top]],
+        "heavy_modules_loaded": heavy_loaded,
+    }
+
+
+def measure_first_window(repeat=3):
+    process_times = []
+    window_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", FIRST_WINDOW_SCRIPT],
+                              capture_output=True, text=True, cwd=ROOT)
+        elapsed = time.perf_counter() - start
+        marker = [line for line in proc.stdout.splitlines() if line.startswith("FIRST_WINDOW")]
+        if proc.returncode != 0 or not marker:
+            reason = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no window"
+            return {"error": reason}
+        window_times.append(float(marker[0].split()[1]) * 1000)
+        # ウィンドウを閉じるまでの時間が含まれるため、プロセス全体の時間は参考値です
+        process_times.append(elapsed * 1000)
+    return {
+        "import_to_window_ms": statistics.median(window_times),
+        "process_ms": statistics.median(process_times),
+    }
+
+
+def run_benchmark(repeat):
+    results = {"python": sys.version.split()[0], "imports": {}, "first_window": measure_first_window(repeat)}
+    for module in MODULES:
+        results["imports"][module] = measure_import(module, repeat)
+    return results
+
+
+def flatten_metrics(results):
+    """
+    比較対象の数値だけを {名前: ミリ秒} の形で取り出す。
+    """
+    metrics = {}
+    for key in ("import_to_window_ms", "process_ms"):
+        if key in results["first_window"]:
+            metrics[f"first_window.{key}"] = results["first_window"][key]
+    for module, data in results["imports"].items():
+        if "total_ms" in data:
+            metrics[f"import.{module}"] = data["total_ms"]
+    return metrics
+
+
+def compare(results, baseline, tolerance):
+    """
+    基準値より tolerance の割合以上遅くなった項目と、重いモジュールの読み込みを検出する。
+    """
+    regressions = []
+    current = flatten_metrics(results)
+    for name, base_value in flatten_metrics(baseline).items():
+        value = current.get(name)
+        if value is not None and base_value > 0 and value > base_value * (1 + tolerance):
+            regressions.append(f"{name}: {base_value:.1f}ms -> {value:.1f}ms")
+    for module, data in results["imports"].items():
+        if data.get("heavy_modules_loaded"):
+            regressions.append(f"{module} loads {', '.join(data['heavy_modules_loaded'])} at import time")
+    return regressions
+
+
+def print_results(results):
+    window = results["first_window"]
+    if "error" in window:
+        print(f"First window: skipped ({window['error']})")
+    else:
+        print(f"First window: {window['import_to_window_ms']:.1f}ms after interpreter start "
+              f"({window['process_ms']:.1f}ms incl. process start/exit)")
+    for module, data in results["imports"].items():
+        if "error" in data:
+            print(f"import {module}: skipped ({data['error']})")
+            continue
+        print(f"import {module}: {data['total_ms']:.1f}ms")
+        for item in data["top"]:
+            print(f"    {item['cumulative_ms']:8.1f}ms  {item['module']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MojiOkoshi 起動時間ベンチマーク")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（中央値を採用）")
+    parser.add_argument("--save", help="結果をJSONに保存する")
+    parser.add_argument("--baseline", help="比較する基準値のJSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="許容する悪化率（0.2 = 20%%）")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeat)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+        print(f"Saved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Startup regressions detected:")
+            for item in regressions:
+                print(f"  - {item}")
+            sys.exit(1)
+        print("No startup regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -55,8 +55,12 @@ def build():
 
     # 5. インポートの接続
     # Whisperは隠しインポートが必要かもしれない
+    # whisper / torch / pyannote / openai などは LazyModule で遅延インポートしているため、
+    # PyInstallerの解析では見つからない。ここで明示的に指定する。
     hidden_imports = [
         'whisper',
+        'torch',
+        'pyannote.audio',
         'scipy', 
         'sklearn', # pyannoteで使用される場合（ダイアライゼーションは無効化されているがインポートされている？いや、条件付きインポートだ）
         'sklearn.utils._typedefs', # よくある欠落
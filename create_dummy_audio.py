@@ -1,12 +1,83 @@
+import argparse
+import json
+import os
+
 import numpy as np
-import soundfile as sf
 
-def create_dummy_audio(filename="test_audio.wav", duration=5, samplerate=16000):
-    t = np.linspace(0, duration, int(samplerate * duration))
-    # Generate a 440 Hz sine wave (A4)
-    data = 0.5 * np.sin(2 * np.pi * 440 * t)
+# 合成話者の基本周波数（Hz）。話者ごとに声の高さを変えます
+SPEAKER_PITCHES = [110, 210, 150, 260, 130, 180]
+
+
+def _synth_voice(duration, pitch, samplerate, rng):
+    """
+    音声に似た信号（倍音を含む声帯音に、音節ごとの抑揚をかけたもの）を作る。
+    """
+    t = np.arange(int(samplerate * duration)) / samplerate
+    # 声の高さを少し揺らします
+    vibrato = 1 + 0.03 * np.sin(2 * np.pi * rng.uniform(3, 6) * t)
+    phase = 2 * np.pi * pitch * np.cumsum(vibrato) / samplerate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    # 1秒あたり約4音節の強弱をつけます
+    syllables = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3.5, 4.5) * t + rng.uniform(0, 2 * np.pi)))
+    return voice * syllables
+
+
+def generate_conversation(duration, speakers, samplerate=16000, seed=0):
+    """
+    話者が交代で話す合成音声を作り、(PCM, 話者区間のリスト) を返す。
+    同じ引数なら常に同じ音声になる。
+    """
+    rng = np.random.default_rng(seed)
+    total = int(samplerate * duration)
+    data = rng.normal(0, 0.002, total)  # 背景雑音
+
+    turns = []
+    time = 0.3
+    speaker = 0
+    while time < duration - 0.5:
+        length = min(rng.uniform(2.0, 8.0), duration - time)
+        start = int(time * samplerate)
+        voice = _synth_voice(length, SPEAKER_PITCHES[speaker % len(SPEAKER_PITCHES)], samplerate, rng)
+        data[start:start + len(voice)] += 0.3 * voice[:total - start]
+        turns.append({"start": round(time, 3), "end": round(time + length, 3), "speaker": f"SPEAKER_{speaker:02d}"})
+
+        # 次の話者に交代するまでの無音
+        time += length + rng.uniform(0.3, 1.2)
+        if speakers > 1:
+            speaker = (speaker + int(rng.integers(1, speakers))) % speakers
+
+    return np.clip(data, -1, 1).astype(np.float32), turns
+
+
+def create_dummy_audio(filename="test_audio.wav", duration=5, samplerate=16000, speakers=None, seed=0):
+    """
+    テスト用の音声ファイルを作る。
+    speakers を省略すると従来どおり 440Hz の正弦波、指定すると話者が交代で話す合成音声を作り、
+    正解の話者区間を「ファイル名.turns.json」に保存する。
+    """
+    import soundfile as sf
+
+    if speakers is None:
+        t = np.linspace(0, duration, int(samplerate * duration))
+        # Generate a 440 Hz sine wave (A4)
+        data = 0.5 * np.sin(2 * np.pi * 440 * t)
+        sf.write(filename, data, samplerate)
+        print(f"Created {filename}")
+        return None
+
+    data, turns = generate_conversation(duration, speakers, samplerate, seed)
     sf.write(filename, data, samplerate)
-    print(f"Created {filename}")
+    with open(os.path.splitext(filename)[0] + ".turns.json", "w", encoding="utf-8") as f:
+        json.dump({"duration": duration, "speakers": speakers, "seed": seed, "turns": turns}, f, indent=4)
+    print(f"Created {filename} ({duration}s, {speakers} speakers, {len(turns)} turns)")
+    return turns
+
 
 if __name__ == "__main__":
-    create_dummy_audio()
+    parser = argparse.ArgumentParser(description="テスト用の音声ファイルを作成する")
+    parser.add_argument("--output", default="test_audio.wav", help="出力ファイル名")
+    parser.add_argument("--duration", type=float, default=5, help="長さ（秒）")
+    parser.add_argument("--speakers", type=int, default=None, help="話者数（省略時は440Hzの正弦波）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード（同じ値なら同じ音声になる）")
+    args = parser.parse_args()
+    create_dummy_audio(args.output, args.duration, speakers=args.speakers, seed=args.seed)
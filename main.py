@@ -5,9 +5,13 @@ from src.ffmpeg_setup import setup_ffmpeg
 from src.gui_utils import patch_subprocess
 
 import sys
+import multiprocessing
 from tkinter import messagebox
 
 if __name__ == "__main__":
+    # 話者分離ワーカーなどの子プロセスをexe化した状態でも起動できるようにします
+    multiprocessing.freeze_support()
+
     # Windowsで黒い画面（コンソール）が出ないようにするためのパッチを適用します
     patch_subprocess()
     
@@ -0,0 +1,6 @@
+import sys
+
+from .cli import main
+
+# python -m src で GUI なしのコマンドラインツールとして起動します
+sys.exit(main())
@@ -2,16 +2,31 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog
 from tkinterdnd2 import TkinterDnD, DND_FILES
+import sys
 import threading
 import os
-import json
+import shutil
 import time # sleep用
 
 from .transcriber import Transcriber
 from .summarizer import SimpleSummarizer
 from .config_manager import ConfigManager
 from .llm_summarizer import LocalLLMSummarizer
+from .llm_client_pool import build_llm_pool
+from .summary_cache import build_summary_cache
+from .incremental_summary import IncrementalSummarizer
 from .gemini_summarizer import GeminiSummarizer
+from .audio import SUPPORTED_EXTENSIONS
+from .job_queue import JobQueue, BatchRunner
+from .live_transcriber import MicrophoneSource, microphone_available
+from .result_io import (DEFAULT_RESULTS_DIR, RESULTS_MAX_AGE_DAYS, RESULTS_MAX_MB, ResultWriter, build_result_data,
+                        export_segments, prune_results, read_segments, save_result_json, save_timing_json,
+                        segments_path)
+from .stage_timer import StageTimer
+from .transcription_cache import build_cache
+from .ui_updates import UIUpdateCoalescer, append_to_textbox
+from .checkpoint import build_checkpoints
+from .summary_orchestrator import SummaryBackend, SummaryOrchestrator, latency_summary
 
 # CTkをDnDサポートで拡張（変更なし）
 class CTkDhD(ctk.CTk, TkinterDnD.DnDWrapper):
@@ -20,9 +35,10 @@ class CTkDhD(ctk.CTk, TkinterDnD.DnDWrapper):
         self.TkdndVersion = TkinterDnD._require(self)
 
 class SettingsDialog(ctk.CTkToplevel):
-    def __init__(self, parent, config_manager):
+    def __init__(self, parent, config_manager, llm_pool=None):
         super().__init__(parent)
         self.config_manager = config_manager
+        self.llm_pool = llm_pool
         self.title("設定")
         self.geometry("500x500")
         self.resizable(False, False)
@@ -96,9 +112,9 @@ class SettingsDialog(ctk.CTkToplevel):
         api_key = self.llm_api_key
         
         try:
-            # 一時的にクライアントを作成してロード
-            temp_llm = LocalLLMSummarizer(base_url=url, api_key=api_key)
-            models = temp_llm.get_models()
+            # アプリで共有しているクライアントを使います（モデル一覧はしばらく使い回す）
+            llm = LocalLLMSummarizer(base_url=url, api_key=api_key, pool=self.llm_pool)
+            models = llm.get_models()
             
             if models:
                 self.llm_model_combo.configure(values=models)
@@ -116,7 +132,9 @@ class SettingsDialog(ctk.CTkToplevel):
         # モデルリストも保存しておく（次回起動時のため）
         current_models = self.llm_model_combo._values
         
+        # 分割や同時実行などの、この画面にない設定はそのまま残します
         self.config_manager.set("local_llm", {
+            **self.config_manager.get("local_llm", {}),
             "enabled": True,
             "url": self.llm_url,     # 隠しフィールドから保存
             "model": self.llm_model_combo.get(),
@@ -172,9 +190,14 @@ class App(CTkDhD):
                                          command=self.open_settings)
         self.settings_btn.pack(side="right", padx=(10, 0))
 
-        self.model_var = ctk.StringVar(value="small (推奨)")
+        # "-int8" の付いたモデルは int8 に量子化してCPUで実行します（GPUのないPC向け）
+        model_labels = ["tiny (高速)", "base (標準)", "small (推奨)", "medium (中精度)", "large (最高精度)",
+                        "small-int8 (CPU高速)", "medium-int8 (CPU高速)", "large-int8 (CPU高速)"]
+        default_model = self.config_manager.get_nested("pipeline", "default_model", "small")
+        default_label = next((label for label in model_labels if label.split()[0] == default_model), "small (推奨)")
+        self.model_var = ctk.StringVar(value=default_label)
         self.model_combo = ctk.CTkOptionMenu(self.header_frame, variable=self.model_var, 
-                                            values=["tiny (高速)", "base (標準)", "small (推奨)", "medium (中精度)", "large (最高精度)"],
+                                            values=model_labels, command=self.on_model_selected,
                                             width=140, font=self.font_small,
                                             fg_color="#FFFFFF", text_color="#1D1D1F", button_color="#007AFF", button_hover_color="#005ecb")
         self.model_combo.pack(side="right")
@@ -204,7 +227,23 @@ class App(CTkDhD):
 
         self.select_file_btn = ctk.CTkButton(self.drop_frame, text="ファイルを選択", command=self.select_file, 
                                             font=self.font_norm, fg_color="#007AFF", hover_color="#005ecb", height=35)
-        self.select_file_btn.pack(pady=(0, 20))
+        self.select_file_btn.pack(pady=(0, 5))
+
+        # 一括処理ボタン（フォルダ内のファイルをまとめてキューに追加）
+        self.batch_btn = ctk.CTkButton(self.drop_frame, text="フォルダを一括処理", command=self.select_folder,
+                                      font=self.font_small, fg_color="transparent", border_width=1, border_color="#007AFF",
+                                      text_color="#007AFF", hover_color="#F0F8FF", height=28)
+        self.batch_btn.pack(pady=(0, 5))
+
+        # ライブ文字起こし（マイクの音声を録音しながら文字起こしする）
+        self.live_btn = ctk.CTkButton(self.drop_frame, text="マイクでライブ文字起こし", command=self.toggle_live,
+                                     font=self.font_small, fg_color="transparent", border_width=1, border_color="#FF3B30",
+                                     text_color="#FF3B30", hover_color="#FFF0F0", height=28)
+        if microphone_available():
+            self.live_btn.pack(pady=(0, 20))
+        else:
+            # sounddevice がない環境ではマイクを使えないので、ボタンを表示しません
+            self.batch_btn.pack_configure(pady=(0, 20))
 
         # ファイル情報
         self.file_path_var = tk.StringVar(value="ファイルが選択されていません")
@@ -232,20 +271,22 @@ class App(CTkDhD):
         self.tabview.add("文字起こし")
         self.tabview.add("簡易要約")
         self.tabview.add("ローカルLLM")
-        # self.tabview.add("Gemini") # Geminiは非表示（コードは残す）
+        # Geminiは通常は非表示（コードは残す）。APIキーが設定されているときだけタブを出します
+        tab_names = ["文字起こし", "簡易要約", "ローカルLLM"]
+        gemini_config = self.config_manager.get("gemini", {})
+        if gemini_config.get("enabled", True) and gemini_config.get("api_key"):
+            self.tabview.add("Gemini")
+            tab_names.append("Gemini")
         
         # 各タブのテキストボックス
         self.text_widgets = {}
-        for tab_name in ["文字起こし", "簡易要約", "ローカルLLM"]: # Gemini除外
+        for tab_name in tab_names:
             textbox = ctk.CTkTextbox(self.tabview.tab(tab_name), font=self.font_norm, corner_radius=10, fg_color="#FFFFFF", text_color="#1D1D1F", border_width=1, border_color="#E5E5E5")
             textbox.pack(expand=True, fill="both")
             self.text_widgets[tab_name] = textbox
             
-        # Gemini用のウィジェットは作成しないが、辞書には入れておく（保存ロジック等のため）
-        # ただし、保存時にエラーにならないようにハンドリングが必要
-        # ここではNoneを入れておくか、あるいは非表示のTabを作成するか。
-        # CTkTabviewはaddしないとtab()が呼べない。
-        # なので、保存ロジック側で "Gemini" キーがない場合を考慮するように修正する。
+        # Geminiのタブがないときはウィジェットも作成しないので、
+        # 保存ロジック側で "Gemini" キーがない場合を考慮しています。
         
         # フッターアクション
         self.footer_frame = ctk.CTkFrame(self.result_frame, fg_color="transparent")
@@ -258,29 +299,80 @@ class App(CTkDhD):
                                      font=self.font_norm, fg_color="transparent", border_width=1, border_color="#007AFF", text_color="#007AFF", hover_color="#F0F8FF")
         self.save_btn.pack(side="right")
         
-        # 要約生成ボタン（アクティブなタブによって挙動を変えるか、プルダウンにするか）
-        # ここでは「現在開いている要約タブ」に対して生成を行う形にします
+        # 要約生成ボタン（簡易要約・ローカルLLM・Gemini をまとめて同時に作成し、それぞれのタブに表示します）
         self.summarize_btn = ctk.CTkButton(self.footer_frame, text="要約を作成", command=self.generate_summary, state="disabled",
                                      font=self.font_norm, fg_color="#34C759", hover_color="#2da84e", text_color="white", width=120)
         self.summarize_btn.pack(side="right", padx=10)
 
+        # ワーカースレッドからの画面更新（セグメントごとのテキストや進捗）は、
+        # キューにためて一定間隔でまとめて反映します
+        self.ui_updates = UIUpdateCoalescer(self)
+        for tab_name, textbox in self.text_widgets.items():
+            self.ui_updates.on_append(tab_name, lambda text, textbox=textbox: append_to_textbox(textbox, text))
+        self.ui_updates.on_set("progress", self._update_progress_safe)
+        self.ui_updates.start()
+
         # ロジック
-        self.transcriber = Transcriber()
+        pipeline_config = self.config_manager.get("pipeline", {})
+        self.transcriber = Transcriber(
+            concurrent_diarization=pipeline_config.get("concurrent_diarization", True),
+            whisper_threads=pipeline_config.get("whisper_threads"),
+            diarization_threads=pipeline_config.get("diarization_threads"),
+            parallel_workers=pipeline_config.get("parallel_workers"),
+            chunk_seconds=pipeline_config.get("chunk_seconds", 300),
+            vad_filter=pipeline_config.get("vad_filter", False),
+            cache=build_cache(self.config_manager.get("cache", {})),
+            model_pool_mb=pipeline_config.get("model_pool_mb", 4096),
+            checkpoints=build_checkpoints(self.config_manager.get("checkpoint", {}))
+        )
         self.simple_summarizer = SimpleSummarizer()
         
-        # LLM系は都度初期化するか、キャッシュするか。
-        # 設定が変わる可能性があるので、生成時にConfigから読み込んで初期化する方が安全
+        # LLM系は設定が変わる可能性があるので、生成時にConfigから読み込んで初期化します。
+        # クライアントとHTTP接続はエンドポイントごとにこのプールで使い回します
+        self.llm_pool = build_llm_pool(self.config_manager.get("local_llm", {}))
+        # 同じ文字起こしを同じ設定で要約し直すときは、保存しておいた要約をすぐに表示します
+        self.summary_cache = build_summary_cache(self.config_manager.get("summary_cache", {}))
+        # 表示中の要約がキャッシュから出たものか（保存するJSONに記録する）
+        self.summary_cache_status = {}
+        # 文字起こし中に途中経過を更新している要約（タブ名, 段階名, IncrementalSummarizer）
+        self.incremental_summaries = []
+        # 文字起こし中のセグメントを書き出しているファイルと、直近の結果・要約（保存はここから行い、画面のテキストは使わない）
+        self.result_writer = None
+        self.result = None
+        self.summary_texts = {}
         self.audio_path = None
         self.is_transcribing = False
+        # 直近の文字起こしの段階ごとの計測結果（要約の時間も追記し、保存時にJSONで書き出す）
+        self.timer = None
+        self.audio_seconds = None
+        # ライブ文字起こし中のマイク（停止ボタンで close する）
+        self.live_source = None
+
+        # 一括処理用のジョブキュー（状態はディスクに保存され、クラッシュ後も再開できる）
+        self.job_queue = JobQueue()
+        self.batch_runner = None
+        if self.job_queue.pending_jobs():
+            self.after(1000, self.offer_resume_batch)
+        elif self.transcriber.checkpoints and self.transcriber.checkpoints.interrupted():
+            # 途中で止まった長い録音の文字起こしは、続きから再開できます
+            self.after(1000, self.offer_resume_transcription)
+
+        # ウィンドウ表示後、ファイルを選んでいる間に whisper / torch（話者分離を使うなら pyannote）の読み込みと
+        # 既定のモデルの読み込みを済ませておきます
+        self.after(200, self.transcriber.warm_up)
+        self.after(200, self.transcriber.preload, self.model_var.get().split()[0])
 
     def open_settings(self):
-        SettingsDialog(self, self.config_manager)
+        SettingsDialog(self, self.config_manager, self.llm_pool)
 
     def drop_file(self, event):
         if self.is_transcribing: return
-        file_path = event.data
-        if file_path.startswith("{") and file_path.endswith("}"):
-            file_path = file_path[1:-1]
+        # 複数ファイルやフォルダがドロップされた場合は一括処理に回します
+        paths = list(self.tk.splitlist(event.data))
+        if len(paths) > 1 or (paths and os.path.isdir(paths[0])):
+            self.start_batch(paths)
+            return
+        file_path = paths[0] if paths else ""
         if self.validate_file(file_path):
             self.set_file(file_path)
         else:
@@ -293,7 +385,7 @@ class App(CTkDhD):
 
     def validate_file(self, path):
         ext = os.path.splitext(path)[1].lower()
-        return ext in [".mp3", ".wav", ".m4a", ".mp4", ".flac"]
+        return ext in SUPPORTED_EXTENSIONS
 
     def set_file(self, path):
         self.audio_path = path
@@ -302,8 +394,107 @@ class App(CTkDhD):
         self.status_label.configure(text="ファイルが選択されました", text_color="#007AFF")
         self.drop_frame.configure(border_color="#007AFF")
 
+    def select_folder(self):
+        if self.is_transcribing: return
+        directory = filedialog.askdirectory()
+        if directory:
+            self.start_batch([directory])
+
+    def offer_resume_batch(self):
+        if self.is_transcribing: return
+        pending = len(self.job_queue.pending_jobs())
+        if messagebox.askyesno("一括処理の再開", f"前回の一括処理が中断されています（残り{pending}件）。\n再開しますか？"):
+            self.start_batch([])
+        else:
+            # 再開しない場合は残りのジョブも捨て、次の一括処理に紛れ込まないようにします
+            self.job_queue.clear()
+
+    def offer_resume_transcription(self):
+        if self.is_transcribing: return
+        interrupted = self.transcriber.checkpoints.interrupted()
+        if not interrupted: return
+        checkpoint = interrupted[0]
+        audio_path = checkpoint.state["audio_path"]
+        percentage = int((checkpoint.state.get("progress") or 0) * 100)
+        if messagebox.askyesno("文字起こしの再開",
+                               f"前回の文字起こしが途中で止まっています。\n{os.path.basename(audio_path)}（{percentage}%まで完了）\n続きから再開しますか？"):
+            # 同じファイル・同じモデルで文字起こしすると、保存した位置から続きをデコードします
+            label = next((label for label in self.model_combo.cget("values")
+                          if label.split()[0] == checkpoint.state["model"]), None)
+            if label:
+                self.model_var.set(label)
+            self.set_file(audio_path)
+            self.start_transcription()
+        else:
+            checkpoint.remove()
+
+    def start_batch(self, paths):
+        """
+        ファイル・フォルダをジョブキューに追加し、未処理のジョブをまとめて文字起こしする。
+        """
+        for path in paths:
+            if os.path.isdir(path):
+                self.job_queue.add_directory(path)
+            else:
+                self.job_queue.add_files([path])
+
+        if not self.job_queue.pending_jobs():
+            self.status_label.configure(text="対応しているファイルがありません", text_color="#FF3B30")
+            return
+
+        self.is_transcribing = True
+        self.transcribe_btn.configure(state="disabled")
+        self.select_file_btn.configure(state="disabled")
+        self.batch_btn.configure(state="disabled")
+        self.live_btn.configure(state="disabled")
+        self.model_combo.configure(state="disabled")
+        self.save_btn.configure(state="disabled")
+        self.summarize_btn.configure(state="disabled")
+        self.progress_bar.set(0)
+        self.result = None
+
+        model_name = self.model_var.get().split()[0]
+        self.batch_runner = BatchRunner(
+            self.transcriber, self.job_queue, model_name,
+            job_callback=self.update_batch_ui,
+            progress_callback=self.update_progress_ui,
+            text_callback=self.update_text_ui
+        )
+        threading.Thread(target=self.run_batch, daemon=True).start()
+
+    def run_batch(self):
+        try:
+            stats = self.batch_runner.run()
+            self.ui_updates.call(self.on_batch_complete, stats)
+        except Exception as e:
+            self.ui_updates.call(self.on_transcription_error, str(e))
+
+    def update_batch_ui(self, job, number, total):
+        self.ui_updates.call(self._update_batch_safe, job, number, total)
+
+    def _update_batch_safe(self, job, number, total):
+        self.file_path_var.set(f"一括処理 {number}/{total}: {os.path.basename(job['path'])}")
+        if job["status"] == "running":
+            self.text_widgets["文字起こし"].delete("0.0", "end")
+            self.progress_bar.set(0)
+
+    def on_batch_complete(self, stats):
+        self.is_transcribing = False
+        self.progress_bar.set(1)
+        self.select_file_btn.configure(state="normal")
+        self.batch_btn.configure(state="normal")
+        self.live_btn.configure(state="normal")
+        self.transcribe_btn.configure(state="normal" if self.audio_path else "disabled")
+        self.model_combo.configure(state="normal")
+        # 一括処理の結果はファイルごとに保存済みです。画面の結果とは対応しないので、要約・保存は無効のままにします
+        self.status_label.configure(
+            text=f"一括処理完了: {stats['done']}件成功 / {stats['failed']}件失敗 (処理速度 {stats['throughput']:.1f}倍速)",
+            text_color="#34C759" if not stats["failed"] else "#FF9500"
+        )
+        self.job_queue.clear_finished()
+
     def update_progress_ui(self, progress):
-        self.after(0, lambda p=progress: self._update_progress_safe(p))
+        self.ui_updates.set("progress", progress)
     
     def _update_progress_safe(self, progress):
         self.progress_bar.set(progress)
@@ -311,11 +502,85 @@ class App(CTkDhD):
         self.status_label.configure(text=f"処理中... {percentage}%", text_color="#007AFF")
 
     def update_text_ui(self, text):
-        self.after(0, lambda t=text: self._append_text_safe(t))
+        self.ui_updates.append("文字起こし", text + "\n")
+
+    def toggle_live(self):
+        if self.live_source is not None:
+            # 録音を止めると、残りの音声を確定させてから on_transcription_complete が呼ばれます
+            self.live_source.close()
+            self.live_btn.configure(state="disabled", text="確定中...")
+            return
+        if self.is_transcribing: return
+
+        live_config = self.config_manager.get("live", {})
+        self.live_source = MicrophoneSource(device=live_config.get("device"))
+        self.is_transcribing = True
+        self.transcribe_btn.configure(state="disabled")
+        self.select_file_btn.configure(state="disabled")
+        self.batch_btn.configure(state="disabled")
+        self.model_combo.configure(state="disabled")
+        self.save_btn.configure(state="disabled")
+        self.summarize_btn.configure(state="disabled")
+        self.live_btn.configure(text="録音を停止")
 
-    def _append_text_safe(self, text):
-        self.text_widgets["文字起こし"].insert("end", text + "\n")
-        self.text_widgets["文字起こし"].see("end")
+        self.progress_bar.configure(mode="indeterminate")
+        self.progress_bar.start()
+        self.status_label.configure(text="録音中... 話した内容が順に表示されます", text_color="#FF3B30")
+
+        for k in self.text_widgets:
+            self.text_widgets[k].delete("0.0", "end")
+        # 確定したテキストの後ろに、まだ変わる可能性のある仮のテキストを灰色で表示します
+        textbox = self.text_widgets["文字起こし"]
+        textbox.tag_config("tentative", foreground="#8E8E93")
+        textbox.mark_set("tentative_start", "end-1c")
+        textbox.mark_gravity("tentative_start", "left")
+
+        model_name = live_config.get("model") or self.model_var.get().split()[0]
+        self._start_result(None)
+        self.live_segment_count = 0
+        self._start_incremental_summaries()
+        threading.Thread(target=self.run_live, args=(self.live_source, model_name, live_config), daemon=True).start()
+
+    def run_live(self, source, model_name, live_config):
+        self.timer = StageTimer()
+        try:
+            result = self.transcriber.transcribe_live(
+                source, model_name,
+                update_callback=self.update_live_ui,
+                timer=self.timer,
+                step_seconds=live_config.get("step_seconds", 1.0),
+                max_buffer_seconds=live_config.get("max_buffer_seconds", 20.0)
+            )
+            self._finalize_result(result)
+            self.ui_updates.call(self.on_transcription_complete, result)
+            self._finish_incremental_summaries()
+        except Exception as e:
+            source.close()
+            self.result_writer.close()
+            self._cancel_incremental_summaries()
+            self.ui_updates.call(self.on_transcription_error, str(e))
+
+    def update_live_ui(self, update):
+        for event in update.committed:
+            # 途中で落ちても書き出したファイルの id が重複しないよう、確定した順に番号を振ります
+            self._on_segment(event.to_segment(self.live_segment_count))
+            self.live_segment_count += 1
+        self.ui_updates.call(self._apply_live_update_safe, update)
+
+    def _apply_live_update_safe(self, update):
+        textbox = self.text_widgets["文字起こし"]
+        # 前回の仮のテキストを消し、新しく確定したテキストと新しい仮のテキストに置き換えます
+        textbox.delete("tentative_start", "end-1c")
+        for event in update.committed:
+            textbox.insert("end-1c", event.text + "\n")
+        textbox.mark_set("tentative_start", "end-1c")
+        if update.tentative:
+            textbox.insert("end-1c", update.tentative, "tentative")
+        textbox.see("end")
+
+    def on_model_selected(self, label):
+        # 選び直したモデルは、文字起こしを始める前にバックグラウンドで読み込んでおきます
+        self.transcriber.preload(label.split()[0])
 
     def start_transcription(self):
         if not self.audio_path or self.is_transcribing: return
@@ -325,6 +590,8 @@ class App(CTkDhD):
         self.is_transcribing = True
         self.transcribe_btn.configure(state="disabled")
         self.select_file_btn.configure(state="disabled")
+        self.batch_btn.configure(state="disabled")
+        self.live_btn.configure(state="disabled")
         self.model_combo.configure(state="disabled")
         self.save_btn.configure(state="disabled")
         self.summarize_btn.configure(state="disabled")
@@ -336,104 +603,264 @@ class App(CTkDhD):
             self.text_widgets[k].delete("0.0", "end")
             
         model_name = self.model_var.get().split()[0]
+        self._start_result(self.audio_path)
+        self._start_incremental_summaries()
         threading.Thread(target=self.run_transcription, args=(self.audio_path, model_name, hf_token), daemon=True).start()
 
     def run_transcription(self, audio_path, model_name, hf_token=None):
+        self.timer = StageTimer()
         try:
             result = self.transcriber.transcribe(
                 audio_path, model_name, 
                 progress_callback=self.update_progress_ui, 
                 text_callback=self.update_text_ui,
-                hf_token=hf_token
+                hf_token=hf_token,
+                timer=self.timer,
+                segment_callback=self._on_segment
             )
-            self.after(0, self.on_transcription_complete, result)
+            self._finalize_result(result)
+            # 先に届いたテキストの反映が終わってから完了の処理をします
+            self.ui_updates.call(self.on_transcription_complete, result)
+            self._finish_incremental_summaries()
         except Exception as e:
-            self.after(0, self.on_transcription_error, str(e))
+            self.result_writer.close()
+            self._cancel_incremental_summaries()
+            self.ui_updates.call(self.on_transcription_error, str(e))
+
+    def _start_result(self, audio_path):
+        """
+        文字起こしの結果を書き出すファイルを用意する。セグメントは届くたびに追記されるので、
+        アプリが落ちても ~/.cache/mojiokoshi/results にそこまでの結果が残る。
+        """
+        stem = os.path.splitext(os.path.basename(audio_path))[0] if audio_path else "live"
+        results_config = self.config_manager.get("results", {})
+        directory = results_config.get("dir") or DEFAULT_RESULTS_DIR
+        # 書き出した結果が増え続けないよう、古いものから削除します
+        prune_results(directory, results_config.get("max_age_days", RESULTS_MAX_AGE_DAYS),
+                      int(results_config.get("max_mb", RESULTS_MAX_MB) * 1024 * 1024))
+        self.result_writer = ResultWriter(os.path.join(directory, f"{stem}_{time.strftime('%Y%m%d_%H%M%S')}.json"))
+        self.result = None
+        self.summary_texts = {}
+
+    def _on_segment(self, segment):
+        self.result_writer.add_segment(segment)
+        for _, _, summarizer in self.incremental_summaries:
+            summarizer.add_segment(segment)
+
+    def _finalize_result(self, result):
+        # 話者を割り当てた最終的なセグメントで書き直して確定します（ワーカースレッドで呼ぶ）
+        try:
+            self.result_writer.finalize(build_result_data(result["text"]), result.get("segments"))
+        except Exception as e:
+            print(f"Failed to write result file: {e}", file=sys.stderr)
+
+    def _start_incremental_summaries(self):
+        """
+        文字起こし中に、音声 window_seconds ごとに途中経過の要約を更新し始める。
+        簡易要約は常に、ローカルLLMは設定で有効にした場合だけ更新する（CPUのLLMは文字起こしと取り合いになるため）。
+        """
+        self.incremental_summaries = []
+        config = self.config_manager.get("incremental_summary", {})
+        if not config.get("enabled", True):
+            return
+
+        targets = [("簡易要約", "simple_summary", self.simple_summarizer.update_summary)]
+        llm_config = self.config_manager.get("local_llm", {})
+        if config.get("local_llm", False) and llm_config.get("enabled", True):
+            llm = LocalLLMSummarizer(
+                base_url=llm_config.get("url"),
+                api_key=llm_config.get("api_key"),
+                model=llm_config.get("model"),
+                chunk_tokens=llm_config.get("chunk_tokens", 3000),
+                pool=self.llm_pool
+            )
+            targets.append(("ローカルLLM", "local_summary", llm.update_summary))
+
+        for name, stage, update in targets:
+            def update_callback(summary, seconds, name=name, stage=stage):
+                self.ui_updates.call(self._show_incremental_summary, name, stage, summary, seconds)
+
+            summarizer = IncrementalSummarizer(update, config.get("window_seconds", 300), update_callback)
+            self.incremental_summaries.append((name, stage, summarizer))
+
+    def _finish_incremental_summaries(self):
+        """
+        最後の区間を反映して、要約を完成させる（文字起こしが終わった後、ワーカースレッドで呼ぶ）。
+        「要約を作成」ボタンは、途中経過の要約が完成してから有効にします。
+        """
+        summaries, self.incremental_summaries = self.incremental_summaries, []
+        try:
+            for name, stage, summarizer in summaries:
+                with self.timer.stage(stage, incremental=True) as info:
+                    summary = summarizer.finish()
+                    info["updates"] = summarizer.updates
+                # 途中で失敗した場合は、「要約を作成」で通常どおり要約してもらいます
+                if summary is not None:
+                    self.ui_updates.call(self._show_incremental_summary, name, stage, summary, None)
+        finally:
+            self.ui_updates.call(self._on_incremental_summaries_finished)
+
+    def _on_incremental_summaries_finished(self):
+        # 完成を待つ間に次の文字起こしが始まっていれば、そのまま無効にしておきます
+        if not self.is_transcribing:
+            self.summarize_btn.configure(state="normal")
+
+    def _cancel_incremental_summaries(self):
+        summaries, self.incremental_summaries = self.incremental_summaries, []
+        for _, _, summarizer in summaries:
+            summarizer.cancel()
+
+    def _show_incremental_summary(self, name, stage, summary, seconds):
+        self.text_widgets[name].delete("0.0", "end")
+        self.summary_cache_status.pop(stage, None)
+        if seconds is not None:
+            minutes, secs = divmod(int(seconds), 60)
+            summary = f"（{minutes}分{secs:02d}秒までの途中経過）\n{summary}"
+        else:
+            self.summary_texts[stage] = summary
+        self.ui_updates.append(name, summary)
 
     def on_transcription_complete(self, result):
         self.is_transcribing = False
+        self.result = result
+        self._reset_live()
         self.progress_bar.stop()
         self.progress_bar.set(1)
         self.select_file_btn.configure(state="normal")
+        self.batch_btn.configure(state="normal")
         self.transcribe_btn.configure(state="normal")
         self.model_combo.configure(state="normal")
-        self.save_btn.configure(state="normal")
-        self.summarize_btn.configure(state="normal")
-        self.status_label.configure(text="完了しました (100%)", text_color="#34C759")
+        # どの段階に時間がかかったかをステータスバーに表示します
+        self.audio_seconds = result.get("timing", {}).get("audio_seconds")
+        self.status_label.configure(text=f"完了しました (100%)  {self.timer.summary(self.audio_seconds)}", text_color="#34C759")
+        # 整形済みのテキストに置き換えます。長い文字起こしは数回に分けて挿入され、その間も画面は固まりません
         self.text_widgets["文字起こし"].delete("0.0", "end")
-        self.text_widgets["文字起こし"].insert("0.0", result["text"])
+        self.ui_updates.append("文字起こし", result["text"])
+        self.ui_updates.call(self._on_result_text_ready)
+
+    def _on_result_text_ready(self):
+        self.text_widgets["文字起こし"].see("0.0")
+        self.save_btn.configure(state="normal")
 
     def on_transcription_error(self, error_msg):
         self.is_transcribing = False
+        self._reset_live()
         self.progress_bar.stop()
         self.progress_bar.set(0)
         self.select_file_btn.configure(state="normal")
+        self.batch_btn.configure(state="normal")
         self.transcribe_btn.configure(state="normal")
         self.model_combo.configure(state="normal")
         self.status_label.configure(text=f"エラーが発生しました", text_color="#FF3B30")
         messagebox.showerror("エラー", error_msg)
 
+    def _reset_live(self):
+        self.live_source = None
+        self.progress_bar.configure(mode="determinate")
+        self.live_btn.configure(state="normal", text="マイクでライブ文字起こし")
+
     def generate_summary(self):
-        # 現在のタブを確認
-        original_text = self.text_widgets["文字起こし"].get("0.0", "end").strip()
+        # 画面のテキストではなく、保存と同じく文字起こしの結果から要約します
+        original_text = (self.result or {}).get("text", "").strip()
         if not original_text:
             messagebox.showwarning("警告", "文字起こしテキストが空です")
             return
-            
-        current_tab = self.tabview.get()
-        
-        if current_tab == "文字起こし":
-            messagebox.showinfo("案内", "要約を作成したいタブ（簡易要約、ローカルLLM）を選択してからボタンを押してください。")
+
+        backends = self._summary_backends()
+        if not backends:
+            messagebox.showinfo("案内", "有効な要約方法がありません。設定を確認してください。")
             return
 
-        self.status_label.configure(text=f"{current_tab}を作成中...", text_color="#007AFF")
+        names = "・".join(backend.name for backend in backends)
+        self.status_label.configure(text=f"{names}を作成中...", text_color="#007AFF")
         self.summarize_btn.configure(state="disabled")
         self.update_idletasks()
-        
-        target_widget = self.text_widgets[current_tab]
-        target_widget.delete("0.0", "end")
-        
-        threading.Thread(target=self._run_summarization_thread, args=(current_tab, original_text), daemon=True).start()
 
-    def _run_summarization_thread(self, mode, text):
-        summary = ""
-        try:
-            if mode == "簡易要約":
-                summary = self.simple_summarizer.summarize(text)
-            elif mode == "ローカルLLM":
-                config = self.config_manager.get("local_llm", {})
+        for backend in backends:
+            self.text_widgets[backend.name].delete("0.0", "end")
+            self.summary_cache_status.pop(backend.stage, None)
+        # 要約をやり直すときは、前回の要約の計測を今回の計測で置き換えます
+        if self.timer:
+            self.timer.discard(*(backend.stage for backend in backends))
+
+        threading.Thread(target=self._run_summarization_thread, args=(backends, original_text), daemon=True).start()
+
+    def _summary_backends(self):
+        """
+        表示しているタブごとに要約方法を用意する。LLM系は設定が変わる可能性があるので、毎回Configから初期化します。
+        """
+        backends = [SummaryBackend("簡易要約", "simple_summary",
+                                   lambda text, stream_callback: self.simple_summarizer.summarize(text))]
+
+        config = self.config_manager.get("local_llm", {})
+        if config.get("enabled", True):
+            def summarize_local(text, stream_callback):
                 llm = LocalLLMSummarizer(
                     base_url=config.get("url"),
                     api_key=config.get("api_key"),
-                    model=config.get("model")
+                    model=config.get("model"),
+                    chunk_tokens=config.get("chunk_tokens", 3000),
+                    max_parallel=config.get("max_parallel", 2),
+                    pool=self.llm_pool,
+                    cache=self.summary_cache
                 )
-                
-                # ストリーミング用コールバック
-                def stream_callback(chunk):
-                    self.after(0, self._append_summary_chunk, mode, chunk)
-                    
-                summary = llm.summarize(text, stream_callback=stream_callback)
-            elif mode == "Gemini":
-                config = self.config_manager.get("gemini", {})
+
+                # 長い文字起こしを分割して要約している間は、終わった部分の数を表示します
+                def progress_callback(done, total):
+                    message = f"ローカルLLMを作成中... 部分要約 {done}/{total}"
+                    self.ui_updates.call(lambda: self.status_label.configure(text=message, text_color="#007AFF"))
+
+                summary = llm.summarize(text, stream_callback=stream_callback, progress_callback=progress_callback)
+                return summary, llm.cache_status
+
+            backends.append(SummaryBackend("ローカルLLM", "local_summary", summarize_local))
+
+        if "Gemini" in self.text_widgets:
+            config = self.config_manager.get("gemini", {})
+
+            def summarize_gemini(text, stream_callback):
                 gemini = GeminiSummarizer(
                     api_key=config.get("api_key"),
-                    model=config.get("model")
+                    model=config.get("model"),
+                    cache=self.summary_cache
                 )
-                summary = gemini.summarize(text)
-                
-            self.after(0, self._on_summary_complete, mode, summary)
-            
+                summary = gemini.summarize(text, stream_callback=stream_callback)
+                return summary, gemini.cache_status
+
+            backends.append(SummaryBackend("Gemini", "gemini_summary", summarize_gemini))
+        return backends
+
+    def _run_summarization_thread(self, backends, text):
+        stages = {backend.name: backend.stage for backend in backends}
+        try:
+            orchestrator = SummaryOrchestrator(backends, self.config_manager.get_nested("summary", "max_workers", 3))
+            results = orchestrator.run(
+                text,
+                stream_callback=self.ui_updates.append,
+                done_callback=lambda name, result: self.ui_updates.call(
+                    self._on_backend_summary_complete, name, result, stages[name]),
+                timer=self.timer
+            )
+            self.ui_updates.call(self._on_summary_complete, backends, results)
         except Exception as e:
-            self.after(0, self._on_summary_error, str(e))
+            self.ui_updates.call(self._on_summary_error, str(e))
 
-    def _append_summary_chunk(self, mode, chunk):
-        self.text_widgets[mode].insert("end", chunk)
-        self.text_widgets[mode].see("end")
+    def _on_backend_summary_complete(self, name, result, stage):
+        if result["cache"]:
+            self.summary_cache_status[stage] = result["cache"]
+        self.summary_texts[stage] = result["summary"] if result["status"] == "done" else ""
+        # ストリーミングで表示した途中のテキストを、完成した要約（失敗した場合はエラー）に置き換えます
+        self.text_widgets[name].delete("0.0", "end")
+        self.ui_updates.append(name, result["summary"] or f"要約に失敗しました: {result['error']}")
 
-    def _on_summary_complete(self, mode, summary):
+    def _on_summary_complete(self, backends, results):
         self.summarize_btn.configure(state="normal")
-        self.status_label.configure(text=f"{mode}が完了しました", text_color="#34C759")
-        self.text_widgets[mode].insert("0.0", summary)
+        failed = [name for name, result in results.items() if result["status"] == "failed"]
+        message = latency_summary(backends, results)
+        if failed:
+            self.status_label.configure(text=f"一部の要約に失敗しました  {message}", text_color="#FF9500")
+        else:
+            self.status_label.configure(text=f"要約が完了しました  {message}", text_color="#34C759")
 
     def _on_summary_error(self, error_msg):
         self.summarize_btn.configure(state="normal")
@@ -441,21 +868,29 @@ class App(CTkDhD):
         messagebox.showerror("エラー", f"要約エラー: {error_msg}")
 
     def save_to_file(self):
-        # ユーザー要望によりJSON形式のみとする
-        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSONファイル", "*.json")])
+        # JSON（要約と、隣に置くセグメントのJSONL）のほか、セグメントから字幕やテキストとしても書き出せます
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[
+            ("JSONファイル", "*.json"), ("SRT字幕", "*.srt"), ("WebVTT字幕", "*.vtt"), ("テキスト", "*.txt")])
             
         if not file_path: return
 
         try:
-            full_data = {
-                "original": self.text_widgets["文字起こし"].get("0.0", "end"),
-                "simple_summary": self.text_widgets["簡易要約"].get("0.0", "end"),
-                "local_summary": self.text_widgets["ローカルLLM"].get("0.0", "end"),
-                "gemini_summary": "" # 非表示のため空文字
-            }
-            
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(full_data, f, indent=4, ensure_ascii=False)
+            # 画面のテキストではなく、文字起こし中に書き出したファイルと要約の結果から保存します
+            fmt = os.path.splitext(file_path)[1].lower().lstrip(".")
+            if fmt in ("srt", "vtt", "txt"):
+                export_segments(read_segments(self.result_writer.segments_path), file_path, fmt)
+            else:
+                full_data = build_result_data(
+                    original=self.result["text"],
+                    simple_summary=self.summary_texts.get("simple_summary", ""),
+                    local_summary=self.summary_texts.get("local_summary", ""),
+                    gemini_summary=self.summary_texts.get("gemini_summary", ""),
+                    summary_cache=dict(self.summary_cache_status)
+                )
+                save_result_json(file_path, full_data)
+                shutil.copyfile(self.result_writer.segments_path, segments_path(file_path))
+                if self.timer:
+                    save_timing_json(file_path, self.timer.to_dict(self.audio_seconds))
                     
             messagebox.showinfo("保存完了", "ファイルを保存しました")
         except Exception as e:
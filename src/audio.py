@@ -0,0 +1,160 @@
+import os
+import json
+import shutil
+import subprocess
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .lazy_import import LazyModule
+
+# whisper は読み込みが重いため、実際にデコードするときまでインポートしません
+whisper = LazyModule("whisper")
+
+# Whisperが内部で使うサンプリングレート（16kHz）
+SAMPLE_RATE = 16000
+
+# アプリで扱える音声・動画ファイルの拡張子
+SUPPORTED_EXTENSIONS = (".mp3", ".wav", ".m4a", ".mp4", ".flac")
+
+
+def probe_duration(audio_path):
+    """
+    音声ファイルの長さ（秒）をコンテナのメタデータから取得する。
+    デコードは行わない。取得できない場合は None を返す。
+    """
+    # 1. ffprobe（FFmpegに同梱）でコンテナのメタデータを読む
+    if shutil.which("ffprobe"):
+        try:
+            out = subprocess.run(
+                ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+                 "-of", "json", audio_path],
+                capture_output=True, check=True
+            ).stdout
+            duration = json.loads(out).get("format", {}).get("duration")
+            if duration is not None:
+                return float(duration)
+        except Exception as e:
+            print(f"ffprobe failed: {e}", file=sys.stderr)
+
+    # 2. WAV/FLACなどはsoundfileでヘッダーだけ読む
+    try:
+        import soundfile as sf
+        return float(sf.info(audio_path).duration)
+    except Exception:
+        pass
+
+    return None
+
+
+class DecodedAudio:
+    """
+    1つのジョブにつき1回だけデコードされる音声データ。
+    Whisper・進捗計算・ダイアライザーがすべてこのオブジェクトを共有し、
+    ffmpegによるデコードとPCM配列のコピーを1回に抑える。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._samples = None
+        self._duration = None
+        self._shared = None
+
+    @property
+    def duration(self):
+        """
+        音声の長さ（秒）。デコード済みならPCMから、未デコードならメタデータから求める。
+        """
+        if self._duration is None:
+            if self._samples is not None:
+                self._duration = len(self._samples) / SAMPLE_RATE
+            else:
+                self._duration = probe_duration(self.path)
+                if self._duration is None:
+                    # メタデータが読めない形式の場合のみデコードして求める
+                    self._duration = len(self.samples) / SAMPLE_RATE
+        return self._duration
+
+    @property
+    def samples(self):
+        """
+        16kHzモノラルのfloat32 PCM配列。初回アクセス時に1回だけデコードする。
+        """
+        if self._samples is None:
+            print(f"Decoding audio: {self.path}", file=sys.stderr)
+            # whisper.load_audio はffmpegで音声を読み込み、16kHzにリサンプリングします
+            self._samples = np.asarray(whisper.load_audio(self.path), dtype=np.float32)
+        return self._samples
+
+    def share(self):
+        """
+        PCM配列を共有メモリに移し、(共有メモリ名, サンプル数) を返す。
+        別プロセス（話者分離ワーカーなど）がコピーせずに同じ配列を読めるようにするため。
+        以降 samples は共有メモリ上の配列を指すので、メモリ上のPCMは1つのままになる。
+        """
+        if self._shared is None:
+            samples = self.samples
+            shared = shared_memory.SharedMemory(create=True, size=max(samples.nbytes, 1))
+            view = np.ndarray(samples.shape, dtype=np.float32, buffer=shared.buf)
+            view[:] = samples
+            self._samples = view
+            self._shared = shared
+        return self._shared.name, len(self._samples)
+
+    @property
+    def is_shared(self):
+        """
+        share() でPCMを共有メモリに移しているかどうか。
+        """
+        return self._shared is not None
+
+    def release(self):
+        """
+        PCM配列を解放する（長い録音でメモリを早めに返すため）。
+        共有メモリに移していた場合は共有メモリも破棄する。
+        """
+        self._samples = None
+        self._free_shared()
+
+    def unshare(self):
+        """
+        共有メモリに移したPCMを通常の配列に戻し、共有メモリを破棄する。
+        別プロセスでの処理が終わった後も、このプロセスでPCMを使い続ける場合に使う。
+        """
+        if self._shared is not None:
+            self._samples = np.array(self._samples)
+            self._free_shared()
+
+    def _free_shared(self):
+        if self._shared is not None:
+            try:
+                self._shared.close()
+            except BufferError:
+                # まだ配列を参照している箇所がある場合は、参照が消えた時点で解放されます
+                pass
+            try:
+                self._shared.unlink()
+            except FileNotFoundError:
+                pass
+            self._shared = None
+
+    @classmethod
+    def from_samples(cls, samples, path=None):
+        """
+        デコード済みのPCM配列から DecodedAudio を作成する。
+        """
+        audio = cls(path)
+        audio._samples = samples
+        return audio
+
+    @classmethod
+    def from_source(cls, source):
+        """
+        ファイルパスまたは DecodedAudio を受け取り、DecodedAudio を返す。
+        """
+        if isinstance(source, cls):
+            return source
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Audio file not found: {source}")
+        return cls(source)
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+from .transcription_cache import hash_file
+
+# 既定のチェックポイントの保存先
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mojiokoshi", "checkpoints")
+# この秒数ごとに途中経過を保存する（毎回保存すると長い録音ではJSONの書き込みが重くなるため）
+CHECKPOINT_INTERVAL_SECONDS = 30.0
+# 形式を変えたときに古いチェックポイントから再開しないようにするためのバージョン
+CHECKPOINT_VERSION = 1
+
+
+class TranscriptionCheckpoint:
+    """
+    1つの文字起こしジョブの途中経過（確定したセグメントとデコーダーの位置）。
+    seek はWhisperに渡している音声（無音除去を使う場合は除去後の音声）の中のサンプル位置。
+    """
+
+    def __init__(self, store, path, state):
+        self.store = store
+        self.path = path
+        self.state = state
+        self.last_saved = time.monotonic()
+
+    @property
+    def segments(self):
+        return self.state["segments"]
+
+    @property
+    def seek(self):
+        return self.state["seek"]
+
+    @property
+    def prompt(self):
+        return self.state["prompt"]
+
+    @property
+    def language(self):
+        return self.state["language"]
+
+    def update(self, seek, prompt, language, segments, progress=None, force=False):
+        """
+        途中経過を記録し、前回の保存から interval 秒以上経っていればディスクに書き込む。
+        segments は seek より前の音声から確定したセグメントだけを含んでいること。
+        segments は窓ごとに後ろへ伸びていくリストなので、前回から増えた分だけをコピーして追加する
+        （毎回全体をコピーすると、長い録音では窓の数の2乗で時間がかかるため）。
+        """
+        saved = self.state["segments"]
+        if len(segments) < len(saved):
+            del saved[len(segments):]
+        saved.extend(dict(segment) for segment in segments[len(saved):])
+        self.state.update({
+            "seek": seek,
+            "prompt": prompt,
+            "language": language,
+            "progress": progress,
+            "updated": time.time(),
+        })
+        if force or time.monotonic() - self.last_saved >= self.store.interval:
+            self.save()
+
+    def save(self):
+        self.store._write(self.path, self.state)
+        self.last_saved = time.monotonic()
+
+    def remove(self):
+        """
+        文字起こしが最後まで終わったらチェックポイントを削除する。
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class CheckpointStore:
+    """
+    長い録音の文字起こしの途中経過を保存し、クラッシュやアプリの終了の後に続きから再開できるようにする。
+    チェックポイントは「音声のハッシュ-モデルとオプションのハッシュ.json」というファイル名で保存する。
+    """
+
+    def __init__(self, checkpoint_dir=None, interval=CHECKPOINT_INTERVAL_SECONDS):
+        self.checkpoint_dir = checkpoint_dir or DEFAULT_CHECKPOINT_DIR
+        self.interval = interval
+        self.lock = threading.Lock()
+
+    def _path(self, audio_key, model_name, options):
+        payload = json.dumps({"model": model_name, "options": options, "version": CHECKPOINT_VERSION},
+                             sort_keys=True)
+        name = hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+        return os.path.join(self.checkpoint_dir, f"{audio_key}-{name}.json")
+
+    def _write(self, path, state):
+        try:
+            with self.lock:
+                os.makedirs(self.checkpoint_dir, exist_ok=True)
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(state, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error saving checkpoint: {e}", file=sys.stderr)
+
+    def _read(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading checkpoint: {e}", file=sys.stderr)
+            return None
+        return state if state.get("version") == CHECKPOINT_VERSION else None
+
+    def open(self, audio, model_name, options=None, audio_key=None):
+        """
+        音声・モデル・オプションに対応するチェックポイントを返す。
+        保存済みの途中経過があればそこから、なければ先頭から始まる。ファイルのない音声では None を返す。
+        """
+        if not audio.path or not os.path.exists(audio.path):
+            return None
+        audio_key = audio_key or hash_file(audio.path)
+        options = options or {}
+        path = self._path(audio_key, model_name, options)
+
+        state = self._read(path)
+        if state is None:
+            state = {
+                "version": CHECKPOINT_VERSION,
+                "audio_path": os.path.abspath(audio.path),
+                "model": model_name,
+                "options": options,
+                "seek": 0,
+                "prompt": "",
+                "language": None,
+                "segments": [],
+                "progress": 0.0,
+                "updated": time.time(),
+            }
+        return TranscriptionCheckpoint(self, path, state)
+
+    def interrupted(self):
+        """
+        途中で止まったジョブのチェックポイントを、新しい順に返す（音声ファイルが残っているものだけ）。
+        """
+        try:
+            names = os.listdir(self.checkpoint_dir)
+        except FileNotFoundError:
+            return []
+        checkpoints = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.checkpoint_dir, name)
+            state = self._read(path)
+            if state and state.get("segments") and os.path.exists(state.get("audio_path", "")):
+                checkpoints.append(TranscriptionCheckpoint(self, path, state))
+        return sorted(checkpoints, key=lambda checkpoint: checkpoint.state["updated"], reverse=True)
+
+
+def build_checkpoints(checkpoint_config):
+    """
+    config.json の "checkpoint" セクションから CheckpointStore を作成する。無効なら None を返す。
+    """
+    checkpoint_config = checkpoint_config or {}
+    if not checkpoint_config.get("enabled", True):
+        return None
+    return CheckpointStore(
+        checkpoint_dir=checkpoint_config.get("dir"),
+        interval=checkpoint_config.get("interval_seconds", CHECKPOINT_INTERVAL_SECONDS)
+    )
@@ -0,0 +1,261 @@
+"""
+GUIを使わずに文字起こしと要約を行うコマンドラインツール。
+
+    python -m src "recordings/*.m4a" --model small --simple --local
+
+結果は App.save_to_file と同じ形式のJSONを入力ファイルごとに保存し、
+同じ内容を1行1件のJSON（JSONL）として標準出力に流す。
+GUI関連のモジュール（customtkinter, tkinterdnd2）は一切インポートしない。
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+
+from .checkpoint import build_checkpoints
+from .config_manager import ConfigManager
+from .result_io import (EXPORT_FORMATS, ResultWriter, build_result_data, export_segments, read_segments,
+                        save_timing_json)
+from .stage_timer import StageTimer
+from .summary_orchestrator import SummaryBackend, SummaryOrchestrator
+from .transcription_cache import build_cache
+
+
+def expand_inputs(patterns):
+    """
+    グロブパターンを展開し、重複を除いたファイルパスのリストを返す。
+    """
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for path in matches:
+            if os.path.isdir(path) or path in seen:
+                continue
+            seen.add(path)
+            paths.append(path)
+    return paths
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src", description="MojiOkoshi ヘッドレス文字起こし")
+    parser.add_argument("inputs", nargs="+", help="音声ファイルまたはグロブパターン（例: 'data/*.mp3'）")
+    parser.add_argument("--model", default="small",
+                        help="Whisperモデル名 (tiny/base/small/medium/large、末尾に -int8 で量子化モデル)")
+    parser.add_argument("--int8", action="store_true",
+                        help="Whisperを int8 の動的量子化モデルでCPU実行する（--model small-int8 と同じ）")
+    parser.add_argument("--output-dir", default=None, help="JSONの保存先（省略時は入力ファイルと同じフォルダ）")
+    parser.add_argument("--no-save", action="store_true", help="JSONファイルを保存せず、標準出力にだけ流す")
+    parser.add_argument("--export", nargs="+", choices=EXPORT_FORMATS, default=[],
+                        help="JSONと一緒にセグメントを字幕・テキストとして書き出す形式（例: --export srt vtt）")
+    parser.add_argument("--hf-token", default=None, help="話者分離用のHugging Faceトークン")
+    parser.add_argument("--sequential-diarization", action="store_true",
+                        help="話者分離をWhisperと同時に実行せず、文字起こしの後に実行する")
+    parser.add_argument("--whisper-threads", type=int, default=None, help="Whisperが使うCPUスレッド数")
+    parser.add_argument("--diarization-threads", type=int, default=None, help="話者分離が使うCPUスレッド数")
+    parser.add_argument("--parallel-workers", type=int, default=None,
+                        help="長い音声をチャンクに分けて同時に文字起こしするワーカープロセス数")
+    parser.add_argument("--chunk-seconds", type=float, default=300,
+                        help="チャンク並列時の1チャンクの目安の長さ（秒）")
+    parser.add_argument("--vad-filter", action="store_true",
+                        help="無音区間を取り除いてから文字起こしする（読み飛ばした長さはログに出力）")
+    parser.add_argument("--no-cache", action="store_true", help="文字起こし結果と要約のキャッシュを使わない")
+    parser.add_argument("--no-checkpoint", action="store_true",
+                        help="途中経過を保存しない（保存されていても続きから再開せず最初から文字起こしする）")
+    parser.add_argument("--refresh-cache", action="store_true",
+                        help="入力ファイルのキャッシュを削除してから文字起こしし直す")
+    parser.add_argument("--live", action="store_true",
+                        help="入力ファイルを実際の再生速度で流しながらライブ文字起こしする（入力に mic を指定するとマイク）")
+    parser.add_argument("--simple", action="store_true", help="簡易要約（TextRank）を作成する")
+    parser.add_argument("--local", action="store_true", help="ローカルLLMで要約を作成する")
+    parser.add_argument("--llm-url", default=None, help="ローカルLLMのURL（省略時は config.json の設定）")
+    parser.add_argument("--llm-model", default=None, help="ローカルLLMのモデル名（省略時は config.json の設定）")
+    parser.add_argument("--llm-api-key", default=None, help="ローカルLLMのAPIキー（省略時は config.json の設定）")
+    parser.add_argument("--config", default="config.json", help="設定ファイルのパス")
+    return parser
+
+
+def transcribe_live(transcriber, path, model_name, timer, live_config, segment_callback=None):
+    """
+    ファイル（path が "mic" ならマイク）をライブ文字起こしし、確定したテキストを標準エラーに流す。
+    マイクの場合は Ctrl+C で録音を止め、そこまでの結果を返す。
+    """
+    from .live_transcriber import FileReplaySource, MicrophoneSource
+
+    if path == "mic":
+        source = MicrophoneSource(device=live_config.get("device"))
+    else:
+        source = FileReplaySource(path)
+
+    committed_count = 0
+
+    def on_update(update):
+        nonlocal committed_count
+        for event in update.committed:
+            print(f"[{event.start:7.1f}s] {event.text}", file=sys.stderr)
+            if segment_callback:
+                segment_callback(event.to_segment(committed_count))
+            committed_count += 1
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = transcriber.transcribe_live(
+                source, model_name, update_callback=on_update, timer=timer,
+                step_seconds=live_config.get("step_seconds", 1.0),
+                max_buffer_seconds=live_config.get("max_buffer_seconds", 20.0)
+            )
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.2)
+    except KeyboardInterrupt:
+        # 録音を止めると、残りの音声を確定させてから終了します
+        source.close()
+        thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def run(args, out=sys.stdout):
+    """
+    CLIの本体。失敗したファイルがあれば 1、すべて成功すれば 0 を返す。
+    """
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("No input files.", file=sys.stderr)
+        return 1
+
+    model_name = args.model
+    if args.int8 and not model_name.endswith("-int8"):
+        model_name += "-int8"
+
+    config = ConfigManager(args.config)
+    cache = None if args.no_cache else build_cache(config.get("cache", {}))
+
+    # 重いモジュールは実際に使うときだけインポートします
+    from .transcriber import Transcriber
+    transcriber = Transcriber(
+        concurrent_diarization=not args.sequential_diarization,
+        whisper_threads=args.whisper_threads,
+        diarization_threads=args.diarization_threads,
+        parallel_workers=args.parallel_workers,
+        chunk_seconds=args.chunk_seconds,
+        vad_filter=args.vad_filter,
+        cache=cache,
+        checkpoints=None if args.no_checkpoint else build_checkpoints(config.get("checkpoint", {}))
+    )
+
+    backends = []
+    if args.simple:
+        from .summarizer import SimpleSummarizer
+        simple_summarizer = SimpleSummarizer()
+        backends.append(SummaryBackend("simple_summary", "simple_summary",
+                                       lambda text, stream_callback: simple_summarizer.summarize(text)))
+
+    if args.local:
+        from .llm_summarizer import LocalLLMSummarizer
+        from .llm_client_pool import build_llm_pool
+        from .summary_cache import build_summary_cache
+        llm_config = config.get("local_llm", {})
+        llm = LocalLLMSummarizer(
+            base_url=args.llm_url or llm_config.get("url", "http://localhost:11434/v1"),
+            api_key=args.llm_api_key or llm_config.get("api_key", "ollama"),
+            model=args.llm_model or llm_config.get("model", "llama3"),
+            chunk_tokens=llm_config.get("chunk_tokens", 3000),
+            max_parallel=llm_config.get("max_parallel", 2),
+            pool=build_llm_pool(llm_config),
+            cache=None if args.no_cache else build_summary_cache(config.get("summary_cache", {}))
+        )
+
+        def summarize_local(text, stream_callback):
+            summary = llm.summarize(text, stream_callback=stream_callback)
+            return summary, llm.cache_status
+
+        backends.append(SummaryBackend("local_summary", "local_summary", summarize_local))
+    # 簡易要約とローカルLLMの要約は同時に実行します
+    orchestrator = SummaryOrchestrator(backends, config.get_nested("summary", "max_workers", 3))
+
+    exit_code = 0
+    for path in paths:
+        start_time = time.perf_counter()
+        record = {"input": path}
+        writer = None
+        try:
+            if cache and args.refresh_cache and not args.live:
+                cache.invalidate(path)
+            if not args.no_save:
+                # セグメントは文字起こし中から出力先に追記していきます（途中で落ちても .part に残る）
+                directory = args.output_dir or os.path.dirname(os.path.abspath(path))
+                if args.live and path == "mic":
+                    stem = time.strftime("live_%Y%m%d_%H%M%S")
+                else:
+                    stem = os.path.splitext(os.path.basename(path))[0]
+                writer = ResultWriter(os.path.join(directory, f"{stem}.json"))
+            segment_callback = writer.add_segment if writer else None
+            timer = StageTimer()
+            if args.live:
+                result = transcribe_live(transcriber, path, model_name, timer, config.get("live", {}),
+                                         segment_callback=segment_callback)
+            else:
+                result = transcriber.transcribe(path, model_name, hf_token=args.hf_token, timer=timer,
+                                                segment_callback=segment_callback)
+            original = result["text"]
+            summaries = orchestrator.run(original, timer=timer)
+            simple_summary = summaries.get("simple_summary", {}).get("summary", "")
+            local_summary = summaries.get("local_summary", {}).get("summary", "")
+            summary_cache = {name: s["cache"] for name, s in summaries.items() if s["cache"]}
+            # 要約の時間も含めて計測結果をまとめ直します
+            timing = timer.to_dict(result.get("timing", {}).get("audio_seconds"))
+
+            data = build_result_data(original, simple_summary=simple_summary, local_summary=local_summary,
+                                     summary_cache=summary_cache)
+            if writer:
+                # 話者を割り当てた最終的なセグメントで書き直し、結果のJSONと一緒に確定します
+                writer.finalize(data, result.get("segments"))
+                save_timing_json(writer.file_path, timing)
+                record["output"] = writer.file_path
+                record["segments_output"] = writer.segments_path
+                for fmt in args.export:
+                    export_path = os.path.splitext(writer.file_path)[0] + f".{fmt}"
+                    export_segments(read_segments(writer.segments_path), export_path, fmt)
+                    record.setdefault("exports", []).append(export_path)
+
+            record.update(data)
+            if "vad" in result:
+                record["vad"] = result["vad"]
+            record["timing"] = timing
+            print(f"{path}: {timer.summary(timing.get('audio_seconds'))}", file=sys.stderr)
+            record["status"] = "done"
+        except Exception as e:
+            exit_code = 1
+            record["status"] = "failed"
+            record["error"] = str(e)
+            print(f"Failed {path}: {e}", file=sys.stderr)
+            if writer:
+                writer.close()
+
+        record["elapsed"] = time.perf_counter() - start_time
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    return exit_code
+
+
+def main(argv=None):
+    # 各モジュールのログは標準エラーに出るので、標準出力にはJSONLだけが流れます
+    args = build_parser().parse_args(argv)
+    return run(args, out=sys.stdout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 
 import json
 import os
+import sys
 
 class ConfigManager:
     def __init__(self, config_file="config.json"):
@@ -15,7 +16,7 @@ class ConfigManager:
             with open(self.config_file, "r", encoding="utf-8") as f:
                 return json.load(f)
         except Exception as e:
-            print(f"Error loading config: {e}")
+            print(f"Error loading config: {e}", file=sys.stderr)
             return self._get_default_config()
 
     def _get_default_config(self):
@@ -25,12 +26,61 @@ class ConfigManager:
                 "enabled": True,
                 "url": "http://localhost:11434/v1",
                 "model": "llama3",
-                "api_key": "ollama" # Ollama usually handles any string
+                "api_key": "ollama", # Ollama usually handles any string
+                "chunk_tokens": 3000, # これより長い文字起こしは分割して要約し、最後にまとめる
+                "max_parallel": 2, # 分割した部分を同時に要約するリクエスト数
+                "max_in_flight": 4, # 同じエンドポイントに同時に送るリクエストの上限（アプリ全体で共有）
+                "retries": 3, # 接続失敗・タイムアウト・429・5xx をやり直す回数
+                "models_ttl_seconds": 60 # モデル一覧を使い回す時間
             },
             "gemini": {
                 "enabled": True,
                 "api_key": "",
                 "model": "gemini-pro"
+            },
+            "summary": {
+                "max_workers": 3 # 簡易要約・ローカルLLM・Gemini を同時に実行する数
+            },
+            "incremental_summary": {
+                "enabled": True, # 文字起こし中に途中経過の要約を更新し、終わったらすぐに要約を表示する
+                "window_seconds": 300, # 音声がこの秒数進むごとに要約を更新する
+                "local_llm": False # True ならローカルLLMの要約も途中経過を更新する（文字起こしとCPUを取り合う）
+            },
+            "summary_cache": {
+                "enabled": True, # LLMの要約をディスクに保存し、同じ文字起こし・モデル・プロンプトでは使い回す
+                "dir": None, # None なら ~/.cache/mojiokoshi/summaries
+                "max_mb": 64
+            },
+            "pipeline": {
+                "default_model": "small", # 起動時に選択され、バックグラウンドで読み込まれるモデル
+                "model_pool_mb": 4096, # 切り替えたWhisperモデルをこの合計サイズまでメモリに残す
+                "concurrent_diarization": True, # 話者分離をWhisperと同時に別プロセスで実行する
+                "whisper_threads": None, # None ならコア数から自動で決める
+                "diarization_threads": None,
+                "parallel_workers": None, # 2以上なら長い音声をチャンクに分けて複数プロセスで文字起こしする
+                "chunk_seconds": 300,
+                "vad_filter": False # True なら無音区間を取り除いてからWhisperに渡す
+            },
+            "cache": {
+                "enabled": True, # 文字起こしと話者分離の結果をディスクに保存し、同じ音声では使い回す
+                "dir": None, # None なら ~/.cache/mojiokoshi/transcripts
+                "max_mb": 512
+            },
+            "checkpoint": {
+                "enabled": True, # 長い録音の文字起こしの途中経過を保存し、止まった位置から再開する
+                "dir": None, # None なら ~/.cache/mojiokoshi/checkpoints
+                "interval_seconds": 30 # 途中経過を保存する間隔（秒）
+            },
+            "results": {
+                "dir": None, # 文字起こし中のセグメントを書き出す場所（None なら ~/.cache/mojiokoshi/results）
+                "max_age_days": 7, # これより古い結果は、次に文字起こしを始めるときに削除する
+                "max_mb": 512
+            },
+            "live": {
+                "model": "base", # ライブ文字起こしは遅延を抑えるため小さめのモデルを使う
+                "device": None, # マイクのデバイス番号または名前（None なら既定の入力デバイス）
+                "step_seconds": 1.0, # 新しい音声がこの秒数たまるごとにデコードし直す
+                "max_buffer_seconds": 20.0 # 確定していない音声がこの秒数を超えたら確定させる
             }
         }
 
@@ -55,4 +105,4 @@ class ConfigManager:
             with open(self.config_file, "w", encoding="utf-8") as f:
                 json.dump(self.config, f, indent=4, ensure_ascii=False)
         except Exception as e:
-            print(f"Error saving config: {e}")
+            print(f"Error saving config: {e}", file=sys.stderr)
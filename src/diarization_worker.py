@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .audio import DecodedAudio
+
+# ワーカープロセス内で使い回す話者分離パイプライン（プロセスごとに1回だけロードする）
+_diarizer = None
+
+
+def split_thread_budget(whisper_threads=None, diarization_threads=None, cpu_count=None):
+    """
+    Whisperと話者分離を同時に動かすときのCPUスレッド数を決める。
+    指定がなければ、コアの約2/3をWhisperに、残りを話者分離に割り当てる。
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    if not diarization_threads:
+        diarization_threads = max(1, cpu_count // 3)
+    if not whisper_threads:
+        whisper_threads = max(1, cpu_count - diarization_threads)
+    return whisper_threads, diarization_threads
+
+
+def _init_worker(hf_token, num_threads):
+    global _diarizer
+    import torch
+    if num_threads:
+        # このプロセスのtorchが使うスレッド数を制限し、Whisper側とコアを取り合わないようにします
+        torch.set_num_threads(num_threads)
+
+    from .diarizer import SpeakerDiarizer
+    _diarizer = SpeakerDiarizer(use_auth_token=hf_token)
+
+
+def _warm_up_worker():
+    # パイプラインの読み込み（モデルのダウンロード）はせず、pyannote.audio のインポートだけ済ませます
+    from .diarizer import pyannote_audio
+    from .lazy_import import warm_up
+    warm_up(pyannote_audio).join()
+
+
+def _diarize_shared(shm_name, length, path):
+    shared = shared_memory.SharedMemory(name=shm_name)
+    try:
+        return _run_diarizer(shared, length, path)
+    finally:
+        try:
+            shared.close()
+        except BufferError:
+            pass
+
+
+def _run_diarizer(shared, length, path):
+    # 共有メモリ上のPCMをそのまま配列として扱います（コピーしない）
+    samples = np.ndarray((length,), dtype=np.float32, buffer=shared.buf)
+    return _diarizer.diarize(DecodedAudio.from_samples(samples, path))
+
+
+class DiarizationWorker:
+    """
+    話者分離を別プロセスで実行するワーカー。
+    Whisperの文字起こしと同時に動かすために使い、音声は共有メモリ経由で渡す。
+    プロセスとパイプラインはジョブ間で使い回す。
+    """
+
+    def __init__(self, hf_token=None, num_threads=None):
+        self.hf_token = hf_token
+        self.num_threads = num_threads
+        self.executor = None
+
+    def _get_executor(self):
+        if self.executor is None:
+            # torchを読み込んだプロセスをforkすると不安定になるため、常にspawnで起動します
+            context = multiprocessing.get_context("spawn")
+            self.executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=context,
+                initializer=_init_worker, initargs=(self.hf_token, self.num_threads)
+            )
+        return self.executor
+
+    def warm_up(self):
+        """
+        ワーカープロセスを起動して pyannote.audio を読み込んでおき、Future を返す。
+        最初の話者分離でプロセスの起動とインポートを待たずに済む。
+        """
+        return self._get_executor().submit(_warm_up_worker)
+
+    def submit(self, audio):
+        """
+        話者分離を開始し、Future を返す。結果は SpeakerDiarizer.diarize と同じ形式。
+        """
+        shm_name, length = audio.share()
+        return self._get_executor().submit(_diarize_shared, shm_name, length, audio.path)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
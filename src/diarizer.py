@@ -1,6 +1,12 @@
 import os
-import torch
-from pyannote.audio import Pipeline
+import sys
+
+from .audio import DecodedAudio, SAMPLE_RATE
+from .lazy_import import LazyModule
+
+# torch と pyannote は話者分離を実行するときまでインポートしません
+torch = LazyModule("torch")
+pyannote_audio = LazyModule("pyannote.audio")
 
 class SpeakerDiarizer:
     def __init__(self, use_auth_token=None):
@@ -12,35 +18,44 @@ class SpeakerDiarizer:
         if self.pipeline:
             return
 
-        print("Loading Diarization pipeline...")
+        print("Loading Diarization pipeline...", file=sys.stderr)
         try:
             # 標準の事前学習済みモデルを使用。
             # Hugging Faceからモデルをダウンロードします。
             # 注: これにはHFでのpyannote/speaker-diarization-3.1の利用規約への同意が必要
-            self.pipeline = Pipeline.from_pretrained(
+            self.pipeline = pyannote_audio.Pipeline.from_pretrained(
                 "pyannote/speaker-diarization-3.1",
                 use_auth_token=self.use_auth_token
             )
             
             if self.pipeline:
                 self.pipeline.to(self.device)
-                print(f"Diarization pipeline loaded on {self.device}")
+                print(f"Diarization pipeline loaded on {self.device}", file=sys.stderr)
             else:
-                print("Failed to load pipeline. Check HF_TOKEN.")
+                print("Failed to load pipeline. Check HF_TOKEN.", file=sys.stderr)
                 raise ValueError("Could not load pyannote/speaker-diarization-3.1. Please ensure you have a valid HF_TOKEN and have accepted the model terms on Hugging Face.")
                 
         except Exception as e:
-            print(f"Error loading diarization pipeline: {e}")
+            print(f"Error loading diarization pipeline: {e}", file=sys.stderr)
             raise e
 
-    def diarize(self, audio_path):
+    def diarize(self, audio):
+        """
+        話者分離を行う。
+        audio にはファイルパスか、デコード済みの DecodedAudio を渡せる。
+        DecodedAudio の場合はファイルを再度読み込まず、同じPCM配列を使う。
+        """
         if not self.pipeline:
             self.load_pipeline()
-            
-        print(f"Diarizing {audio_path}...")
+
+        audio = DecodedAudio.from_source(audio)
+        print(f"Diarizing {audio.path}...", file=sys.stderr)
+        # pyannoteにはメモリ上の波形を渡します（torch.from_numpy はコピーしません）
+        waveform = torch.from_numpy(audio.samples).unsqueeze(0)
+
         # ダイアライゼーションを実行
-        # 音声ファイルを解析し、「誰がいつ話しているか」を特定します
-        diarization = self.pipeline(audio_path)
+        # 音声を解析し、「誰がいつ話しているか」を特定します
+        diarization = self.pipeline({"waveform": waveform, "sample_rate": SAMPLE_RATE})
         
         # セグメントのリストに変換
         segments = []
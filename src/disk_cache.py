@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+import threading
+
+
+class DiskCache:
+    """
+    1つのフォルダにJSONのエントリーを保存するキャッシュの共通部分。
+    エントリーは「名前.json」として一時ファイルに書いてから置き換え（途中で落ちても壊れたファイルを残さない）、
+    合計サイズが max_bytes を超えたら最後に使った時刻（ファイルの更新時刻）が古いものから削除する（LRU）。
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _read(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cache {path}: {e}", file=sys.stderr)
+            return None
+        # 使った時刻を更新して、LRUで消されにくくします
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _write(self, path, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing cache {path}: {e}", file=sys.stderr)
+            return
+        self.evict()
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """
+        合計サイズが上限を超えていれば、最後に使ったのが古いエントリーから削除する。
+        """
+        with self.lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def _remove(self, prefix=None):
+        """
+        名前が prefix で始まるエントリー（prefix が None ならすべて）を削除し、削除した数を返す。
+        """
+        removed = 0
+        with self.lock:
+            for _, _, path in self._entries():
+                if prefix and not os.path.basename(path).startswith(prefix):
+                    continue
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
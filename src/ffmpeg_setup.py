@@ -20,7 +20,7 @@ def setup_ffmpeg():
     if shutil.which("ffmpeg"):
         return True
 
-    print("FFmpeg not found in PATH. Searching known locations...")
+    print("FFmpeg not found in PATH. Searching known locations...", file=sys.stderr)
     
     # Windowsの一般的な場所（特にWinget）
     local_app_data = os.environ.get("LOCALAPPDATA", "")
@@ -39,7 +39,7 @@ def setup_ffmpeg():
         found_ffmpeg = list(winget_packages.rglob("ffmpeg.exe"))
         if found_ffmpeg:
             ffmpeg_path = found_ffmpeg[0].parent
-            print(f"Found FFmpeg at: {ffmpeg_path}")
+            print(f"Found FFmpeg at: {ffmpeg_path}", file=sys.stderr)
             
             # PATHに追加
             # これでこのプログラム実行中のみ、ffmpegコマンドが使えるようになります
@@ -47,9 +47,9 @@ def setup_ffmpeg():
             
             # 検証
             if shutil.which("ffmpeg"):
-                print("FFmpeg successfully added to PATH.")
+                print("FFmpeg successfully added to PATH.", file=sys.stderr)
                 return True
     except Exception as e:
-        print(f"Error searching for FFmpeg: {e}")
+        print(f"Error searching for FFmpeg: {e}", file=sys.stderr)
 
     return False
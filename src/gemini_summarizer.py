@@ -1,32 +1,60 @@
 
-import google.generativeai as genai
 import os
 
+from .lazy_import import LazyModule
+from .summary_cache import HIT, MISS
+
+# google.generativeai は読み込みが重いため、要約を実行するときまでインポートしません
+genai = LazyModule("google.generativeai")
+
 class GeminiSummarizer:
-    def __init__(self, api_key, model="gemini-pro"):
+    def __init__(self, api_key, model="gemini-pro", cache=None):
         self.api_key = api_key
         self.model_name = model
+        # SummaryCache を渡すと、同じ文字起こし・モデル・プロンプトの要約を保存して使い回します
+        self.cache = cache
+        self.cache_status = None
         if self.api_key:
             genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel(self.model_name)
         else:
             self.model = None
 
-    def summarize(self, text, prompt_prefix="以下の文章を要点ごとに箇条書きで要約してください:\n\n"):
+    def summarize(self, text, prompt_prefix="以下の文章を要点ごとに箇条書きで要約してください:\n\n", stream_callback=None):
         """
         Gemini APIを使って要約を生成する
+        stream_callback: 部分的なテキストを受け取る関数 (text_chunk) -> None
+        APIキーがない場合やAPIの呼び出しに失敗した場合は例外を投げる。
         """
         if not self.api_key:
-            return "APIキーが設定されていません。"
+            raise ValueError("APIキーが設定されていません。")
         
         if not text:
             return "テキストが空です。"
 
-        try:
-            response = self.model.generate_content(f"{prompt_prefix}{text}")
-            return response.text
-        except Exception as e:
-            return f"エラーが発生しました: {str(e)}"
+        key = None
+        self.cache_status = None
+        if self.cache:
+            key = self.cache.key(text, "gemini", self.model_name, prompt_prefix)
+            cached = self.cache.get_summary(key)
+            self.cache_status = HIT if cached is not None else MISS
+            if cached is not None:
+                if stream_callback:
+                    stream_callback(cached)
+                return cached
+
+        if not stream_callback:
+            summary = self.model.generate_content(f"{prompt_prefix}{text}").text
+        else:
+            summary = ""
+            for chunk in self.model.generate_content(f"{prompt_prefix}{text}", stream=True):
+                if chunk.text:
+                    summary += chunk.text
+                    stream_callback(chunk.text)
+
+        if key and summary:
+            self.cache.put_summary(key, summary)
+        return summary
 
     def update_api_key(self, api_key):
         self.api_key = api_key
@@ -0,0 +1,104 @@
+import sys
+import threading
+
+# 途中経過の要約を更新する間隔（音声の秒数）
+WINDOW_SECONDS = 300
+
+
+class IncrementalSummarizer:
+    """
+    文字起こし中に届くセグメントを window_seconds ごとの区間にまとめ、区間が揃うたびに
+    バックグラウンドで途中経過の要約を更新する。
+    update(前回までの要約, 新しい区間のテキスト) で要約を作り直すので、最初から要約し直すことはなく、
+    文字起こしが終わった時点では最後の区間を反映するだけで要約ができあがる。
+    """
+
+    def __init__(self, update, window_seconds=WINDOW_SECONDS, update_callback=None):
+        self.update = update
+        self.window_seconds = window_seconds
+        # update_callback(summary, seconds): 要約を更新するたびに、音声の何秒目までを反映したかと一緒に呼ばれる
+        self.update_callback = update_callback
+        self.summary = ""
+        self.covered_seconds = 0.0
+        self.updates = 0
+        self.error = None
+        self.window = []
+        self.window_end = window_seconds
+        self.last_end = 0.0
+        self.pending = []
+        self.finished = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def add_segment(self, segment):
+        """
+        確定したセグメント（start / end / text）を追加する。どのスレッドから呼んでもよい。
+        """
+        with self.condition:
+            if self.finished:
+                return
+            text = segment["text"].strip()
+            if text:
+                self.window.append(text)
+            self.last_end = max(self.last_end, segment["end"])
+            if self.last_end >= self.window_end:
+                self._submit_window()
+                while self.window_end <= self.last_end:
+                    self.window_end += self.window_seconds
+
+    def _submit_window(self):
+        if self.window:
+            self.pending.append(("\n".join(self.window), self.last_end))
+            self.window = []
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.finished:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                # 要約が文字起こしに追いつかないときは、たまった区間をまとめて1回で反映します
+                text = "\n".join(window_text for window_text, _ in self.pending)
+                seconds = self.pending[-1][1]
+                self.pending = []
+                previous = self.summary
+
+            try:
+                summary = self.update(previous, text)
+            except Exception as e:
+                # 途中の区間が抜けた要約にならないよう、以降の更新はやめて通常の要約に任せます
+                print(f"Incremental summary failed: {e}", file=sys.stderr)
+                with self.condition:
+                    self.error = str(e)
+                    self.finished = True
+                    self.pending = []
+                return
+
+            with self.condition:
+                self.summary = summary
+                self.covered_seconds = seconds
+                self.updates += 1
+            if self.update_callback:
+                self.update_callback(summary, seconds)
+
+    def finish(self, timeout=None):
+        """
+        最後の区間を反映し、要約ができるまで待って返す。更新に失敗していた場合は None を返す。
+        """
+        with self.condition:
+            if not self.finished:
+                self._submit_window()
+                self.finished = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+        return None if self.error else self.summary
+
+    def cancel(self):
+        with self.condition:
+            self.finished = True
+            self.pending = []
+            self.window = []
+            self.condition.notify_all()
@@ -0,0 +1,222 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+from .audio import DecodedAudio, SUPPORTED_EXTENSIONS
+from .result_io import ResultWriter, build_result_data, save_timing_json
+
+# ジョブの状態
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueue:
+    """
+    複数ファイルの文字起こしジョブを管理するキュー。
+    状態は毎回ディスクに保存されるため、途中でアプリが落ちても続きから再開できる。
+    """
+
+    def __init__(self, state_file="job_queue.json"):
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        self.jobs = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return []
+
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                jobs = json.load(f).get("jobs", [])
+        except Exception as e:
+            print(f"Error loading job queue: {e}", file=sys.stderr)
+            return []
+
+        # 実行中のままになっているジョブは前回クラッシュしたものなので、未処理に戻します
+        for job in jobs:
+            if job["status"] == RUNNING:
+                job["status"] = PENDING
+        return jobs
+
+    def save(self):
+        with self.lock:
+            data = {"jobs": self.jobs}
+        tmp_path = self.state_file + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            print(f"Error saving job queue: {e}", file=sys.stderr)
+
+    def add_files(self, paths, output_dir=None):
+        """
+        ファイルをキューに追加する。未処理のまま残っている同じファイルは重複して追加しない。
+        追加したジョブのリストを返す。
+        """
+        added = []
+        with self.lock:
+            queued = {job["path"] for job in self.jobs if job["status"] in (PENDING, RUNNING)}
+            for path in paths:
+                path = os.path.abspath(path)
+                if path in queued or os.path.splitext(path)[1].lower() not in SUPPORTED_EXTENSIONS:
+                    continue
+                job = {
+                    "id": uuid.uuid4().hex,
+                    "path": path,
+                    "output_dir": output_dir,
+                    "status": PENDING,
+                    "error": None,
+                    "audio_seconds": None,
+                    "wall_seconds": None,
+                }
+                self.jobs.append(job)
+                queued.add(path)
+                added.append(job)
+        self.save()
+        return added
+
+    def add_directory(self, directory, output_dir=None, recursive=False):
+        """
+        フォルダ内の対応形式の音声ファイルをすべてキューに追加する。
+        """
+        paths = []
+        if recursive:
+            for root, _, files in os.walk(directory):
+                paths.extend(os.path.join(root, name) for name in files)
+        else:
+            paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+        return self.add_files(sorted(paths), output_dir=output_dir)
+
+    def pending_jobs(self):
+        with self.lock:
+            return [job for job in self.jobs if job["status"] == PENDING]
+
+    def update(self, job, **fields):
+        with self.lock:
+            job.update(fields)
+        self.save()
+
+    def clear_finished(self):
+        """
+        完了・失敗したジョブをキューから取り除く。
+        """
+        with self.lock:
+            self.jobs = [job for job in self.jobs if job["status"] in (PENDING, RUNNING)]
+        self.save()
+
+    def clear(self):
+        """
+        未処理のジョブも含めて、実行中以外のジョブをすべてキューから取り除く（中断した一括処理を再開しない場合に使う）。
+        """
+        with self.lock:
+            self.jobs = [job for job in self.jobs if job["status"] == RUNNING]
+        self.save()
+
+    def stats(self):
+        """
+        完了したジョブの合計と、全体のスループット（音声秒数 / 実時間秒数）を返す。
+        """
+        with self.lock:
+            done = [job for job in self.jobs if job["status"] == DONE]
+            audio_seconds = sum(job["audio_seconds"] or 0.0 for job in done)
+            wall_seconds = sum(job["wall_seconds"] or 0.0 for job in done)
+            return {
+                "total": len(self.jobs),
+                "done": len(done),
+                "failed": sum(1 for job in self.jobs if job["status"] == FAILED),
+                "pending": sum(1 for job in self.jobs if job["status"] == PENDING),
+                "audio_seconds": audio_seconds,
+                "wall_seconds": wall_seconds,
+                "throughput": audio_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+            }
+
+
+class BatchRunner:
+    """
+    JobQueue の未処理ジョブを順番に文字起こしする。
+    同じ Transcriber を使い続けるので、Whisperモデルはジョブ間でロードされたまま再利用される。
+    """
+
+    def __init__(self, transcriber, job_queue, model_name="base", hf_token=None,
+                 job_callback=None, progress_callback=None, text_callback=None):
+        self.transcriber = transcriber
+        self.job_queue = job_queue
+        self.model_name = model_name
+        self.hf_token = hf_token
+        # job_callback(job, number, total): ジョブの開始・終了時に呼ばれる（number はそのジョブの1始まりの番号）
+        self.job_callback = job_callback
+        self.progress_callback = progress_callback
+        self.text_callback = text_callback
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        """
+        現在のジョブが終わったところで停止する。
+        """
+        self.stop_event.set()
+
+    def output_path(self, job):
+        directory = job.get("output_dir") or os.path.dirname(job["path"])
+        stem = os.path.splitext(os.path.basename(job["path"]))[0]
+        return os.path.join(directory, f"{stem}.json")
+
+    def run_job(self, job):
+        self.job_queue.update(job, status=RUNNING, error=None)
+        start_time = time.perf_counter()
+        output = self.output_path(job)
+        # セグメントは文字起こし中から出力先に追記していきます
+        writer = ResultWriter(output)
+        try:
+            audio = DecodedAudio.from_source(job["path"])
+            result = self.transcriber.transcribe(
+                audio, self.model_name,
+                progress_callback=self.progress_callback,
+                text_callback=self.text_callback,
+                hf_token=self.hf_token,
+                segment_callback=writer.add_segment
+            )
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            writer.finalize(build_result_data(result["text"]), result.get("segments"))
+            if "timing" in result:
+                save_timing_json(output, result["timing"])
+
+            wall_seconds = time.perf_counter() - start_time
+            audio_seconds = audio.duration
+            self.job_queue.update(
+                job, status=DONE, output=output,
+                audio_seconds=audio_seconds, wall_seconds=wall_seconds,
+                throughput=audio_seconds / wall_seconds if wall_seconds > 0 else 0.0
+            )
+            print(f"Finished {job['path']} ({audio_seconds:.1f}s audio in {wall_seconds:.1f}s)", file=sys.stderr)
+        except Exception as e:
+            writer.close()
+            print(f"Job failed {job['path']}: {e}", file=sys.stderr)
+            self.job_queue.update(job, status=FAILED, error=str(e),
+                                  wall_seconds=time.perf_counter() - start_time)
+
+    def run(self):
+        """
+        未処理のジョブがなくなるか stop() が呼ばれるまで処理を続ける。
+        最後に全体の統計を返す。
+        """
+        self.stop_event.clear()
+        jobs = self.job_queue.pending_jobs()
+        for index, job in enumerate(jobs):
+            if self.stop_event.is_set():
+                break
+            if self.job_callback:
+                self.job_callback(job, index + 1, len(jobs))
+            self.run_job(job)
+            if self.job_callback:
+                self.job_callback(job, index + 1, len(jobs))
+
+        stats = self.job_queue.stats()
+        print(f"Batch finished: {stats['done']} done, {stats['failed']} failed, "
+              f"throughput {stats['throughput']:.2f}x real-time", file=sys.stderr)
+        return stats
@@ -0,0 +1,51 @@
+import importlib
+import sys
+import threading
+
+
+class LazyModule:
+    """
+    最初に属性へアクセスしたときに初めてインポートされるモジュールの代理オブジェクト。
+    whisper / torch / pyannote のような重いライブラリの読み込みを、
+    実際に必要になるまで（または warm_up が呼ばれるまで）遅らせるために使う。
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def is_loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def warm_up(*modules):
+    """
+    バックグラウンドのスレッドで LazyModule を読み込んでおく。
+    ユーザーがファイルを選んでいる間にインポートを済ませ、最初の処理開始を速くする。
+    """
+    def _load_all():
+        for module in modules:
+            try:
+                module._load()
+            except Exception as e:
+                print(f"Warm-up import failed for {module._name}: {e}", file=sys.stderr)
+
+    thread = threading.Thread(target=_load_all, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,298 @@
+"""
+マイクなどから流れてくる音声を、録音しながら文字起こしする（ライブ文字起こし）。
+
+確定していない末尾の音声（バッファ）だけを一定間隔でデコードし直し、
+連続する2回のデコードで同じ結果になったセグメントを「確定」としてバッファから取り除く。
+確定した部分は二度とデコードしないため、会議が長くなっても1回のデコードの重さは変わらない。
+まだ変わる可能性のある末尾は「仮」のテキストとして表示する。
+"""
+import importlib.util
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .audio import DecodedAudio, SAMPLE_RATE
+from .lazy_import import LazyModule
+from .segment_events import SegmentEvent
+from .vad import frame_energies
+
+# マイク入力用（任意の依存パッケージ。pip install "mojiokoshi[live]" で入る）
+sounddevice = LazyModule("sounddevice")
+
+# 新しい音声がこの秒数たまるごとにバッファをデコードし直す
+STEP_SECONDS = 1.0
+# バッファがこの秒数を超えたら、一致を待たずに確定させて遅延を抑える（Whisperの窓30秒より短くする）
+MAX_BUFFER_SECONDS = 20.0
+# バッファの終端からこの秒数以内で終わるセグメントは、まだ話し途中の可能性があるので確定させない
+EDGE_MARGIN_SECONDS = 1.0
+# 新しい音声の最大音量がこれより小さければ無音とみなし、デコードしない（無音での幻聴を防ぐ）
+SILENCE_DB = -45.0
+# 無音のときに残しておくバッファの長さ（話し始めの直前の音を切らないため）
+SILENCE_KEEP_SECONDS = 0.5
+# 確定したテキストのうち、文脈としてプロンプトに渡す最大文字数
+PROMPT_MAX_CHARS = 200
+
+
+def microphone_available():
+    """
+    マイク入力に使う sounddevice がインストールされているか（インポートはしない）。
+    """
+    return importlib.util.find_spec("sounddevice") is not None
+
+
+class MicrophoneSource:
+    """
+    マイクから 16kHz モノラルのPCMを受け取る音声ソース。
+    録音はコールバックでキューに入れるので、デコード中に届いた音声も失われない。
+    """
+
+    def __init__(self, device=None, block_seconds=0.1):
+        self.device = device
+        self.block_seconds = block_seconds
+        self.frames = queue.Queue()
+        self.closed = threading.Event()
+        self.stream = None
+
+    def start(self):
+        try:
+            self.stream = sounddevice.InputStream(
+                samplerate=SAMPLE_RATE, channels=1, dtype="float32", device=self.device,
+                blocksize=int(self.block_seconds * SAMPLE_RATE), callback=self._callback,
+            )
+        except ImportError as e:
+            raise RuntimeError('マイク入力には sounddevice が必要です（pip install "mojiokoshi[live]"）') from e
+        self.stream.start()
+
+    def _callback(self, indata, frames, time_info, status):
+        self.frames.put(indata[:, 0].copy())
+
+    def read(self, timeout=0.5):
+        """
+        届いている音声をまとめて返す。何も届いていなければ少し待ち、録音を止めた後は None を返す。
+        """
+        if self.stream is None:
+            if self.closed.is_set():
+                return None
+            self.start()
+        blocks = []
+        try:
+            blocks.append(self.frames.get(timeout=timeout))
+            while True:
+                blocks.append(self.frames.get_nowait())
+        except queue.Empty:
+            pass
+        if blocks:
+            return np.concatenate(blocks)
+        return None if self.closed.is_set() else np.zeros(0, dtype=np.float32)
+
+    def close(self):
+        self.closed.set()
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+
+
+class FileReplaySource:
+    """
+    音声ファイルを実際の再生速度で少しずつ返す音声ソース（マイクの代わりにテストや計測で使う）。
+    realtime=False にすると待たずに全て返す。
+    """
+
+    def __init__(self, audio_path, block_seconds=0.1, realtime=True):
+        self.audio = DecodedAudio.from_source(audio_path)
+        self.block = int(block_seconds * SAMPLE_RATE)
+        self.realtime = realtime
+        self.position = 0
+        self.started = None
+        self.closed = threading.Event()
+
+    def read(self, timeout=0.5):
+        samples = self.audio.samples
+        if self.closed.is_set() or self.position >= len(samples):
+            return None
+        if self.started is None:
+            self.started = time.monotonic()
+
+        if self.realtime:
+            # 再生開始からの経過時間までに「録音された」音声を返します（最低1ブロック分は待ちます）
+            due = self.position + self.block
+            wait = self.started + due / SAMPLE_RATE - time.monotonic()
+            if wait > 0:
+                self.closed.wait(min(wait, timeout))
+            elapsed = int((time.monotonic() - self.started) * SAMPLE_RATE)
+            end = min(max(elapsed // self.block * self.block, self.position), len(samples))
+        else:
+            end = len(samples)
+
+        chunk = samples[self.position:end]
+        self.position = end
+        return np.asarray(chunk, dtype=np.float32)
+
+    def close(self):
+        self.closed.set()
+
+
+@dataclass
+class LiveUpdate:
+    """
+    ライブ文字起こしでデコードするたびに流れてくる更新。
+    committed は今回新しく確定したセグメント、tentative はまだ変わる可能性のある末尾のテキスト。
+    latency_seconds は最後に届いた音声を受け取ってから、この更新を返すまでにかかった秒数。
+    """
+    committed: list = field(default_factory=list)
+    tentative: str = ""
+    position: float = 0.0
+    latency_seconds: float = 0.0
+
+
+class LiveTranscriptionStream:
+    """
+    音声ソースからPCMを受け取りながら文字起こしし、LiveUpdate を順に返すイテレーター。
+    ソースの close() で録音を止めると、残りのバッファを確定させてから終了する。
+    """
+
+    def __init__(self, model, source, language=None, step_seconds=STEP_SECONDS,
+                 max_buffer_seconds=MAX_BUFFER_SECONDS, decode_options=None):
+        self.model = model
+        self.source = source
+        self.language = language
+        self.step = int(step_seconds * SAMPLE_RATE)
+        self.max_buffer = int(max_buffer_seconds * SAMPLE_RATE)
+        self.decode_options = decode_options or {}
+
+        # 確定していない音声と、その先頭の（録音開始からの）サンプル位置
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_offset = 0
+        # 前回のデコード結果のテキスト（次のデコードと一致すれば確定させる）
+        self.previous = []
+        self.segments = []
+        self.prompt = ""
+        self.received_at = None
+
+    @property
+    def received_samples(self):
+        return self.buffer_offset + len(self.buffer)
+
+    def stop(self):
+        self.source.close()
+
+    def __iter__(self):
+        pending = 0
+        while True:
+            chunk = self.source.read()
+            if chunk is None:
+                break
+            if len(chunk) == 0:
+                continue
+            self.received_at = time.monotonic()
+            self.buffer = np.concatenate((self.buffer, chunk))
+            pending += len(chunk)
+            if pending < self.step:
+                continue
+
+            new_audio = self.buffer[-pending:]
+            pending = 0
+            if self._is_silent(new_audio):
+                update = self._skip_silence()
+            else:
+                update = self._decode(final=False)
+            if update is not None:
+                yield update
+
+        # 録音を止めたら、残りの音声をすべて確定させます
+        if len(self.buffer) and not self._is_silent(self.buffer):
+            yield self._decode(final=True)
+        else:
+            yield LiveUpdate(position=self.received_samples / SAMPLE_RATE)
+
+    def _is_silent(self, samples):
+        energies = frame_energies(samples)
+        return len(energies) == 0 or float(np.max(energies)) < SILENCE_DB
+
+    def _skip_silence(self):
+        """
+        無音が続いている間は、末尾だけ残してバッファを捨てる（仮のテキストがなければ何も返さない）。
+        """
+        if self.previous:
+            # 話し終わった後の無音なので、残っている仮のテキストを確定させます
+            return self._decode(final=True)
+        keep = int(SILENCE_KEEP_SECONDS * SAMPLE_RATE)
+        if len(self.buffer) > keep:
+            self.buffer_offset += len(self.buffer) - keep
+            self.buffer = self.buffer[-keep:]
+        return None
+
+    def _decode(self, final):
+        result = self.model.transcribe(
+            self.buffer, verbose=None, fp16=False,
+            language=self.language,
+            initial_prompt=self.prompt or None,
+            condition_on_previous_text=False,
+            **self.decode_options
+        )
+        if not self.language:
+            self.language = result.get("language")
+
+        segments = [seg for seg in result.get("segments", []) if seg["text"].strip()]
+        count = len(segments) if final else self._agreed_count(segments)
+        committed = self._commit(segments[:count])
+        remaining = segments[count:]
+        self.previous = [seg["text"].strip() for seg in remaining]
+
+        return LiveUpdate(
+            committed=committed,
+            tentative="".join(seg["text"] for seg in remaining).strip(),
+            position=self.received_samples / SAMPLE_RATE,
+            latency_seconds=time.monotonic() - self.received_at if self.received_at else 0.0,
+        )
+
+    def _agreed_count(self, segments):
+        """
+        先頭から何個のセグメントを確定させるかを返す。
+        前回のデコードと同じテキストで、バッファの終端から離れて終わっているセグメントを確定させる。
+        バッファが長くなりすぎた場合は、一致しなくても最後の1つ以外を確定させる。
+        """
+        limit = len(self.buffer) / SAMPLE_RATE - EDGE_MARGIN_SECONDS
+        count = 0
+        for index, seg in enumerate(segments[:-1]):
+            if seg["end"] > limit or index >= len(self.previous) or seg["text"].strip() != self.previous[index]:
+                break
+            count = index + 1
+
+        if count == 0 and len(self.buffer) >= self.max_buffer:
+            count = max(len(segments) - 1, 0)
+            if count == 0:
+                # 1つのセグメントが長く続いている場合は、そのまま確定させて先へ進みます
+                count = len(segments)
+        return count
+
+    def _commit(self, segments):
+        if not segments:
+            if len(self.buffer) >= self.max_buffer:
+                # 何も聞き取れないまま長くなったバッファは捨てます
+                self.buffer_offset += len(self.buffer)
+                self.buffer = self.buffer[:0]
+            return []
+
+        offset = self.buffer_offset / SAMPLE_RATE
+        events = []
+        for seg in segments:
+            events.append(SegmentEvent(
+                start=offset + seg["start"],
+                end=offset + seg["end"],
+                text=seg["text"].strip(),
+                avg_logprob=seg.get("avg_logprob", 0.0),
+                progress=0.0,
+                no_speech_prob=seg.get("no_speech_prob", 0.0),
+            ))
+        self.segments.extend(events)
+        self.prompt = (self.prompt + "".join(event.text for event in events))[-PROMPT_MAX_CHARS:]
+
+        # 確定した部分をバッファから取り除きます（以後この部分はデコードしません）
+        cut = min(int(segments[-1]["end"] * SAMPLE_RATE), len(self.buffer))
+        self.buffer_offset += cut
+        self.buffer = self.buffer[cut:]
+        return events
@@ -0,0 +1,148 @@
+import random
+import sys
+import threading
+import time
+
+from .lazy_import import LazyModule
+
+# openai は要約を実行するときまでインポートしません
+openai = LazyModule("openai")
+
+# 1つのエンドポイントに同時に送るリクエストの上限（要約の分割・同時実行・一括処理で共有する）
+MAX_IN_FLIGHT = 4
+# 一時的なエラー（接続失敗・タイムアウト・429・5xx）をやり直す回数と、最初の待ち時間（秒）。待ち時間は毎回2倍にする
+RETRIES = 3
+BACKOFF_SECONDS = 1.0
+# モデル一覧を使い回す時間（秒）
+MODELS_TTL_SECONDS = 60
+
+# やり直す価値のある例外（openai をインポートせずに判定するため、クラス名で比べます）
+TRANSIENT_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "ConnectionError", "TimeoutError"}
+
+
+def is_transient_error(error):
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def _create_openai_client(base_url, api_key):
+    # やり直しはこちらで行うので、クライアント自身のリトライは無効にします
+    return openai.OpenAI(base_url=base_url, api_key=api_key, max_retries=0)
+
+
+class LLMEndpoint:
+    """
+    1つのエンドポイント（base_url, api_key）で共有するクライアント。
+    HTTP接続はクライアントの中で使い回され、同時に送るリクエストは max_in_flight 件までに制限する。
+    """
+
+    def __init__(self, client, max_in_flight=MAX_IN_FLIGHT, retries=RETRIES,
+                 backoff_seconds=BACKOFF_SECONDS, models_ttl=MODELS_TTL_SECONDS):
+        self.client = client
+        self.max_in_flight = max(1, max_in_flight or 1)
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.models_ttl = models_ttl
+        self.semaphore = threading.BoundedSemaphore(self.max_in_flight)
+        self.lock = threading.Lock()
+        self.models = None
+        self.models_fetched_at = 0.0
+
+    def call(self, request):
+        """
+        request(emitted) を同時実行数の上限の中で実行し、一時的なエラーなら待ってからやり直す。
+        request は途中の結果を呼び出し側に渡したときに emitted() を呼ぶ
+        （ストリームの途中で失敗した場合は、同じ出力が重複しないようにやり直さない）。
+        """
+        attempt = 0
+        while True:
+            emitted = False
+
+            def mark_emitted():
+                nonlocal emitted
+                emitted = True
+
+            try:
+                with self.semaphore:
+                    return request(mark_emitted)
+            except Exception as e:
+                if emitted or attempt >= self.retries or not is_transient_error(e):
+                    raise
+                delay = self.backoff_seconds * 2 ** attempt
+                delay += random.uniform(0, delay / 2)
+                attempt += 1
+                print(f"LLM request failed ({e}), retrying in {delay:.1f}s ({attempt}/{self.retries})", file=sys.stderr)
+                time.sleep(delay)
+
+    def list_models(self, refresh=False):
+        """
+        利用可能なモデルIDのリスト。取得した一覧は models_ttl 秒のあいだ使い回す。
+        """
+        with self.lock:
+            if not refresh and self.models is not None and time.monotonic() - self.models_fetched_at < self.models_ttl:
+                return list(self.models)
+
+        models = self.call(lambda emitted: [m.id for m in self.client.models.list().data])
+        with self.lock:
+            self.models = models
+            self.models_fetched_at = time.monotonic()
+        return list(models)
+
+    def close(self):
+        close = getattr(self.client, "close", None)
+        if close:
+            close()
+
+
+class LLMClientPool:
+    """
+    (base_url, api_key) ごとに LLMEndpoint を1つだけ作り、アプリ全体で使い回すプール。
+    要約のたびにクライアントとHTTP接続を作り直さずに済み、同じエンドポイントへの同時リクエスト数もまとめて制限できる。
+    """
+
+    def __init__(self, factory=_create_openai_client, max_in_flight=MAX_IN_FLIGHT, retries=RETRIES,
+                 backoff_seconds=BACKOFF_SECONDS, models_ttl=MODELS_TTL_SECONDS):
+        self.factory = factory
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.models_ttl = models_ttl
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def get(self, base_url, api_key):
+        key = (base_url, api_key)
+        with self.lock:
+            endpoint = self.endpoints.get(key)
+            if endpoint is None:
+                endpoint = self.endpoints[key] = LLMEndpoint(
+                    self.factory(base_url, api_key),
+                    max_in_flight=self.max_in_flight,
+                    retries=self.retries,
+                    backoff_seconds=self.backoff_seconds,
+                    models_ttl=self.models_ttl
+                )
+            return endpoint
+
+    def close(self):
+        with self.lock:
+            endpoints = list(self.endpoints.values())
+            self.endpoints.clear()
+        for endpoint in endpoints:
+            try:
+                endpoint.close()
+            except Exception as e:
+                print(f"Failed to close LLM client: {e}", file=sys.stderr)
+
+
+def build_llm_pool(config):
+    """
+    config.json の local_llm セクションから LLMClientPool を作る。
+    """
+    return LLMClientPool(
+        max_in_flight=config.get("max_in_flight", MAX_IN_FLIGHT),
+        retries=config.get("retries", RETRIES),
+        models_ttl=config.get("models_ttl_seconds", MODELS_TTL_SECONDS)
+    )
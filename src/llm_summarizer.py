@@ -1,65 +1,182 @@
-
-from openai import OpenAI
+import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .llm_client_pool import LLMClientPool
+from .summary_cache import HIT, MISS
+from .text_chunker import TokenCounter, split_transcript
+
+# 1回のリクエストで送る文字起こしの最大トークン数（これを超える場合は分割して要約する）
+CHUNK_TOKENS = 3000
+# 分割した部分を同時に要約するリクエスト数
+MAX_PARALLEL = 2
+
+MAP_PROMPT = "以下は会議の文字起こしの一部（{index}/{total}）です。重要な発言・決定事項・課題を漏らさず箇条書きで要約してください:\n\n"
+REDUCE_PROMPT = "以下は会議の文字起こしを部分ごとに要約したものです。重複をまとめ、全体の要約を作成してください:\n\n"
+# 部分の要約を合わせてもまだ長いときに、途中でまとめ直すためのプロンプト
+GROUP_PROMPT = "以下は会議の文字起こしを部分ごとに要約したもの（{index}/{total}）です。重複をまとめて箇条書きにしてください:\n\n"
+# まとめ直す段階の上限（要約が短くならないモデルで無限に繰り返さないため）
+MAX_REDUCE_LEVELS = 3
+# 文字起こし中に途中経過の要約を更新するためのプロンプト
+ROLLING_PROMPT = "以下は会議のこれまでの要約と、その続きの文字起こしです。続きの内容を反映して、会議全体の要約を作成し直してください:\n\n【これまでの要約】\n{summary}\n\n【続きの文字起こし】\n"
+
 
 class LocalLLMSummarizer:
-    def __init__(self, base_url="http://localhost:11434/v1", api_key="ollama", model="llama3"):
+    def __init__(self, base_url="http://localhost:11434/v1", api_key="ollama", model="llama3",
+                 chunk_tokens=CHUNK_TOKENS, max_parallel=MAX_PARALLEL, pool=None, cache=None):
         self.base_url = base_url
         self.api_key = api_key
         self.model = model
-        self.client = OpenAI(
-            base_url=self.base_url,
-            api_key=self.api_key
-        )
+        # アプリ全体で共有するプールを渡すと、同じエンドポイントのクライアントと接続を使い回します
+        pool = pool or LLMClientPool()
+        self.endpoint = pool.get(self.base_url, self.api_key)
+        self.client = self.endpoint.client
+        # 長い文字起こしを分割するときの1チャンクのトークン数と、同時に送るリクエスト数
+        self.chunk_tokens = chunk_tokens
+        self.max_parallel = max(1, max_parallel or 1)
+        self.token_counter = TokenCounter()
+        # SummaryCache を渡すと、同じ文字起こし・モデル・プロンプトの要約を保存して使い回します
+        self.cache = cache
+        # 直近の summarize がキャッシュを使えたか（"hit" / "miss"、キャッシュなしなら None）
+        self.cache_status = None
 
-    def summarize(self, text, prompt_prefix="以下の文章を要約してください:\n\n", stream_callback=None):
+    def summarize(self, text, prompt_prefix="以下の文章を要約してください:\n\n", stream_callback=None,
+                  progress_callback=None):
         """
         ローカルLLMを使って要約を生成する
         stream_callback: 部分的なテキストを受け取る関数 (text_chunk) -> None
+        progress_callback: 分割して要約するときに、終わった部分の数を受け取る関数 (done, total) -> None
+
+        文字起こしが chunk_tokens を超える場合は、話者や文の区切りで分割して部分ごとに同時に要約し、
+        部分の要約をまとめて最終的な要約を作る（最終段階だけを stream_callback に流す）。
+        キャッシュに同じ要約があれば、LLMを呼ばずに全体を一度に stream_callback に渡して返す。
+        LLMへのリクエストが失敗したときは例外を投げる。
         """
         if not text:
             return "テキストが空です。"
 
-        try:
+        key = None
+        self.cache_status = None
+        if self.cache:
+            key = self.cache.key(text, "local_llm", self.model, prompt_prefix, {"chunk_tokens": self.chunk_tokens})
+            cached = self.cache.get_summary(key)
+            self.cache_status = HIT if cached is not None else MISS
+            if cached is not None:
+                if stream_callback:
+                    stream_callback(cached)
+                return cached
+
+        if self.chunk_tokens and self.token_counter.count(text) > self.chunk_tokens:
+            summary = self._summarize_hierarchical(text, stream_callback, progress_callback)
+        else:
+            summary = self._complete(f"{prompt_prefix}{text}", stream_callback)
+
+        # 空の要約は保存しません
+        if key and summary:
+            self.cache.put_summary(key, summary)
+        return summary
+
+    def update_summary(self, previous_summary, text, prompt_prefix="以下の文章を要約してください:\n\n"):
+        """
+        途中までの要約に続きの文字起こしを反映した要約を返す（IncrementalSummarizer から呼ばれる）。
+        続きが chunk_tokens を超える場合は、分割した順に1つずつ反映する。
+        失敗したときは例外を投げる。
+        """
+        summary = previous_summary
+        chunks = split_transcript(text, self.chunk_tokens, self.token_counter) if self.chunk_tokens else [text]
+        for chunk in chunks:
+            if summary:
+                summary = self._complete(ROLLING_PROMPT.format(summary=summary) + chunk)
+            else:
+                summary = self._complete(f"{prompt_prefix}{chunk}")
+        return summary
+
+    def _complete(self, prompt, stream_callback=None):
+        def request(emitted):
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that summarizes text."},
-                    {"role": "user", "content": f"{prompt_prefix}{text}"}
+                    {"role": "user", "content": prompt}
                 ],
                 stream=True  # 常にストリーム有効にする（コールバックがない場合は全部結合して返す）
             )
-            
+
             full_text = ""
             for chunk in response:
                 if chunk.choices[0].delta.content:
                     content = chunk.choices[0].delta.content
                     full_text += content
                     if stream_callback:
+                        emitted()
                         stream_callback(content)
-            
+
             return full_text
-        except Exception as e:
-            return f"エラーが発生しました: {str(e)}"
+
+        # 同時実行数の上限を守り、一時的なエラーはやり直します
+        return self.endpoint.call(request)
+
+    def _summarize_hierarchical(self, text, stream_callback=None, progress_callback=None):
+        """
+        分割して要約する（map）→ 部分の要約をまとめる（reduce）。
+        部分の要約を合わせてもまだ長い場合は、収まるまで reduce を繰り返す。
+        """
+        chunks = split_transcript(text, self.chunk_tokens, self.token_counter)
+        print(f"Summarizing {len(chunks)} chunks (up to {self.max_parallel} at a time)...", file=sys.stderr)
+        summaries = self._map(chunks, MAP_PROMPT, progress_callback)
+
+        combined = "\n\n".join(summary.strip() for summary in summaries)
+        for _ in range(MAX_REDUCE_LEVELS):
+            groups = split_transcript(combined, self.chunk_tokens, self.token_counter)
+            if len(groups) <= 1:
+                break
+            summaries = self._map(groups, GROUP_PROMPT)
+            combined = "\n\n".join(summary.strip() for summary in summaries)
+
+        return self._complete(f"{REDUCE_PROMPT}{combined}", stream_callback)
+
+    def _map(self, chunks, prompt_template, progress_callback=None):
+        """
+        チャンクごとに要約を作る。最大 max_parallel 件を同時にリクエストし、元の順番で返す。
+        """
+        total = len(chunks)
+        done = 0
+        lock = threading.Lock()
+
+        def summarize_chunk(index):
+            nonlocal done
+            start = time.perf_counter()
+            prompt = prompt_template.format(index=index + 1, total=total) + chunks[index]
+            summary = self._complete(prompt)
+            elapsed = time.perf_counter() - start
+            # 終わった数が前後して表示されないよう、ログと進捗の通知はロックの中で行います
+            with lock:
+                done += 1
+                print(f"Chunk {index + 1}/{total} summarized in {elapsed:.1f}s ({done}/{total})", file=sys.stderr)
+                if progress_callback:
+                    progress_callback(done, total)
+            return summary
+
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, total)) as executor:
+            return list(executor.map(summarize_chunk, range(total)))
 
     def check_connection(self):
         """
         接続確認を行う
         """
         try:
-            self.client.models.list()
+            self.endpoint.list_models(refresh=True)
             return True, "接続成功"
         except Exception as e:
             return False, f"接続失敗: {str(e)}"
 
     def get_models(self):
         """
-        利用可能なモデル一覧を取得する
+        利用可能なモデル一覧を取得する（しばらくの間は前回取得した一覧を使い回す）
         """
         try:
-            models = self.client.models.list()
-            return [m.id for m in models.data]
+            return self.endpoint.list_models()
         except Exception as e:
-            print(f"Error fetching models: {e}")
+            print(f"Error fetching models: {e}", file=sys.stderr)
             return []
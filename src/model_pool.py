@@ -0,0 +1,110 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+def model_bytes(model):
+    """
+    モデルのパラメーターとバッファーが使うメモリ量（バイト）を求める。
+    torch のモデル以外（テスト用のモックなど）では 0 を返す。
+    """
+    total = 0
+    try:
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            total += tensor.numel() * tensor.element_size()
+        # int8 に量子化した全結合層の重みはパラメーターとして見えないため、別に数えます
+        for module in model.modules():
+            if hasattr(module, "_packed_params") and callable(getattr(module, "weight", None)):
+                weight = module.weight()
+                total += weight.numel() * weight.element_size()
+    except Exception:
+        return 0
+    return int(total)
+
+
+class ModelPool:
+    """
+    複数のWhisperモデルをメモリに載せたままにしておくプール。
+    合計サイズが max_bytes を超えたら、最後に使ったのが古いモデルから解放する（LRU）。
+    tiny でプレビューし small で本番、のように切り替えても、ディスクから読み直さずに済む。
+    """
+
+    def __init__(self, loader, max_bytes=4 * 1024 ** 3):
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.models = OrderedDict()  # モデル名 -> (モデル, バイト数)。末尾ほど最近使ったもの
+        self.lock = threading.Lock()
+        # 読み込み中のモデル名 -> 完了を知らせる Event（同じモデルを二重に読み込まないため）
+        self.loading = {}
+
+    def __contains__(self, name):
+        with self.lock:
+            return name in self.models
+
+    def resident(self):
+        """
+        メモリにあるモデル名のリスト（古い順）。
+        """
+        with self.lock:
+            return list(self.models)
+
+    def total_bytes(self):
+        with self.lock:
+            return sum(size for _, size in self.models.values())
+
+    def get(self, name):
+        """
+        モデルを返す。メモリになければ読み込み、必要なら古いモデルを解放する。
+        """
+        while True:
+            with self.lock:
+                if name in self.models:
+                    self.models.move_to_end(name)
+                    return self.models[name][0]
+                event = self.loading.get(name)
+                if event is None:
+                    event = self.loading[name] = threading.Event()
+                    break
+            # 別のスレッド（バックグラウンドの先読みなど）が読み込み中なので、終わるのを待ちます
+            event.wait()
+
+        try:
+            model = self.loader(name)
+            size = model_bytes(model)
+            with self.lock:
+                self.models[name] = (model, size)
+                self._evict(keep=name)
+            return model
+        finally:
+            with self.lock:
+                del self.loading[name]
+            event.set()
+
+    def _evict(self, keep):
+        total = sum(size for _, size in self.models.values())
+        for name in list(self.models):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            _, size = self.models.pop(name)
+            total -= size
+            print(f"Unloaded Whisper model: {name} ({size / 1024 ** 2:.0f} MB)", file=sys.stderr)
+
+    def preload(self, name):
+        """
+        バックグラウンドのスレッドでモデルを読み込んでおく。
+        """
+        def _load():
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Preloading Whisper model {name} failed: {e}", file=sys.stderr)
+
+        thread = threading.Thread(target=_load, daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        with self.lock:
+            self.models.clear()
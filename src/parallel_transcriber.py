@@ -0,0 +1,223 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .audio import DecodedAudio, SAMPLE_RATE
+from .segment_events import SegmentEvent
+from .vad import find_split_points
+
+# 各チャンクの前後に余分にデコードする秒数（チャンク境界の単語を取りこぼさないため）
+CHUNK_OVERLAP_SECONDS = 2.0
+# デコード範囲の終端からこの秒数以内で終わるセグメントは途中で切れているとみなす
+EDGE_MARGIN_SECONDS = 1.0
+# 言語判定に使う先頭の秒数
+LANGUAGE_DETECT_SECONDS = 30
+
+# ワーカープロセス内で使い回すWhisperモデル（プロセスごとに1回だけロードする）
+_model = None
+
+
+def _init_worker(model_name, num_threads):
+    global _model
+    import torch
+    import whisper
+    from .quantization import is_quantized, load_quantized_model
+    if num_threads:
+        # ワーカーごとのスレッド数を制限し、プロセス同士でコアを取り合わないようにします
+        torch.set_num_threads(num_threads)
+    if is_quantized(model_name):
+        _model = load_quantized_model(model_name)
+    else:
+        _model = whisper.load_model(model_name, device="cpu")
+
+
+def _attach(shm_name, length):
+    shared = shared_memory.SharedMemory(name=shm_name)
+    samples = np.ndarray((length,), dtype=np.float32, buffer=shared.buf)
+    return shared, samples
+
+
+def _close(shared):
+    try:
+        shared.close()
+    except BufferError:
+        pass
+
+
+def _detect_language(shm_name, length):
+    shared, samples = _attach(shm_name, length)
+    try:
+        result = _model.transcribe(samples[:LANGUAGE_DETECT_SECONDS * SAMPLE_RATE].copy(),
+                                   verbose=None, fp16=False, condition_on_previous_text=False)
+        return result.get("language")
+    finally:
+        del samples
+        _close(shared)
+
+
+def _transcribe_chunk(shm_name, length, start, end, language):
+    """
+    共有メモリ上のPCMの [start, end) サンプルを文字起こしし、元の音声の時刻に直したセグメントを返す。
+    """
+    from .transcriber import TranscriptionStream
+
+    shared, samples = _attach(shm_name, length)
+    try:
+        # 共有メモリを早めに閉じられるよう、チャンク部分だけコピーしてから処理します
+        chunk = DecodedAudio.from_samples(samples[start:end].copy())
+        offset = start / SAMPLE_RATE
+        stream = TranscriptionStream(_model, chunk, language=language)
+        segments = []
+        for event in stream:
+            segments.append({
+                "start": event.start + offset,
+                "end": event.end + offset,
+                "text": event.text,
+                "avg_logprob": event.avg_logprob,
+                "no_speech_prob": event.no_speech_prob,
+            })
+        return segments
+    finally:
+        del samples
+        _close(shared)
+
+
+def plan_chunks(samples, chunk_seconds, overlap_seconds=None):
+    """
+    音声を無音の位置で分割し、チャンクのリストを返す。
+    各チャンクは (担当範囲の開始, 担当範囲の終了, デコード範囲の開始, デコード範囲の終了) のサンプル番号。
+    デコード範囲は担当範囲の前後に overlap_seconds ずつ広げたもの。
+    """
+    if overlap_seconds is None:
+        overlap_seconds = CHUNK_OVERLAP_SECONDS
+    total = len(samples)
+    bounds = [0] + find_split_points(samples, chunk_seconds) + [total]
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    return [
+        (core_start, core_end, max(0, core_start - overlap), min(total, core_end + overlap))
+        for core_start, core_end in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def stitch_segments(chunk_results):
+    """
+    チャンクごとの文字起こし結果をつなげて、重複も欠落もない1本のセグメント列にする。
+
+    chunk_results は [(chunk, segments), ...] をチャンクの順に並べたもの。
+    - 前のチャンクで確定した位置 (resume_from) より中心が前にあるセグメントは重複として捨てる。
+    - 担当範囲の終了より後に始まるセグメントは次のチャンクに任せる。
+    - デコード範囲の終端で切れているセグメントは、次のチャンクがその位置から音声を持っていれば次に任せる。
+    """
+    stitched = []
+    resume_from = 0.0
+    for index, (chunk, segments) in enumerate(chunk_results):
+        core_start, core_end, decode_start, decode_end = (x / SAMPLE_RATE for x in chunk)
+        is_last = index == len(chunk_results) - 1
+
+        owned = [s for s in segments if (s["start"] + s["end"]) / 2 > resume_from]
+        if not is_last:
+            owned = [s for s in owned if s["start"] < core_end]
+            next_decode_start = chunk_results[index + 1][0][2] / SAMPLE_RATE
+            if owned and owned[-1]["end"] >= decode_end - EDGE_MARGIN_SECONDS \
+                    and owned[-1]["start"] >= next_decode_start:
+                cut = owned.pop()
+                resume_from = cut["start"]
+            elif owned:
+                resume_from = max(resume_from, owned[-1]["end"])
+            else:
+                resume_from = max(resume_from, core_start)
+
+        stitched.extend(owned)
+    return stitched
+
+
+class ParallelTranscriber:
+    """
+    長い音声を無音の位置でチャンクに分け、複数のワーカープロセスで同時に文字起こしする。
+    各ワーカーは自分のWhisperモデルを1つ保持し、ジョブ間で使い回す。
+    音声は共有メモリ経由で渡すので、ワーカーごとにPCMをデコード・コピーし直すことはない。
+    """
+
+    def __init__(self, model_name, workers, chunk_seconds=300):
+        self.model_name = model_name
+        self.workers = workers
+        self.chunk_seconds = chunk_seconds
+        self.executor = None
+
+    def _get_executor(self):
+        if self.executor is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            # torchを読み込んだプロセスをforkすると不安定になるため、常にspawnで起動します
+            context = multiprocessing.get_context("spawn")
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context,
+                initializer=_init_worker, initargs=(self.model_name, threads)
+            )
+        return self.executor
+
+    def stream(self, audio, language=None):
+        return ParallelTranscriptionStream(self, audio, language=language)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+class ParallelTranscriptionStream:
+    """
+    TranscriptionStream と同じように SegmentEvent を順に返すイテレーター。
+    チャンクはワーカーで同時に処理し、先頭のチャンクから順に完成したものを返していく。
+    """
+
+    def __init__(self, parallel, audio, language=None):
+        self.parallel = parallel
+        self.audio = audio
+        self.language = language
+
+    def __iter__(self):
+        samples = self.audio.samples
+        duration = self.audio.duration or len(samples) / SAMPLE_RATE
+        chunks = plan_chunks(samples, self.parallel.chunk_seconds)
+        # 話者分離などのために既に共有されている場合は、共有メモリの後始末を呼び出し元に任せます
+        owns_shared = not self.audio.is_shared
+        shm_name, length = self.audio.share()
+        executor = self.parallel._get_executor()
+
+        # チャンクごとに言語がばらつかないよう、先に言語を決めておきます
+        if not self.language:
+            self.language = executor.submit(_detect_language, shm_name, length).result()
+
+        print(f"Transcribing {len(chunks)} chunks with {self.parallel.workers} workers...", file=sys.stderr)
+        futures = [
+            executor.submit(_transcribe_chunk, shm_name, length, decode_start, decode_end, self.language)
+            for _, _, decode_start, decode_end in chunks
+        ]
+
+        try:
+            finished = []
+            emitted = 0
+            for chunk, future in zip(chunks, futures):
+                finished.append((chunk, future.result()))
+                # 完成したチャンクまでをつなぎ直し、まだ返していないセグメントを返します
+                # （境界の判定には次のチャンクの範囲が必要なので、結果が空のまま次のチャンクを添えます）
+                ready = stitch_segments(finished + [(c, []) for c in chunks[len(finished):len(finished) + 1]])
+                for seg in ready[emitted:]:
+                    yield SegmentEvent(
+                        start=seg["start"], end=seg["end"], text=seg["text"],
+                        avg_logprob=seg["avg_logprob"],
+                        progress=min(seg["end"] / duration, 1.0) if duration > 0 else 0.0,
+                        no_speech_prob=seg["no_speech_prob"],
+                    )
+                emitted = len(ready)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            if owns_shared:
+                self.audio.unshare()
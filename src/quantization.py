@@ -0,0 +1,70 @@
+import os
+import sys
+
+from .lazy_import import LazyModule
+
+whisper = LazyModule("whisper")
+torch = LazyModule("torch")
+
+# モデル名の末尾にこれを付けると int8 の動的量子化モデルを使う（例: "small-int8"）
+QUANTIZED_SUFFIX = "-int8"
+# 量子化済みモデルの保存先
+DEFAULT_MODEL_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mojiokoshi", "models")
+
+
+def is_quantized(model_name):
+    return model_name.endswith(QUANTIZED_SUFFIX)
+
+
+def base_model_name(model_name):
+    """
+    "small-int8" のような名前から、元のWhisperモデル名（"small"）を返す。
+    """
+    return model_name[:-len(QUANTIZED_SUFFIX)] if is_quantized(model_name) else model_name
+
+
+def quantize_model(model):
+    """
+    Whisperモデルの全結合層を int8 の動的量子化に置き換える（CPU専用）。
+    重みは int8 で保持し、活性は実行時に量子化するため、精度をほとんど落とさずにCPUでの行列積が速くなる。
+    """
+    # Whisperの Linear は nn.Linear のサブクラスで、量子化の対象として認識されないため、
+    # float32 のCPU推論では同じ動作になる nn.Linear に置き換えてから量子化します
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_model_path(model_name, model_dir=None):
+    # torch のバージョンが変わると保存形式が読めなくなることがあるため、ファイル名に含めます
+    version = torch.__version__.split("+")[0]
+    return os.path.join(model_dir or DEFAULT_MODEL_DIR, f"{base_model_name(model_name)}{QUANTIZED_SUFFIX}-torch{version}.pt")
+
+
+def load_quantized_model(model_name, model_dir=None):
+    """
+    int8 量子化済みのWhisperモデルを返す。
+    初回は float32 のモデルを読み込んで量子化し、ディスクに保存する。2回目以降は保存したものを読み込む。
+    """
+    path = quantized_model_path(model_name, model_dir)
+    if os.path.exists(path):
+        try:
+            # モデル全体を pickle で保存しているため weights_only=False で読み込みます
+            return torch.load(path, map_location="cpu", weights_only=False)
+        except Exception as e:
+            print(f"Could not load quantized model {path}, rebuilding: {e}", file=sys.stderr)
+
+    print(f"Quantizing Whisper model {base_model_name(model_name)} to int8...", file=sys.stderr)
+    model = quantize_model(whisper.load_model(base_model_name(model_name), device="cpu"))
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 複数のワーカーが同時に作成しても壊れたファイルが残らないよう、一時ファイルから置き換えます
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(model, tmp_path)
+        os.replace(tmp_path, path)
+        print(f"Saved quantized model to {path}", file=sys.stderr)
+    except Exception as e:
+        print(f"Could not save quantized model: {e}", file=sys.stderr)
+    return model
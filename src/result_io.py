@@ -0,0 +1,230 @@
+import json
+import os
+import sys
+import threading
+import time
+
+# GUIで文字起こし中のセグメントと結果を書き出す場所（保存ボタンを押す前にアプリが落ちても残る）
+DEFAULT_RESULTS_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mojiokoshi", "results")
+# 書き出した結果を残しておく日数と、合計サイズの上限
+RESULTS_MAX_AGE_DAYS = 7
+RESULTS_MAX_MB = 512
+# 1回の文字起こしで書き出すファイルの接尾辞（長いものから順に比べます）
+RESULT_SUFFIXES = (".segments.jsonl.part", ".segments.jsonl", ".timing.json", ".json.tmp", ".json")
+
+
+def build_result_data(original, simple_summary="", local_summary="", gemini_summary="", summary_cache=None):
+    """
+    保存用JSONの内容を作成する（App.save_to_file と一括処理で同じ形式を使う）。
+    summary_cache: LLMの要約ごとのキャッシュの利用結果（例: {"local_summary": "hit"}）
+    """
+    data = {
+        "original": original,
+        "simple_summary": simple_summary,
+        "local_summary": local_summary,
+        "gemini_summary": gemini_summary,
+    }
+    if summary_cache:
+        data["summary_cache"] = summary_cache
+    return data
+
+
+def save_result_json(file_path, data):
+    """
+    結果をJSONとして保存する。
+    途中でクラッシュしても壊れたファイルが残らないよう、一時ファイルに書いてから置き換える。
+    """
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+
+
+def timing_path(file_path):
+    """
+    結果のJSONと同じ場所に置く計測結果のファイル名（meeting.json -> meeting.timing.json）。
+    """
+    return os.path.splitext(file_path)[0] + ".timing.json"
+
+
+def save_timing_json(file_path, timing):
+    """
+    段階ごとの計測結果（StageTimer.to_dict）を、結果のJSONの隣に保存する。
+    """
+    save_result_json(timing_path(file_path), timing)
+
+
+# 書き出しに対応しているセグメントの形式
+EXPORT_FORMATS = ("srt", "vtt", "txt")
+
+
+def segments_path(file_path):
+    """
+    結果のJSONと同じ場所に置くセグメントのファイル名（meeting.json -> meeting.segments.jsonl）。
+    """
+    return os.path.splitext(file_path)[0] + ".segments.jsonl"
+
+
+class ResultWriter:
+    """
+    文字起こし中のセグメントを、届いた順に追記専用のJSONL（meeting.segments.jsonl.part）へ書き出す。
+    結果は画面のテキストやメモリ上の大きな文字列を介さずにディスクへ残り、アプリが落ちても
+    それまでのセグメントは失われない。finalize で結果のJSONとセグメントのファイルを確定する。
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.segments_path = segments_path(file_path)
+        self.part_path = self.segments_path + ".part"
+        self.count = 0
+        self.lock = threading.Lock()
+        self._file = None
+
+    def add_segment(self, segment):
+        """
+        確定したセグメントを1行追記する。どのスレッドから呼んでもよい。
+        """
+        line = json.dumps(segment, ensure_ascii=False)
+        with self.lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.part_path)), exist_ok=True)
+                # 前回落ちたときの書きかけのファイルは、新しい文字起こしで上書きします
+                self._file = open(self.part_path, "w", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        """
+        確定せずにファイルを閉じる（失敗したときは .part のまま残る）。
+        """
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def finalize(self, data, segments=None):
+        """
+        結果のJSONを保存し、セグメントのファイルを .part から置き換えて確定する。
+        segments を渡すと（話者を割り当てた最終的なセグメントなど）、その内容で書き直してから確定する。
+        """
+        self.close()
+        with self.lock:
+            if segments is not None or not os.path.exists(self.part_path):
+                write_segments(self.part_path, segments or [])
+            os.replace(self.part_path, self.segments_path)
+        save_result_json(self.file_path, data)
+
+
+def prune_results(directory, max_age_days=RESULTS_MAX_AGE_DAYS, max_bytes=RESULTS_MAX_MB * 1024 * 1024):
+    """
+    結果の書き出し先から古い結果を削除する。1回の文字起こしのファイル（JSON・セグメント）はまとめて扱い、
+    max_age_days より古いものを消してから、合計が max_bytes を超えていれば古いものから消す。
+    削除した結果の数を返す。
+    """
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+
+    groups = {}
+    for name in names:
+        stem = next((name[:-len(suffix)] for suffix in RESULT_SUFFIXES if name.endswith(suffix)), None)
+        if stem is None:
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        group = groups.setdefault(stem, {"paths": [], "mtime": 0.0, "size": 0})
+        group["paths"].append(path)
+        group["mtime"] = max(group["mtime"], stat.st_mtime)
+        group["size"] += stat.st_size
+
+    cutoff = time.time() - max_age_days * 24 * 3600
+    total = sum(group["size"] for group in groups.values())
+    removed = 0
+    for group in sorted(groups.values(), key=lambda g: g["mtime"]):
+        if group["mtime"] >= cutoff and total <= max_bytes:
+            break
+        for path in group["paths"]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= group["size"]
+        removed += 1
+    return removed
+
+
+def write_segments(file_path, segments):
+    """
+    セグメントを1行1件のJSON（JSONL）として書き出す。
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as f:
+        for segment in segments:
+            f.write(json.dumps(segment, ensure_ascii=False) + "\n")
+
+
+def read_segments(file_path):
+    """
+    JSONLのセグメントを1件ずつ返す。途中で落ちて最後の行が書きかけの場合は、その行を読み飛ばす。
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping incomplete segment line in {file_path}", file=sys.stderr)
+
+
+def _timestamp(seconds, separator):
+    milliseconds = int(round(max(seconds, 0.0) * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600 * 1000)
+    minutes, milliseconds = divmod(milliseconds, 60 * 1000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+
+def _segment_lines(segments):
+    """
+    (開始, 終了, 表示するテキスト) を順に返す。話者がある場合は、文字起こしの本文と同じく
+    最初に登場した順に「Aさん」「Bさん」…と名前を付けて先頭に付ける。
+    """
+    names = {}
+    for segment in segments:
+        text = segment.get("text", "").strip()
+        if not text:
+            continue
+        if "speaker" in segment:
+            label = segment["speaker"]
+            if label and label not in names:
+                names[label] = f"{'ABCDEFGHIJKLMNOPQRSTUVWXYZ'[len(names) % 26]}さん"
+            text = f"{names[label] if label else '不明'}: {text}"
+        yield segment["start"], segment["end"], text
+
+
+def export_segments(segments, file_path, fmt):
+    """
+    セグメント（リストまたは read_segments のイテレーター）を SRT / VTT / TXT で書き出す。
+    1件ずつ書き込むので、長い文字起こしでも全体を1つの文字列にしない。
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        if fmt == "vtt":
+            f.write("WEBVTT\n\n")
+        for index, (start, end, text) in enumerate(_segment_lines(segments), 1):
+            if fmt == "srt":
+                f.write(f"{index}\n{_timestamp(start, ',')} --> {_timestamp(end, ',')}\n{text}\n\n")
+            elif fmt == "vtt":
+                f.write(f"{_timestamp(start, '.')} --> {_timestamp(end, '.')}\n{text}\n\n")
+            else:
+                f.write(text + "\n")
+    os.replace(tmp_path, file_path)
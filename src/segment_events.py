@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class SegmentEvent:
+    """
+    文字起こし中にデコードループから直接流れてくるセグメント1件分のイベント。
+    start / end は元の音声の先頭からの秒数。
+    progress は音声全体に対する進捗（0.0〜1.0）。
+    """
+    start: float
+    end: float
+    text: str
+    avg_logprob: float
+    progress: float
+    no_speech_prob: float = 0.0
+
+    def to_segment(self, segment_id):
+        """
+        Whisperの result["segments"] と同じ形式の辞書に変換する。
+        """
+        return {
+            "id": segment_id,
+            "start": self.start,
+            "end": self.end,
+            "text": self.text,
+            "avg_logprob": self.avg_logprob,
+            "no_speech_prob": self.no_speech_prob,
+        }
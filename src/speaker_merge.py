@@ -0,0 +1,84 @@
+import heapq
+
+
+def _overlapped_duration(intervals):
+    """
+    区間のリストのうち、2つ以上の区間が同時に重なっている時間の合計を返す。
+    """
+    events = []
+    for start, end in intervals:
+        events.append((start, 1))
+        events.append((end, -1))
+    # 同じ時刻では終了を先に処理して、接しているだけの区間を重なりとみなさないようにします
+    events.sort(key=lambda e: (e[0], e[1]))
+
+    overlapped = 0.0
+    active = 0
+    previous = None
+    for time, delta in events:
+        if active >= 2 and previous is not None:
+            overlapped += time - previous
+        active += delta
+        previous = time
+    return overlapped
+
+
+def assign_speakers(segments, diarization_segments):
+    """
+    Whisperのセグメントのリストに、話者分離の結果を1回の走査で割り当てる。
+
+    両方を開始時刻でソートし、現在のセグメントと重なりうる話者区間だけを
+    終了時刻のヒープで管理するため、全組み合わせを比較する O(N·M) にならない。
+
+    セグメントと同じ順序で、次の辞書のリストを返す。
+    - speaker: 最も長く話している話者のラベル（該当なしは None）
+    - speaker_fraction: その話者がセグメントの長さに占める割合
+    - overlap_fraction: 2人以上が同時に話している時間がセグメントの長さに占める割合
+    """
+    turns = sorted(
+        ((turn["start"], turn["end"], turn["speaker"], index) for index, turn in enumerate(diarization_segments or [])),
+        key=lambda t: t[0]
+    )
+    order = sorted(range(len(segments)), key=lambda i: segments[i]["start"])
+
+    assignments = [None] * len(segments)
+    active = []  # (end, index, start, speaker) のヒープ
+    next_turn = 0
+
+    for seg_index in order:
+        start = segments[seg_index]["start"]
+        end = segments[seg_index]["end"]
+
+        # セグメントの終了より前に始まる話者区間を追加します
+        while next_turn < len(turns) and turns[next_turn][0] < end:
+            turn_start, turn_end, speaker, index = turns[next_turn]
+            heapq.heappush(active, (turn_end, index, turn_start, speaker))
+            next_turn += 1
+
+        # セグメントの開始までに終わっている話者区間は、以降のセグメントとも重ならないので捨てます
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+
+        speakers = {}
+        intervals = []
+        # 元の順序で集計し、同じ長さの場合の話者の選び方を従来と同じにします
+        for turn_end, index, turn_start, speaker in sorted(active, key=lambda t: t[1]):
+            overlap_start = max(start, turn_start)
+            overlap_end = min(end, turn_end)
+            if overlap_end > overlap_start:
+                speakers[speaker] = speakers.get(speaker, 0) + (overlap_end - overlap_start)
+                intervals.append((overlap_start, overlap_end))
+
+        duration = end - start
+        if speakers:
+            # 最も長く話している話者を、そのセグメントの話者として採用します
+            best = max(speakers, key=speakers.get)
+            assignments[seg_index] = {
+                "speaker": best,
+                "speaker_fraction": speakers[best] / duration if duration > 0 else 0.0,
+                "overlap_fraction": _overlapped_duration(intervals) / duration if duration > 0 else 0.0,
+            }
+        else:
+            assignments[seg_index] = {"speaker": None, "speaker_fraction": 0.0, "overlap_fraction": 0.0}
+
+    return assignments
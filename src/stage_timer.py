@@ -0,0 +1,203 @@
+import contextlib
+import ctypes
+import os
+import sys
+import threading
+import time
+
+# 各段階のメモリ使用量を調べる間隔（秒）
+SAMPLE_INTERVAL = 0.05
+
+# ステータスバーに表示するときの段階名
+STAGE_LABELS = {
+    "load_model": "モデル読込",
+    "audio_decode": "デコード",
+    "vad": "無音除去",
+    "whisper": "Whisper",
+    "live": "ライブ",
+    "diarization_load": "話者分離読込",
+    "diarization": "話者分離",
+    "speaker_merge": "話者割当",
+    "format": "整形",
+    "simple_summary": "簡易要約",
+    "local_summary": "LLM要約",
+    "gemini_summary": "Gemini要約",
+}
+
+
+class _ProcessMemoryCounters(ctypes.Structure):
+    _fields_ = [
+        ("cb", ctypes.c_ulong),
+        ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+def current_rss():
+    """
+    このプロセスが現在使っている物理メモリ量（バイト）を返す。取得できない環境では None を返す。
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "win32":
+        try:
+            counters = _ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return int(counters.WorkingSetSize)
+        except Exception:
+            return None
+        return None
+    try:
+        # macOS などでは現在値が取れないため、最大値で代用します
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        return None
+
+
+def peak_rss():
+    """
+    このプロセスが起動してから使った物理メモリの最大値（バイト）を返す。取得できない環境では None を返す。
+    """
+    if sys.platform == "win32":
+        try:
+            counters = _ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return int(counters.PeakWorkingSetSize)
+        except Exception:
+            return None
+        return None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        return None
+    # Linux はKB、macOSはバイト単位で返します
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _MemorySampler:
+    """
+    段階の実行中、バックグラウンドでメモリ使用量を定期的に調べて最大値を記録する。
+    """
+
+    def __init__(self):
+        self.peak = current_rss()
+        self.stop_event = threading.Event()
+        self.thread = None
+        if self.peak is not None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.wait(SAMPLE_INTERVAL):
+            self._sample()
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self._sample()
+        return self.peak
+
+
+class StageTimer:
+    """
+    1つのジョブの各段階（モデル読込・デコード・Whisper・話者分離・要約など）について、
+    経過時間・CPU時間・ピークメモリを記録する。
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name, **info):
+        """
+        with ブロックの実行を1つの段階として計測する。info は記録にそのまま追加される。
+        """
+        rss_start = current_rss()
+        sampler = _MemorySampler()
+        wall_start = time.perf_counter()
+        # CPU時間はプロセス全体の値なので、同時に動いている他のスレッドの分も含みます
+        cpu_start = time.process_time()
+        try:
+            yield info
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = sampler.stop()
+            record = {
+                "stage": name,
+                "wall_seconds": wall,
+                "cpu_seconds": cpu,
+                "peak_rss_mb": peak / 1024 ** 2 if peak is not None else None,
+                "rss_delta_mb": (peak - rss_start) / 1024 ** 2 if peak is not None and rss_start is not None else None,
+            }
+            record.update(info)
+            with self.lock:
+                self.stages.append(record)
+
+    def discard(self, *names):
+        """
+        指定した段階の記録を削除する（同じ段階をやり直すとき、前回の記録を置き換えるために使う）。
+        """
+        with self.lock:
+            self.stages = [s for s in self.stages if s["stage"] not in names]
+
+    def total_seconds(self, name=None):
+        with self.lock:
+            return sum(s["wall_seconds"] for s in self.stages if name is None or s["stage"] == name)
+
+    def to_dict(self, audio_seconds=None):
+        """
+        JSONに保存する形式で計測結果を返す。audio_seconds を渡すと実時間比（RTF）も含める。
+        """
+        with self.lock:
+            stages = [dict(s) for s in self.stages]
+        total = sum(s["wall_seconds"] for s in stages)
+        peaks = [s["peak_rss_mb"] for s in stages if s["peak_rss_mb"] is not None]
+        data = {
+            "stages": stages,
+            "total_wall_seconds": total,
+            "total_cpu_seconds": sum(s["cpu_seconds"] for s in stages),
+            "peak_rss_mb": max(peaks) if peaks else None,
+        }
+        if audio_seconds:
+            data["audio_seconds"] = audio_seconds
+            data["rtf"] = total / audio_seconds
+        return data
+
+    def summary(self, audio_seconds=None, top=3):
+        """
+        ステータスバー用の短い要約（例: "RTF 0.32 | Whisper 12.1s / 話者分離 4.0s / モデル読込 2.2s"）。
+        """
+        totals = {}
+        with self.lock:
+            for s in self.stages:
+                totals[s["stage"]] = totals.get(s["stage"], 0.0) + s["wall_seconds"]
+        slowest = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+        parts = " / ".join(f"{STAGE_LABELS.get(name, name)} {seconds:.1f}s" for name, seconds in slowest)
+        if audio_seconds:
+            return f"RTF {sum(totals.values()) / audio_seconds:.2f} | {parts}"
+        return parts
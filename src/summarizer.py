@@ -3,6 +3,8 @@ import re
 import math
 import collections
 
+import numpy as np
+
 class SimpleSummarizer:
     def __init__(self):
         pass
@@ -15,6 +17,17 @@ class SimpleSummarizer:
         text = text.replace(" ", "").replace("　", "")
         return [text[i:i+n] for i in range(len(text) - n + 1)]
 
+    def _content_chars(self, text):
+        """
+        類似度計算に使う文字の集合を返す。
+        平仮名と句読点を除いた内容語の文字を使い、残りが2文字未満なら元の文全体を使う。
+        """
+        # 平仮名を除去する正規表現
+        content = re.sub(r'[ぁ-ん、。]', '', text)
+        if len(content) < 2:
+            content = text
+        return set(content)
+
     def _calculate_similarity(self, sent1, sent2):
         """
         2つの文の類似度を計算する。
@@ -24,18 +37,8 @@ class SimpleSummarizer:
         if not sent1 or not sent2:
             return 0.0
             
-        # 平仮名を除去する正規表現
-        def extract_content_words(text):
-            return re.sub(r'[ぁ-ん、。]', '', text)
-            
-        content1 = extract_content_words(sent1)
-        content2 = extract_content_words(sent2)
-        
-        if len(content1) < 2: content1 = sent1
-        if len(content2) < 2: content2 = sent2
-        
-        set1 = set(content1)
-        set2 = set(content2)
+        set1 = self._content_chars(sent1)
+        set2 = self._content_chars(sent2)
         
         intersection = len(set1.intersection(set2))
         min_len = min(len(set1), len(set2))
@@ -45,8 +48,6 @@ class SimpleSummarizer:
             
         return intersection / min_len
 
-
-
     def _preprocess(self, text):
         """
         前処理を行う
@@ -80,9 +81,137 @@ class SimpleSummarizer:
                 
         return unique_sentences
 
-    def summarize(self, text, ratio=0.3, max_sentences=5, damping=0.85, iterations=30):
+    def _build_similarity_graph(self, sentences, threshold=0.2):
+        """
+        文同士の類似度グラフを疎行列（COO形式: 行・列・重みの配列）として作成する。
+        閾値以下の辺は持たないため、長い文字起こしでも n×n の行列を作らずに済む。
+
+        全ての組み合わせを比較する代わりに、次の手順で候補を絞り込む。
+        1. 各文の文字集合を1回だけ作り、文字を出現頻度の低い順に番号付けした整数配列にする。
+        2. 類似度 = 共通文字数 / 小さい方の文字数 なので、閾値を超えるには
+           小さい方の文の「珍しい方から数えた先頭部分（プレフィックス）」の文字を
+           相手と少なくとも1つ共有している必要がある。
+           そこで各文のプレフィックスだけを文字→文の転置インデックスに登録し、
+           共通文字を持つ組み合わせだけを候補にする。
+        3. 候補の組み合わせだけを、整数配列の共通部分の数で正確に採点する。
+        """
+        n_sentences = len(sentences)
+        char_sets = [self._content_chars(s) for s in sentences]
+
+        # 出現する文の数が少ない文字ほど小さい番号を振ります
+        frequency = collections.Counter(c for chars in char_sets for c in chars)
+        rank = {c: r for r, (c, _) in enumerate(sorted(frequency.items(), key=lambda item: (item[1], item[0])))}
+
+        ranked = [sorted(rank[c] for c in chars) for chars in char_sets]
+        sizes = np.array([len(ids) for ids in ranked], dtype=np.int64)
+
+        # 全文の文字番号を1本の整数配列に詰めます（CSR形式: 文 i の文字は flat[starts[i]:starts[i] + sizes[i]]）
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        flat = np.fromiter((r for ids in ranked for r in ids), dtype=np.int64, count=int(sizes.sum()))
+        # 処理中の文が持つ文字に True を立てる作業用の配列
+        member = np.zeros(len(rank), dtype=bool)
+
+        # 文字数の少ない文から順に処理し、登録済みの文（自分以下の大きさ）を相手として探します
+        inverted_index = collections.defaultdict(list)
+        edge_rows, edge_cols, edge_weights = [], [], []
+        for x in sorted(range(n_sentences), key=lambda i: (sizes[i], i)):
+            if sizes[x] == 0:
+                continue
+
+            candidates = set()
+            for r in ranked[x]:
+                candidates.update(inverted_index.get(r, ()))
+
+            if candidates:
+                ys = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+                lengths = sizes[ys]
+                bounds = np.cumsum(lengths)
+                # 候補の文の文字番号をまとめて取り出し、x の文字に含まれるものを数えます
+                positions = np.repeat(starts[ys] - (bounds - lengths), lengths) + np.arange(bounds[-1])
+                member[ranked[x]] = True
+                overlap = np.add.reduceat(member[flat[positions]], bounds - lengths, dtype=np.int64)
+                member[ranked[x]] = False
+
+                # y の方が小さい（または同じ）ので、分母は y の文字数
+                sim = overlap / lengths
+                # 閾値を設定してノイズエッジを減らす
+                keep = sim > threshold
+                edge_rows.append(np.minimum(ys[keep], x))
+                edge_cols.append(np.maximum(ys[keep], x))
+                edge_weights.append(sim[keep])
+
+            # 共通文字数が threshold * size を超えるには、珍しい方から
+            # size - floor(threshold * size) 文字のうち少なくとも1つを共有している必要があります
+            prefix_length = sizes[x] - math.floor(threshold * sizes[x])
+            for r in ranked[x][:prefix_length]:
+                inverted_index[r].append(x)
+
+        if edge_rows:
+            rows = np.concatenate(edge_rows)
+            cols = np.concatenate(edge_cols)
+            weights = np.concatenate(edge_weights)
+            order = np.lexsort((cols, rows))
+            rows, cols, weights = rows[order], cols[order], weights[order]
+        else:
+            rows = cols = np.array([], dtype=np.int64)
+            weights = np.array([], dtype=np.float64)
+
+        # 類似度は対称なので、両方向の辺を持たせます
+        return np.concatenate((rows, cols)), np.concatenate((cols, rows)), np.concatenate((weights, weights))
+
+    def _textrank(self, n_sentences, rows, cols, weights, damping=0.85, max_iterations=100, tol=1e-6):
+        """
+        疎行列とベクトルの積でPageRankの反復計算を行う。
+        各文の出次数の重み（行和）は最初に1回だけ計算し、スコアの変化が tol 未満になったら終了する。
+        """
+        out_weight = np.bincount(rows, weights=weights, minlength=n_sentences)
+        # 辺 j -> i の遷移確率 W[j, i] / sum(W[j])
+        transition = weights / out_weight[rows] if len(rows) else weights
+
+        scores = np.ones(n_sentences)
+        for _ in range(max_iterations):
+            incoming = np.bincount(cols, weights=transition * scores[rows], minlength=n_sentences)
+            new_scores = (1 - damping) + damping * incoming
+            converged = np.max(np.abs(new_scores - scores)) < tol
+            scores = new_scores
+            if converged:
+                break
+        return scores
+
+    def _mmr_select(self, scores, rows, cols, weights, target_count, mmr_lambda=0.4):
+        """
+        MMR (Maximal Marginal Relevance) で文を選ぶ。
+        選択済みの文との最大類似度を配列で持ち、1文選ぶごとにその文の辺だけで更新する。
+        MMR score = lambda * Importance - (1 - lambda) * Similarity_to_selected
+        """
+        n_sentences = len(scores)
+        # 行ごとに辺を取り出せるよう、行番号で並べ替えてCSR形式にします
+        order = np.argsort(rows, kind="stable")
+        csr_cols, csr_weights = cols[order], weights[order]
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n_sentences))))
+
+        max_similarity = np.zeros(n_sentences)
+        available = np.ones(n_sentences, dtype=bool)
+        selected_indices = []
+
+        while len(selected_indices) < target_count and available.any():
+            mmr_scores = mmr_lambda * scores - (1 - mmr_lambda) * max_similarity
+            mmr_scores[~available] = -np.inf
+            best_idx = int(np.argmax(mmr_scores))
+
+            selected_indices.append(best_idx)
+            available[best_idx] = False
+
+            start, end = indptr[best_idx], indptr[best_idx + 1]
+            neighbors = csr_cols[start:end]
+            max_similarity[neighbors] = np.maximum(max_similarity[neighbors], csr_weights[start:end])
+
+        return selected_indices
+
+    def summarize(self, text, ratio=0.3, max_sentences=5, damping=0.85, iterations=100, tol=1e-6):
         """
         TextRankアルゴリズム + MMR (Maximal Marginal Relevance) による抽出要約
+        iterations は反復回数の上限で、スコアが収束した時点で打ち切る。
         """
         if not text:
             return ""
@@ -99,66 +228,13 @@ class SimpleSummarizer:
             return "\n".join(sentences)
 
         # 2. TextRankによる重要度計算
-        similarity_matrix = [[0.0] * n_sentences for _ in range(n_sentences)]
-        
-        for i in range(n_sentences):
-            for j in range(i + 1, n_sentences):
-                sim = self._calculate_similarity(sentences[i], sentences[j])
-                # 閾値を設定してノイズエッジを減らす
-                if sim > 0.2:
-                    similarity_matrix[i][j] = sim
-                    similarity_matrix[j][i] = sim
-
-        scores = [1.0] * n_sentences
-        
-        for _ in range(iterations):
-            new_scores = [0.0] * n_sentences
-            for i in range(n_sentences):
-                incoming_score = 0.0
-                for j in range(n_sentences):
-                    if i == j: continue
-                    sum_out_weight = sum(similarity_matrix[j])
-                    if sum_out_weight > 0:
-                        incoming_score += (scores[j] * similarity_matrix[j][i]) / sum_out_weight
-                new_scores[i] = (1 - damping) + damping * incoming_score
-            scores = new_scores
+        rows, cols, weights = self._build_similarity_graph(sentences)
+        scores = self._textrank(n_sentences, rows, cols, weights, damping=damping,
+                                max_iterations=iterations, tol=tol)
 
         # 3. MMRによる冗長性の排除と抽出
-        # MMR score = lambda * Importance - (1 - lambda) * Similarity_to_selected
-        
-        selected_indices = []
-        candidate_indices = list(range(n_sentences))
-        
         target_count = min(max_sentences, max(1, int(n_sentences * ratio)))
-        mmr_lambda = 0.4 # 重複排除を重視 (0.4)
-        
-        while len(selected_indices) < target_count and candidate_indices:
-            best_mmr_score = -float('inf')
-            best_idx = -1
-            
-            for idx in candidate_indices:
-                # Importance part (Normalized TextRank score)
-                importance = scores[idx]
-                
-                # Redundancy part
-                max_similarity = 0.0
-                if selected_indices:
-                    max_similarity = max([similarity_matrix[idx][sel_idx] for sel_idx in selected_indices])
-                
-                mmr_score = mmr_lambda * importance - (1 - mmr_lambda) * max_similarity
-                
-                # print(f"Idx: {idx}, Imp: {importance:.4f}, Sim: {max_similarity:.4f}, Score: {mmr_score:.4f} Content: {sentences[idx]}")
-                
-                if mmr_score > best_mmr_score:
-                    best_mmr_score = mmr_score
-                    best_idx = idx
-            
-            if best_idx != -1:
-                # print(f"Selected: {best_idx} -> {sentences[best_idx]}")
-                selected_indices.append(best_idx)
-                candidate_indices.remove(best_idx)
-            else:
-                break
+        selected_indices = self._mmr_select(scores, rows, cols, weights, target_count)
         
         # 元の順序に戻して結合
         selected_indices.sort()
@@ -166,6 +242,13 @@ class SimpleSummarizer:
         
         return "\n".join(summary_sentences)
 
+    def update_summary(self, previous_summary, text, **kwargs):
+        """
+        途中までの要約（抽出済みの文）と続きのテキストを合わせて、要約する文を選び直す。
+        文字起こし全体から計算し直さずに済むので、長い録音でも更新が軽い。
+        """
+        return self.summarize("\n".join(part for part in (previous_summary, text) if part), **kwargs)
+
 
 if __name__ == "__main__":
     # Test
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import os
+
+from .disk_cache import DiskCache
+
+# 既定の保存先（文字起こしのキャッシュと同じく ~/.cache の下に置く）
+DEFAULT_SUMMARY_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mojiokoshi", "summaries")
+# 要約のプロンプトや分割の仕方を変えたときに古い要約を使わないようにするためのバージョン
+SUMMARY_CACHE_VERSION = 1
+
+HIT = "hit"
+MISS = "miss"
+
+
+def hash_text(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SummaryCache(DiskCache):
+    """
+    LLMの要約をディスクに保存するキャッシュ。
+    文字起こしのハッシュ・要約方法・モデル・プロンプト・生成パラメーターから求めたキーで引くので、
+    同じ文字起こしを同じ設定で要約し直すときはLLMを呼ばずにすぐ返せる。
+    エントリーの保存と合計サイズによる削除（LRU）は DiskCache が行う。
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=64 * 1024 * 1024):
+        super().__init__(cache_dir or DEFAULT_SUMMARY_CACHE_DIR, max_bytes)
+
+    def key(self, text, backend, model, prompt_prefix, params=None):
+        payload = json.dumps({
+            "backend": backend,
+            "model": model,
+            "prompt": prompt_prefix,
+            "params": params or {},
+            "version": SUMMARY_CACHE_VERSION,
+        }, sort_keys=True, ensure_ascii=False)
+        # ファイル名の先頭を文字起こしのハッシュにして、同じ文字起こしの要約をまとめて消せるようにします
+        return f"{hash_text(text)}-{hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()}"
+
+    def get_summary(self, key):
+        """
+        保存済みの要約を返す。なければ None を返す。
+        """
+        data = self._read(self._path(key))
+        return data["summary"] if data else None
+
+    def put_summary(self, key, summary):
+        self._write(self._path(key), {"summary": summary})
+
+
+def build_summary_cache(cache_config):
+    """
+    config.json の "summary_cache" セクションから SummaryCache を作成する。無効なら None を返す。
+    """
+    cache_config = cache_config or {}
+    if not cache_config.get("enabled", True):
+        return None
+    return SummaryCache(
+        cache_dir=cache_config.get("dir"),
+        max_bytes=int(cache_config.get("max_mb", 64) * 1024 * 1024)
+    )
@@ -0,0 +1,121 @@
+import contextlib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+from .stage_timer import STAGE_LABELS
+
+# 同時に実行する要約の数（簡易要約・ローカルLLM・Gemini を並べて実行する）
+MAX_WORKERS = 3
+
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class SummaryBackend:
+    """
+    1つの要約方法。summarize(text, stream_callback) は要約を返し（失敗したときは例外を投げる）、
+    ストリームに対応していれば途中のテキストを stream_callback に渡す。
+    キャッシュを使う要約は (要約, "hit" または "miss") を返してもよい。
+    """
+    name: str
+    stage: str
+    summarize: Callable
+
+
+class SummaryOrchestrator:
+    """
+    1つの文字起こしを複数の要約方法に同時に渡し、それぞれの結果と
+    最初の出力までの時間（TTFT）・全体の時間を記録する。
+    遅い・失敗した要約があっても、他の要約の結果はでき次第 done_callback で返す。
+    """
+
+    def __init__(self, backends, max_workers=MAX_WORKERS):
+        self.backends = list(backends)
+        self.max_workers = max(1, max_workers or 1)
+
+    def run(self, text, stream_callback=None, done_callback=None, timer=None):
+        """
+        すべての要約が終わるまで待ち、{名前: 結果} を返す。
+        stream_callback(name, chunk): 途中のテキストを受け取る（ワーカースレッドから呼ばれる）
+        done_callback(name, result): 要約が1つ終わるごとに呼ばれる（ワーカースレッドから呼ばれる）
+        timer: StageTimer を渡すと、要約ごとの段階として時間を記録する
+        """
+        if not self.backends:
+            return {}
+
+        def run_backend(backend):
+            result = self._run_backend(backend, text, stream_callback, timer)
+            if done_callback:
+                done_callback(backend.name, result)
+            return result
+
+        workers = min(self.max_workers, len(self.backends))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary") as executor:
+            results = list(executor.map(run_backend, self.backends))
+        return {backend.name: result for backend, result in zip(self.backends, results)}
+
+    def _run_backend(self, backend, text, stream_callback, timer):
+        start = time.perf_counter()
+        first_output = None
+
+        def on_chunk(chunk):
+            nonlocal first_output
+            if first_output is None:
+                first_output = time.perf_counter() - start
+            if stream_callback:
+                stream_callback(backend.name, chunk)
+
+        stage = timer.stage(backend.stage) if timer else contextlib.nullcontext({})
+        with stage as info:
+            summary = ""
+            error = None
+            cache_status = None
+            try:
+                summary = backend.summarize(text, on_chunk) or ""
+                if isinstance(summary, tuple):
+                    summary, cache_status = summary
+            except Exception as e:
+                error = str(e)
+            total = time.perf_counter() - start
+            # ストリームに対応していない要約は、結果が返ったときが最初の出力です
+            if first_output is None:
+                first_output = total
+            info.update(ttft_seconds=first_output, status=FAILED if error else DONE, cache=cache_status)
+
+        if error:
+            print(f"{backend.name} failed after {total:.1f}s: {error}", file=sys.stderr)
+        else:
+            print(f"{backend.name} finished: first output {first_output:.2f}s, total {total:.2f}s", file=sys.stderr)
+        return {
+            "summary": summary,
+            "status": FAILED if error else DONE,
+            "error": error,
+            "ttft_seconds": first_output,
+            "total_seconds": total,
+            "cache": cache_status,
+        }
+
+
+def latency_summary(backends, results):
+    """
+    ステータスバー用の短い表示（例: "簡易要約 0.2s / LLM要約 初回 1.3s・合計 9.8s / Gemini要約 失敗"）。
+    """
+    parts = []
+    for backend in backends:
+        result = results.get(backend.name)
+        if result is None:
+            continue
+        label = STAGE_LABELS.get(backend.stage, backend.name)
+        if result["status"] == FAILED:
+            parts.append(f"{label} 失敗")
+        elif result.get("cache") == "hit":
+            parts.append(f"{label} キャッシュ")
+        elif result["total_seconds"] - result["ttft_seconds"] >= 0.05:
+            parts.append(f"{label} 初回 {result['ttft_seconds']:.1f}s・合計 {result['total_seconds']:.1f}s")
+        else:
+            parts.append(f"{label} {result['total_seconds']:.1f}s")
+    return " / ".join(parts)
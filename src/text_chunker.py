@@ -0,0 +1,146 @@
+import re
+import sys
+
+from .lazy_import import LazyModule
+
+# tiktoken は長い文字起こしを分割するときまでインポートしません
+tiktoken = LazyModule("tiktoken")
+
+# ローカルLLMのトークナイザーはモデルごとに違うため、目安として OpenAI の cl100k_base で数える
+DEFAULT_ENCODING = "cl100k_base"
+
+# 文の区切り（句点・疑問符・感嘆符・改行の直後）
+SENTENCE_BOUNDARY = re.compile(r"(?<=[。．！？!?\n])")
+# 話者ブロックの見出し（例: "Aさん:"）
+SPEAKER_HEADER = re.compile(r"^\S{1,20}[:：]$")
+
+
+class TokenCounter:
+    """
+    テキストのトークン数を数える。
+    tiktoken が使えない環境（未インストールやエンコーディングのダウンロード失敗）では UTF-8 のバイト数で代用する。
+    cl100k_base では漢字の多くが2トークン以上になるので文字数では足りないが、
+    1トークンは必ず1バイト以上なので、バイト数で数えれば予算を超えることはない。
+    """
+
+    def __init__(self, encoding_name=DEFAULT_ENCODING):
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._unavailable = False
+
+    def _get_encoding(self):
+        if self._encoding is None and not self._unavailable:
+            try:
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except Exception as e:
+                print(f"tiktoken unavailable, counting UTF-8 bytes instead: {e}", file=sys.stderr)
+                self._unavailable = True
+        return self._encoding
+
+    def count(self, text):
+        encoding = self._get_encoding()
+        if encoding is None:
+            return len(text.encode("utf-8"))
+        return len(encoding.encode(text))
+
+    def split(self, text, max_tokens):
+        """
+        文の区切りがない長いテキストを、max_tokens ずつに機械的に分割する。
+        """
+        encoding = self._get_encoding()
+        if encoding is None:
+            return self._split_bytes(text, max_tokens)
+        tokens = encoding.encode(text)
+        return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+    @staticmethod
+    def _split_bytes(text, max_bytes):
+        # 文字の途中で切らないよう、UTF-8 で max_bytes 以下になるところまで1文字ずつ足していきます
+        parts = []
+        start = 0
+        size = 0
+        for index, char in enumerate(text):
+            char_size = len(char.encode("utf-8"))
+            if size + char_size > max_bytes and index > start:
+                parts.append(text[start:index])
+                start = index
+                size = 0
+            size += char_size
+        if start < len(text):
+            parts.append(text[start:])
+        return parts
+
+
+def _blocks(text):
+    """
+    文字起こしを話者ブロック（空行で区切られたまとまり）に分け、(見出し, 本文の文のリスト) を返す。
+    """
+    blocks = []
+    for raw_block in re.split(r"\n\s*\n", text.strip()):
+        lines = raw_block.strip().split("\n")
+        header = None
+        if len(lines) > 1 and SPEAKER_HEADER.match(lines[0].strip()):
+            header = lines[0].strip()
+            lines = lines[1:]
+        body = "\n".join(lines)
+        sentences = [sentence for sentence in SENTENCE_BOUNDARY.split(body) if sentence.strip()]
+        if sentences:
+            blocks.append((header, sentences))
+    return blocks
+
+
+def split_transcript(text, max_tokens, counter=None):
+    """
+    文字起こしを max_tokens 以下のチャンクに分割する。
+    話者ブロックの境界で区切り、1つのブロックが大きすぎる場合は文の境界で区切る。
+    ブロックの途中で区切ったときは、続きのチャンクの先頭にも話者の見出しを付ける。
+    """
+    counter = counter or TokenCounter()
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append("\n".join(current).strip())
+        current = []
+        current_tokens = 0
+
+    for header, sentences in _blocks(text):
+        block_text = "\n".join(([header] if header else []) + ["".join(sentences).strip()])
+        block_tokens = counter.count(block_text) + 1
+        if current_tokens + block_tokens <= max_tokens:
+            current.append(block_text + "\n")
+            current_tokens += block_tokens
+            continue
+
+        if block_tokens <= max_tokens:
+            flush()
+            current.append(block_text + "\n")
+            current_tokens = block_tokens
+            continue
+
+        # 1つの話者ブロックが予算を超える場合は文ごとに詰めます
+        flush()
+        header_tokens = counter.count(header) + 1 if header else 0
+        pieces = []
+        for sentence in sentences:
+            sentence_tokens = counter.count(sentence)
+            if sentence_tokens + header_tokens + 1 > max_tokens:
+                pieces.extend(counter.split(sentence, max(max_tokens - header_tokens - 1, 1)))
+            else:
+                pieces.append(sentence)
+        for piece in pieces:
+            piece_tokens = counter.count(piece) + 1
+            if current and current_tokens + piece_tokens > max_tokens:
+                flush()
+            if not current and header:
+                current.append(header)
+                current_tokens = header_tokens
+            current.append(piece.strip())
+            current_tokens += piece_tokens
+        flush()
+
+    flush()
+    return chunks
@@ -1,31 +1,353 @@
-import whisper
-import torch
 import os
+import sys
+
+from .audio import DecodedAudio, SAMPLE_RATE
+from .diarization_worker import DiarizationWorker, split_thread_budget
+from .lazy_import import LazyModule, warm_up
+from .live_transcriber import MAX_BUFFER_SECONDS, STEP_SECONDS, LiveTranscriptionStream
+from .model_pool import ModelPool
+from .parallel_transcriber import ParallelTranscriber
+from .quantization import is_quantized, load_quantized_model
+from .segment_events import SegmentEvent
+from .speaker_merge import assign_speakers
+from .stage_timer import StageTimer
+from .vad import SpeechTimeline, detect_speech
+
+# whisper と torch は読み込みに数秒かかるため、最初の文字起こしまでインポートを遅らせます
+whisper = LazyModule("whisper")
+torch = LazyModule("torch")
+
+# 1回のデコード呼び出しで渡す音声の長さ（Whisperの入力窓と同じ30秒）
+WINDOW_SECONDS = 30
+# 窓の終端からこの秒数以内で終わるセグメントは途中で切れている可能性があるため、次の窓でデコードし直す
+EDGE_MARGIN_SECONDS = 1.0
+# 前の窓の文脈としてプロンプトに渡す最大文字数
+PROMPT_MAX_CHARS = 200
+
+
+class TranscriptionStream:
+    """
+    Transcriber.iter_segments が返すイテレーター。
+    音声を30秒の窓ごとにWhisperへ渡し、確定したセグメントを SegmentEvent として順に返す。
+    標準出力は使わないため、複数のジョブを別スレッドで同時に動かしても干渉しない。
+    start_seek と prompt を渡すと、チェックポイントに保存した位置から続きをデコードする。
+    on_window(seek, prompt, language) は窓ごとに、その窓のセグメントをすべて返した後で呼ばれる。
+    """
+
+    def __init__(self, model, audio, language=None, decode_options=None, start_seek=0, prompt="", on_window=None):
+        self.model = model
+        self.audio = audio
+        self.language = language
+        self.decode_options = decode_options or {}
+        self.start_seek = start_seek
+        self.initial_prompt = prompt
+        self.on_window = on_window
+
+    def __iter__(self):
+        samples = self.audio.samples
+        total = len(samples)
+        duration = self.audio.duration or total / SAMPLE_RATE
+        window = WINDOW_SECONDS * SAMPLE_RATE
+
+        seek = self.start_seek
+        prompt = self.initial_prompt
+        while seek < total:
+            chunk = samples[seek:seek + window]
+            is_last = seek + window >= total
+            offset = seek / SAMPLE_RATE
+
+            result = self.model.transcribe(
+                chunk, verbose=None, fp16=False,
+                language=self.language,
+                initial_prompt=prompt or None,
+                **self.decode_options
+            )
+            # 最初の窓で検出した言語を以降の窓でも使います
+            if not self.language:
+                self.language = result.get("language")
+
+            committed, advance = self._commit(result.get("segments", []), len(chunk), is_last)
+
+            for seg in committed:
+                text = seg["text"].strip()
+                if not text:
+                    continue
+                end = offset + seg["end"]
+                yield SegmentEvent(
+                    start=offset + seg["start"],
+                    end=end,
+                    text=text,
+                    avg_logprob=seg.get("avg_logprob", 0.0),
+                    progress=min(end / duration, 1.0) if duration > 0 else 0.0,
+                    no_speech_prob=seg.get("no_speech_prob", 0.0),
+                )
+
+            # Whisperと同様に、高い温度でデコードした窓のあとは文脈をリセットします
+            if any(seg.get("temperature", 0.0) > 0.5 for seg in committed):
+                prompt = ""
+            else:
+                prompt = (prompt + "".join(seg["text"] for seg in committed))[-PROMPT_MAX_CHARS:]
+
+            seek += advance
+            if self.on_window:
+                self.on_window(seek, prompt, self.language)
+
+    def _commit(self, segments, chunk_samples, is_last):
+        """
+        窓の中で確定させるセグメントと、次の窓の開始位置までのサンプル数を返す。
+        窓の終端で切れている可能性のあるセグメントは確定させず、その開始位置から次の窓を始める。
+        """
+        if is_last or not segments:
+            return segments, chunk_samples
+
+        chunk_seconds = chunk_samples / SAMPLE_RATE
+        cut = len(segments)
+        while cut > 0 and segments[cut - 1]["end"] >= chunk_seconds - EDGE_MARGIN_SECONDS:
+            cut -= 1
+
+        advance = int(segments[cut]["start"] * SAMPLE_RATE) if cut < len(segments) else chunk_samples
+        if cut == 0 or advance <= 0:
+            # 1つのセグメントが窓全体にまたがる場合はそのまま確定させて先へ進みます
+            return segments, chunk_samples
+        return segments[:cut], advance
+
+
+class SpeechFilteredStream:
+    """
+    発話区間だけをつなげた音声の文字起こしストリームを包み、
+    セグメントの時刻と進捗を元の音声のタイムラインに戻して返すイテレーター。
+    """
+
+    def __init__(self, stream, timeline, duration):
+        self.stream = stream
+        self.timeline = timeline
+        self.duration = duration
+
+    @property
+    def language(self):
+        return self.stream.language
+
+    def __iter__(self):
+        for event in self.stream:
+            start = self.timeline.to_original(event.start)
+            end = self.timeline.to_original(event.end, is_end=True)
+            yield SegmentEvent(
+                start=start,
+                end=end,
+                text=event.text,
+                avg_logprob=event.avg_logprob,
+                progress=min(end / self.duration, 1.0) if self.duration > 0 else 0.0,
+                no_speech_prob=event.no_speech_prob,
+            )
+
 
 class Transcriber:
-    def __init__(self):
+    def __init__(self, concurrent_diarization=True, whisper_threads=None, diarization_threads=None,
+                 parallel_workers=None, chunk_seconds=300, vad_filter=False, cache=None,
+                 model_pool_mb=4096, checkpoints=None):
         # モデルとダイアライザー（話者分離用）の初期化
         # self.model はWhisperの音声認識モデルを保持します
         self.model = None
         self.current_model_name = None
         self.diarizer = None
 
+        # 読み込んだWhisperモデルを、合計 model_pool_mb までメモリに残しておくプール
+        self.model_pool = ModelPool(self._load_whisper_model, max_bytes=int(model_pool_mb * 1024 * 1024))
+
+        # 話者分離をWhisperと同時に別プロセスで実行するかどうかと、それぞれのCPUスレッド数
+        # （None の場合はコア数から自動で決めます）
+        self.concurrent_diarization = concurrent_diarization
+        self.whisper_threads = whisper_threads
+        self.diarization_threads = diarization_threads
+        self.diarization_worker = None
+
+        # 長い音声をチャンクに分けて複数プロセスで文字起こしする場合のワーカー数とチャンクの長さ
+        # （parallel_workers が None か 1 以下なら従来どおり1プロセスで処理します）
+        self.parallel_workers = parallel_workers
+        self.chunk_seconds = chunk_seconds
+        self.parallel = None
+
+        # Whisperに渡す前に無音区間を取り除くかどうか
+        self.vad_filter = vad_filter
+
+        # 文字起こしと話者分離の結果を保存する TranscriptionCache（None ならキャッシュしません）
+        self.cache = cache
+
+        # 長い録音の途中経過を保存し、止まった位置から再開するための CheckpointStore（None なら保存しません）
+        self.checkpoints = checkpoints
+
+    def warm_up(self, hf_token=None):
+        """
+        whisper と torch のインポートをバックグラウンドで済ませておく（アプリ起動時に使う）。
+        話者分離を使う場合（HF_TOKEN がある場合）は pyannote.audio も読み込んでおく。
+        話者分離を別プロセスで実行する設定なら、そのプロセスを先に起動してそちらで読み込む。
+        """
+        modules = [torch, whisper]
+        if hf_token or os.environ.get("HF_TOKEN"):
+            if self.concurrent_diarization:
+                try:
+                    self._get_diarization_worker(hf_token).warm_up()
+                except Exception as e:
+                    print(f"Could not start diarization worker: {e}", file=sys.stderr)
+            else:
+                from .diarizer import pyannote_audio
+                modules.append(pyannote_audio)
+        return warm_up(*modules)
+
     def load_model(self, model_name="base"):
         if self.model and self.current_model_name == model_name:
             return
-            
-        print(f"Loading Whisper model: {model_name}...")
+
+        # 一度読み込んだモデルはプールに残っているので、切り替えて戻すときは読み直しません
+        self.model = self.model_pool.get(model_name)
+        self.current_model_name = model_name
+
+    def _load_whisper_model(self, model_name):
+        print(f"Loading Whisper model: {model_name}...", file=sys.stderr)
+        if is_quantized(model_name):
+            # int8 の動的量子化はCPU専用です
+            print("Using device: cpu (int8 dynamic quantization)", file=sys.stderr)
+            model = load_quantized_model(model_name)
+            print("Model loaded.", file=sys.stderr)
+            return model
+
         # CUDA（GPU）が使えるか確認します。使える場合はGPUを、使えない場合はCPUを使用します。
         # GPUを使うと処理が非常に高速になります。
         device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"Using device: {device}")
+        print(f"Using device: {device}", file=sys.stderr)
         
         # モデルをメモリに読み込みます。これには少し時間がかかります。
-        self.model = whisper.load_model(model_name, device=device)
-        self.current_model_name = model_name
-        print("Model loaded.")
+        model = whisper.load_model(model_name, device=device)
+        print("Model loaded.", file=sys.stderr)
+        return model
+
+    def preload(self, model_name):
+        """
+        モデルをバックグラウンドで読み込んでおく（アプリ起動時やモデルを選び直したときに使う）。
+        """
+        return self.model_pool.preload(model_name)
+
+    def iter_segments(self, audio_path, model_name="base", language=None, timer=None, checkpoint=None,
+                      on_window=None, **decode_options):
+        """
+        文字起こし結果をデコードループから SegmentEvent として順に返すイテレーターを作成する。
+        audio_path にはファイルパスか、デコード済みの DecodedAudio を渡せる。
+        timer（StageTimer）を渡すと、モデルの読み込みと無音除去の時間を記録する。
+        checkpoint（TranscriptionCheckpoint）を渡すと保存済みの位置から続きをデコードし、
+        on_window は窓ごとに TranscriptionStream から呼ばれる（チャンク並列のときは使われない）。
+        """
+        audio = DecodedAudio.from_source(audio_path)
+        timer = timer or StageTimer()
+
+        print(f"Transcribing {audio.path}...", file=sys.stderr)
+        # 進捗計算用の長さはコンテナのメタデータから取得するので、ここではデコードしません
+        print(f"Audio duration: {audio.duration:.2f}s", file=sys.stderr)
+
+        if self.vad_filter:
+            return self._iter_speech_segments(audio, model_name, language, decode_options, timer,
+                                              checkpoint, on_window)
+
+        return self._stream(audio, model_name, language, decode_options, timer, checkpoint, on_window)
+
+    def _iter_speech_segments(self, audio, model_name, language, decode_options, timer, checkpoint=None,
+                              on_window=None):
+        """
+        発話区間だけをつなげた音声を文字起こしし、時刻を元の音声に戻して返すストリームを作成する。
+        """
+        samples = audio.samples
+        with timer.stage("vad"):
+            timeline = SpeechTimeline(detect_speech(samples), len(samples))
+        duration = len(samples) / SAMPLE_RATE
+        skipped_percent = timeline.skipped_seconds / duration * 100 if duration > 0 else 0.0
+        print(f"VAD: skipping {timeline.skipped_seconds:.2f}s of silence ({skipped_percent:.0f}%), "
+              f"transcribing {timeline.speech_seconds:.2f}s of speech", file=sys.stderr)
+
+        speech = DecodedAudio.from_samples(timeline.compact(samples), audio.path)
+        stream = self._stream(speech, model_name, language, decode_options, timer, checkpoint, on_window)
+        return SpeechFilteredStream(stream, timeline, duration)
+
+    def _stream(self, audio, model_name, language, decode_options, timer, checkpoint=None, on_window=None):
+        # チャンク並列にするかは、実際にデコードする音声（無音除去を使う場合は除去後の音声）でここで1回だけ決めます。
+        # チャンク並列では窓の順番に確定しないのでチェックポイントは使わず、途中経過から再開する場合は並列にしません
+        resuming = checkpoint is not None and checkpoint.segments
+        if not resuming and self._use_parallel(model_name, audio, decode_options):
+            # モデルは各ワーカーが持つので、このプロセスでは読み込みません
+            return self._get_parallel(model_name).stream(audio, language=language)
+
+        with timer.stage("load_model", model=model_name):
+            self.load_model(model_name)
+        # チェックポイントの位置は無音除去を使う場合も除去後の音声の中の位置なので、そのまま渡せます
+        start_seek, prompt = (checkpoint.seek, checkpoint.prompt) if checkpoint else (0, "")
+        return TranscriptionStream(self.model, audio, language=language, decode_options=decode_options,
+                                   start_seek=start_seek, prompt=prompt, on_window=on_window)
+
+    def _use_parallel(self, model_name, audio, decode_options=None):
+        """
+        audio をチャンク並列で文字起こしするかどうかを返す（ワーカーの起動などはしない）。
+        チャンクが2つ以上にならない短い音声では、プロセスを起動するコストの方が大きいので使わない。
+        GPUがある場合も、1つのモデルで処理する方が速いので使わない。
+        """
+        if decode_options or not self.parallel_workers or self.parallel_workers <= 1:
+            return False
+        if audio.duration is None or audio.duration < self.chunk_seconds * 1.5:
+            return False
+        return not (torch.cuda.is_available() and not is_quantized(model_name))
+
+    def _get_parallel(self, model_name):
+        """
+        チャンク並列で使う ParallelTranscriber を返す。設定が変わっていれば作り直す。
+        """
+        if self.parallel is None or self.parallel.model_name != model_name \
+                or self.parallel.workers != self.parallel_workers \
+                or self.parallel.chunk_seconds != self.chunk_seconds:
+            if self.parallel:
+                self.parallel.shutdown()
+            self.parallel = ParallelTranscriber(model_name, self.parallel_workers, self.chunk_seconds)
+        return self.parallel
+
+    def _open_checkpoint(self, audio, model_name, options, audio_key=None):
+        """
+        途中経過を保存する TranscriptionCheckpoint を返す。
+        チャンク並列で文字起こしする場合は _stream がチェックポイントを使わないので、何も保存されない。
+        """
+        if not self.checkpoints:
+            return None
+        return self.checkpoints.open(audio, model_name, options, audio_key=audio_key)
+
+    def _get_diarization_worker(self, hf_token):
+        """
+        話者分離のワーカーを返す。トークンかスレッド数が変わっていれば作り直す。
+        """
+        _, diarization_threads = split_thread_budget(self.whisper_threads, self.diarization_threads)
+        if self.diarization_worker is None or self.diarization_worker.hf_token != hf_token \
+                or self.diarization_worker.num_threads != diarization_threads:
+            if self.diarization_worker:
+                self.diarization_worker.shutdown()
+            self.diarization_worker = DiarizationWorker(hf_token=hf_token, num_threads=diarization_threads)
+        return self.diarization_worker
+
+    def _start_concurrent_diarization(self, audio, hf_token):
+        """
+        話者分離を別プロセスで開始し、Future を返す。開始できなかった場合は None を返す。
+        """
+        whisper_threads, diarization_threads = split_thread_budget(self.whisper_threads, self.diarization_threads)
+
+        try:
+            future = self._get_diarization_worker(hf_token).submit(audio)
+        except Exception as e:
+            print(f"Could not start concurrent diarization, running it after transcription: {e}", file=sys.stderr)
+            return None
+
+        # Whisper側のスレッド数も制限し、2つの処理でコアを取り合わないようにします
+        torch.set_num_threads(whisper_threads)
+        print(f"Diarization running concurrently (whisper threads: {whisper_threads}, diarization threads: {diarization_threads})", file=sys.stderr)
+        return future
 
     def _get_speaker_for_segment(self, start, end, diarization_segments):
+        """
+        1つのセグメントの話者を求める。
+        セグメントのリスト全体に割り当てる場合は assign_speakers を使う方が速い。
+        """
         if not diarization_segments:
             return None
             
@@ -65,176 +387,302 @@ class Transcriber:
         return text
 
 
-    def transcribe(self, audio_path, model_name="base", progress_callback=None, text_callback=None, hf_token=None):
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    def _replay_cached(self, cached, progress_callback=None, text_callback=None, segment_callback=None):
+        """
+        キャッシュから読み込んだ文字起こし結果を、通常の実行と同じようにコールバックへ流して返す。
+        """
+        segments = [dict(segment) for segment in cached["segments"]]
+        for segment in segments:
+            if text_callback and segment["text"]:
+                text_callback(segment["text"])
+            if segment_callback:
+                segment_callback(segment)
+        if progress_callback:
+            progress_callback(1.0)
 
-        self.load_model(model_name)
-        
-        print(f"Transcribing {audio_path}...")
-        
-        # 進捗バーの表示用に、音声ファイルの長さを計算します
-        # whisper.load_audio は音声を読み込んで配列にします（16kHzにリサンプリングされます）
-        audio = whisper.load_audio(audio_path)
-        duration = len(audio) / 16000 # 16kHzで割って秒数を算出
-        print(f"Audio duration: {duration:.2f}s")
-
-        # 進捗を追跡するために詳細出力をキャプチャ
-        import sys
-        import io
-        import re
-
-        class ProgressCapture(io.StringIO):
-            def __init__(self, progress_cb, text_cb, duration):
-                super().__init__()
-                self.progress_cb = progress_cb
-                self.text_cb = text_cb
-                self.duration = duration
-                self.pattern = re.compile(r"\[(\d{2}:\d{2}\.\d{3}) --> (\d{2}:\d{2}\.\d{3})\]\s*(.*)")
-
-
-            def write(self, text):
-                super().write(text)
-                if sys.__stdout__:
-                    sys.__stdout__.write(text) # 通過させる
-                
-                # タイムスタンプとテキストを解析
-                for match in self.pattern.finditer(text):
-                    if self.progress_cb and self.duration > 0:
-                        end_time_str = match.group(2)
-                        minutes, seconds = end_time_str.split(":")
-                        current_seconds = float(minutes) * 60 + float(seconds)
-                        progress = min(current_seconds / self.duration, 1.0)
-                        self.progress_cb(progress)
-                    
-                    if self.text_cb:
-                        content = match.group(3).strip()
-                        if content:
-                            self.text_cb(content)
-
-        # 標準出力（print関数の出力先）を一時的に書き換えます to capture progress
-        # これにより、Whisperの内部ログから進捗状況を読み取ることができます
-        original_stdout = sys.stdout
-        
-        try:
-            if progress_callback or text_callback:
-                sys.stdout = ProgressCapture(progress_callback, text_callback, duration)
-            
-            # ここで実際に文字起こし処理を実行します
-            # verbose=True にすることで、進捗がコンソールに出力され、それをキャプチャします
-            result = self.model.transcribe(audio_path, verbose=True, fp16=False)
-            
-            # 文字起こし完了直後に標準出力をリセット
-            sys.stdout = original_stdout
-            
-            # HF_TOKENが利用可能な場合、ダイアライゼーションを実行
-            # 注: 渡されたhf_tokenを優先し、次に環境変数を確認する（Diarizer内で確認）
-            if hf_token or os.environ.get("HF_TOKEN"):
-                try:
+        result = dict(cached)
+        result["segments"] = segments
+        return result
+
+    def transcribe(self, audio_path, model_name="base", progress_callback=None, text_callback=None, hf_token=None,
+                   timer=None, segment_callback=None, language=None, **decode_options):
+        """
+        音声を文字起こしする。
+        audio_path にはファイルパスか、デコード済みの DecodedAudio を渡せる。
+        language と decode_options（beam_size など）は iter_segments と同じくWhisperにそのまま渡す。
+        timer（StageTimer）を渡すと各段階の時間とメモリを記録し、結果の "timing" にも含める。
+        segment_callback(segment) には確定したセグメント（start / end / text）が順に渡される（途中経過の要約などに使う）。
+        """
+        timer = timer or StageTimer()
+
+        # ジョブごとに1回だけデコードし、Whisperとダイアライザーで同じPCMを使い回します
+        audio = DecodedAudio.from_source(audio_path)
+
+        # HF_TOKENが利用可能な場合、ダイアライゼーションを実行
+        # 注: 渡されたhf_tokenを優先し、次に環境変数を確認する（Diarizer内で確認）
+        use_diarization = bool(hf_token or os.environ.get("HF_TOKEN"))
+
+        # 同じ音声を同じ設定で文字起こし済みなら、デコードもWhisperも話者分離も省きます
+        cached = None
+        cached_turns = None
+        # 結果が変わる設定はすべてキーに含め、設定の違う文字起こしが同じエントリーを共有しないようにします
+        cache_options = {"vad_filter": self.vad_filter, "language": language, "decode_options": decode_options}
+        if self.cache:
+            with timer.stage("cache_lookup") as info:
+                audio_key = self.cache.audio_key(audio)
+                cached = self.cache.get_transcription(audio_key, model_name, cache_options)
+                cached_turns = self.cache.get_turns(audio_key) if use_diarization else None
+                info["hit"] = cached is not None
+
+        if cached is None or (use_diarization and cached_turns is None):
+            with timer.stage("audio_decode"):
+                audio.samples
+
+        # 話者分離はWhisperの結果とは独立しているので、マージまでは別プロセスで同時に進めます
+        diarization_future = None
+        original_threads = None
+        if use_diarization and self.concurrent_diarization and cached is None and cached_turns is None:
+            original_threads = torch.get_num_threads()
+            diarization_future = self._start_concurrent_diarization(audio, hf_token)
+
+        if cached is not None:
+            print(f"Using cached transcription for {audio.path}", file=sys.stderr)
+            result = self._replay_cached(cached, progress_callback, text_callback, segment_callback)
+        else:
+            # デコードループから流れてくるセグメントイベントを受け取り、
+            # progress_callback / text_callback はその薄いアダプターとして呼び出します
+            segments = []
+            checkpoint = self._open_checkpoint(audio, model_name, cache_options, audio_key if self.cache else None)
+            on_window = None
+            if checkpoint is not None:
+                # 前回途中で止まった文字起こしは、確定済みのセグメントを流してから続きをデコードします
+                segments = [dict(segment) for segment in checkpoint.segments]
+                language = language or checkpoint.language
+                if segments:
+                    print(f"Resuming from checkpoint: {len(segments)} segments "
+                          f"({segments[-1]['end']:.1f}s) already transcribed", file=sys.stderr)
+                    for segment in segments:
+                        if text_callback and segment["text"]:
+                            text_callback(segment["text"])
+                        if segment_callback:
+                            segment_callback(segment)
+                    if progress_callback and checkpoint.state.get("progress"):
+                        progress_callback(checkpoint.state["progress"])
+
+                def on_window(seek, prompt, window_language):
+                    progress = segments[-1]["end"] / audio.duration if segments and audio.duration else None
+                    checkpoint.update(seek, prompt, window_language, segments, progress=progress)
+
+            stream = self.iter_segments(audio, model_name, language=language, timer=timer, checkpoint=checkpoint,
+                                        on_window=on_window, **decode_options)
+            try:
+                with timer.stage("whisper", model=model_name):
+                    for event in stream:
+                        segments.append(event.to_segment(len(segments)))
+                        if progress_callback:
+                            progress_callback(event.progress)
+                        if text_callback and event.text:
+                            text_callback(event.text)
+                        if segment_callback:
+                            segment_callback(segments[-1])
+            except Exception:
+                if checkpoint is not None and checkpoint.segments:
+                    # 最後に区切りまで進んだ位置を保存し、次の実行でそこから再開します
+                    checkpoint.save()
+                if diarization_future is not None:
+                    diarization_future.cancel()
+                if audio.is_shared:
+                    audio.release()
+                raise
+            finally:
+                if original_threads:
+                    torch.set_num_threads(original_threads)
+
+            result = {
+                "text": "".join(s["text"] for s in segments),
+                "segments": segments,
+                "language": stream.language,
+            }
+            if isinstance(stream, SpeechFilteredStream):
+                # 無音として読み飛ばした長さを記録しておきます
+                result["vad"] = {
+                    "speech_seconds": stream.timeline.speech_seconds,
+                    "skipped_seconds": stream.timeline.skipped_seconds,
+                }
+            if self.cache:
+                # 話者を割り当てる前のWhisperの結果を保存します
+                self.cache.put_transcription(audio_key, model_name, cache_options, result)
+            if checkpoint is not None:
+                checkpoint.remove()
+
+        if use_diarization:
+            try:
+                if cached_turns is not None:
+                    diarization_segments = cached_turns
+                elif diarization_future is not None:
+                    # 別プロセスの話者分離が終わるのを待ってからマージします
+                    # （ここで記録されるのはWhisperの後に待った時間だけです）
+                    with timer.stage("diarization", concurrent=True):
+                        diarization_segments = diarization_future.result()
+                else:
                     from .diarizer import SpeakerDiarizer
                     if not self.diarizer:
                         self.diarizer = SpeakerDiarizer(use_auth_token=hf_token)
-                    
-                    diarization_segments = self.diarizer.diarize(audio_path)
-                    
-                    # 結果をマージ
-                    # 結果の"segments"キーには{start, end, text, ...}のリストが含まれる
-                    formatted_text = ""
-                    current_speaker = None
-                    speaker_mapping = {} # SPEAKER_00をAさん、SPEAKER_01をBさんなどにマッピング
-                    speaker_count = 0
-                    
-                    segments_with_speaker = []
-                    
-                    for segment in result["segments"]:
-                        start = segment["start"]
-                        end = segment["end"]
-                        text = segment["text"]
-                        
-                        speaker_label = self._get_speaker_for_segment(start, end, diarization_segments)
-                        
-                        if speaker_label:
-                            if speaker_label not in speaker_mapping:
-                                # 簡略化された名前A、B、C...を割り当て
-                                # または、必要ならラベルをそのまま使用するが、ユーザーはAさん Bさんを求めていた
-                                letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-                                name = f"{letters[speaker_count % len(letters)]}さん"
-                                speaker_mapping[speaker_label] = name
-                                speaker_count += 1
-                            
-                            display_name = speaker_mapping[speaker_label]
-                        else:
-                            display_name = "不明" # Unknown
-
-                        segments_with_speaker.append({
-                            "display_name": display_name,
-                            "text": text
-                        })
-
-                    # 最終テキストのフォーマット
-                    # Aさん: ...
-                    # ...
-                    # (Break)
-                    # Bさん: ...
-                    
-                    final_lines = []
-                    
-                    # 話者ごとにセグメントをグループ化
-                    current_speaker = None
-                    current_block_text = []
-                    
-                    for seg in segments_with_speaker:
-                        speaker = seg["display_name"]
-                        text = seg["text"].strip()
-                        
-
-                        if speaker != current_speaker:
-                            # 現在のブロックがあればフラッシュ
-                            if current_block_text:
-                                block_content = "\n".join(current_block_text)
-                                block_content = self._add_line_breaks(block_content)
-                                
-                                final_lines.append(f"{current_speaker}:")
-                                final_lines.append(block_content)
-                                final_lines.append("") # 話者間の空行
-                            
-                            current_speaker = speaker
-                            current_block_text = []
-                        
-                        current_block_text.append(text)
-                    
-
-                    # 最後のブロックをフラッシュ
-                    if current_block_text:
-                        block_content = "\n".join(current_block_text)
-                        block_content = self._add_line_breaks(block_content)
-                        
-                        final_lines.append(f"{current_speaker}:")
-                        final_lines.append(block_content)
-                    
-                    result["text"] = "\n".join(final_lines)
-                    print("Diarization applied and text formatted.")
-                    
-                except Exception as e:
-                    print(f"Diarization failed: {e}")
-                    # ダイアライゼーションが失敗した場合、元のテキストにフォールバックするが、改行は適用する
+
+                    with timer.stage("diarization_load"):
+                        self.diarizer.load_pipeline()
+                    with timer.stage("diarization"):
+                        diarization_segments = self.diarizer.diarize(audio)
+
+                if self.cache and cached_turns is None:
+                    self.cache.put_turns(audio_key, diarization_segments)
+
+                with timer.stage("speaker_merge"):
+                    # 話者区間を1回の走査で全セグメントに割り当てます
+                    assignments = assign_speakers(result["segments"], diarization_segments)
+                    for segment, assignment in zip(result["segments"], assignments):
+                        segment["speaker"] = assignment["speaker"]
+                        # 複数人が同時に話している割合も結果に残しておきます
+                        segment["overlap_fraction"] = assignment["overlap_fraction"]
+
+                with timer.stage("format"):
+                    result["text"] = self._format_speaker_text(result["segments"])
+                print("Diarization applied and text formatted.", file=sys.stderr)
+
+            except Exception as e:
+                print(f"Diarization failed: {e}", file=sys.stderr)
+                # ダイアライゼーションが失敗した場合、元のテキストにフォールバックするが、改行は適用する
+                with timer.stage("format"):
                     if "segments" in result:
                          text_from_segments = "\n".join([s["text"].strip() for s in result["segments"]])
                          result["text"] = self._add_line_breaks(text_from_segments)
                     else:
                          result["text"] = self._add_line_breaks(result["text"])
-            else:
-                # ダイアライゼーションなしだが、行のフォーマットは行う
-                # 句読点がなくても改行を確実にするためにセグメントから再構築
+        else:
+            # ダイアライゼーションなしだが、行のフォーマットは行う
+            # 句読点がなくても改行を確実にするためにセグメントから再構築
+            with timer.stage("format"):
                 if "segments" in result:
                     text_from_segments = "\n".join([s["text"].strip() for s in result["segments"]])
                     result["text"] = self._add_line_breaks(text_from_segments)
                 else:
                     result["text"] = self._add_line_breaks(result["text"])
-                    
-        finally:
-            sys.stdout = original_stdout
+
+        audio_seconds = audio.duration if cached is None else None
+        if audio_seconds is None and result["segments"]:
+            audio_seconds = result["segments"][-1]["end"]
+        result["timing"] = timer.to_dict(audio_seconds)
+
+        if audio.is_shared:
+            # 話者分離やチャンク並列のワーカーと共有するために共有メモリに移したPCMを破棄します
+            audio.release()
 
         return result
 
+    def transcribe_live(self, source, model_name="base", update_callback=None, language=None, timer=None,
+                        step_seconds=STEP_SECONDS, max_buffer_seconds=MAX_BUFFER_SECONDS):
+        """
+        マイクなどの音声ソースから届く音声を、録音しながら文字起こしする。
+        デコードするたびに update_callback へ LiveUpdate（確定したセグメントと仮のテキスト）を渡し、
+        source.close() で録音が止まったら transcribe と同じ形式の結果を返す。
+        """
+        timer = timer or StageTimer()
+        with timer.stage("load_model", model=model_name):
+            self.load_model(model_name)
+
+        stream = LiveTranscriptionStream(self.model, source, language=language, step_seconds=step_seconds,
+                                         max_buffer_seconds=max_buffer_seconds)
+        segments = []
+        with timer.stage("live", model=model_name):
+            for update in stream:
+                for event in update.committed:
+                    segments.append(event.to_segment(len(segments)))
+                if update_callback:
+                    update_callback(update)
+
+        with timer.stage("format"):
+            text = self._add_line_breaks("\n".join(s["text"] for s in segments))
+
+        return {
+            "text": text,
+            "segments": segments,
+            "language": stream.language,
+            "timing": timer.to_dict(stream.received_samples / SAMPLE_RATE),
+        }
+
+    def _format_speaker_text(self, segments):
+        """
+        話者を割り当てたセグメントを「Aさん:」のような見出し付きのブロックに整形する。
+        """
+        # 結果をマージ
+        # 結果の"segments"キーには{start, end, text, ...}のリストが含まれる
+        speaker_mapping = {} # SPEAKER_00をAさん、SPEAKER_01をBさんなどにマッピング
+        speaker_count = 0
+
+        segments_with_speaker = []
+
+        for segment in segments:
+            text = segment["text"]
+
+            speaker_label = segment["speaker"]
+
+            if speaker_label:
+                if speaker_label not in speaker_mapping:
+                    # 簡略化された名前A、B、C...を割り当て
+                    # または、必要ならラベルをそのまま使用するが、ユーザーはAさん Bさんを求めていた
+                    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+                    name = f"{letters[speaker_count % len(letters)]}さん"
+                    speaker_mapping[speaker_label] = name
+                    speaker_count += 1
+
+                display_name = speaker_mapping[speaker_label]
+            else:
+                display_name = "不明" # Unknown
+
+            segments_with_speaker.append({
+                "display_name": display_name,
+                "text": text
+            })
+
+        # 最終テキストのフォーマット
+        # Aさん: ...
+        # ...
+        # (Break)
+        # Bさん: ...
+
+        final_lines = []
+
+        # 話者ごとにセグメントをグループ化
+        current_speaker = None
+        current_block_text = []
+
+        for seg in segments_with_speaker:
+            speaker = seg["display_name"]
+            text = seg["text"].strip()
+
+
+            if speaker != current_speaker:
+                # 現在のブロックがあればフラッシュ
+                if current_block_text:
+                    block_content = "\n".join(current_block_text)
+                    block_content = self._add_line_breaks(block_content)
+
+                    final_lines.append(f"{current_speaker}:")
+                    final_lines.append(block_content)
+                    final_lines.append("") # 話者間の空行
+
+                current_speaker = speaker
+                current_block_text = []
+
+            current_block_text.append(text)
+
+
+        # 最後のブロックをフラッシュ
+        if current_block_text:
+            block_content = "\n".join(current_block_text)
+            block_content = self._add_line_breaks(block_content)
+
+            final_lines.append(f"{current_speaker}:")
+            final_lines.append(block_content)
 
+        return "\n".join(final_lines)
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .audio import DecodedAudio
+from .disk_cache import DiskCache
+
+# 既定のキャッシュの保存先（Whisperのモデルと同じく ~/.cache の下に置く）
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mojiokoshi", "transcripts")
+# この大きさ以下のファイルは全体をハッシュし、それより大きいファイルは一部だけを読む
+FULL_HASH_MAX_BYTES = 16 * 1024 * 1024
+# 部分ハッシュで読むブロックの大きさと数
+SAMPLE_BLOCK_BYTES = 256 * 1024
+SAMPLE_BLOCKS = 32
+# キャッシュ形式を変えたときに古いエントリーを使わないようにするためのバージョン
+CACHE_VERSION = 1
+
+
+def hash_file(path):
+    """
+    音声ファイルの内容のハッシュを返す。
+    大きいファイルは先頭・末尾と等間隔のブロックだけを読み、ファイルサイズと更新時刻（st_mtime_ns）と合わせてハッシュする。
+    音声のデコードとは別に全体を読み直さずに済むため、長い録音でもすぐに求まる。
+    読まなかった部分だけを編集した同じ大きさのファイルも、更新時刻が変わるので別のキーになる
+    （その代わり、更新時刻を保たずにコピーした大きいファイルはキャッシュを使えない）。
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(size).encode())
+    with open(path, "rb") as f:
+        if size <= FULL_HASH_MAX_BYTES:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        else:
+            digest.update(str(stat.st_mtime_ns).encode())
+            last = size - SAMPLE_BLOCK_BYTES
+            for i in range(SAMPLE_BLOCKS):
+                f.seek(last * i // (SAMPLE_BLOCKS - 1))
+                digest.update(f.read(SAMPLE_BLOCK_BYTES))
+    return digest.hexdigest()
+
+
+def hash_samples(samples):
+    """
+    デコード済みのPCM配列のハッシュを返す（ファイルのない DecodedAudio 用）。
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(memoryview(np.ascontiguousarray(samples, dtype=np.float32)).cast("B"))
+    return digest.hexdigest()
+
+
+def _options_key(model_name, options):
+    payload = json.dumps({"model": model_name, "options": options, "version": CACHE_VERSION}, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+class TranscriptionCache(DiskCache):
+    """
+    文字起こし結果（Whisperのセグメント）と話者分離の結果をディスクに保存するキャッシュ。
+    エントリーは「音声のハッシュ-モデルとオプションのハッシュ.json」というファイル名で保存する。
+    保存と合計サイズによる削除（LRU）は DiskCache が行う。
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=512 * 1024 * 1024):
+        super().__init__(cache_dir or DEFAULT_CACHE_DIR, max_bytes)
+        # (パス, サイズ, 更新時刻) ごとのハッシュ。同じファイルを何度もハッシュしないようにします
+        self._hashes = {}
+
+    def audio_key(self, audio):
+        """
+        DecodedAudio の内容を表すキーを返す。
+        """
+        if audio.path and os.path.exists(audio.path):
+            stat = os.stat(audio.path)
+            memo_key = (os.path.abspath(audio.path), stat.st_size, stat.st_mtime_ns)
+            if memo_key not in self._hashes:
+                self._hashes[memo_key] = hash_file(audio.path)
+            return self._hashes[memo_key]
+        return hash_samples(audio.samples)
+
+    def _entry_path(self, audio_key, name):
+        return self._path(f"{audio_key}-{name}")
+
+    def get_transcription(self, audio_key, model_name, options=None):
+        """
+        保存済みの文字起こし結果 {"segments", "language", ...} を返す。なければ None を返す。
+        """
+        return self._read(self._entry_path(audio_key, _options_key(model_name, options or {})))
+
+    def put_transcription(self, audio_key, model_name, options, result):
+        self._write(self._entry_path(audio_key, _options_key(model_name, options or {})), result)
+
+    def get_turns(self, audio_key):
+        """
+        保存済みの話者分離の結果を返す。話者分離はWhisperのモデルによらないので、音声だけで引く。
+        """
+        data = self._read(self._entry_path(audio_key, "diarization"))
+        return data["turns"] if data else None
+
+    def put_turns(self, audio_key, turns):
+        self._write(self._entry_path(audio_key, "diarization"), {"turns": turns})
+
+    def invalidate(self, audio=None):
+        """
+        キャッシュを削除する。audio（パス、DecodedAudio、または audio_key）を渡した場合は、
+        その音声のエントリーだけを削除する。削除したエントリーの数を返す。
+        """
+        prefix = None
+        if audio is not None:
+            if isinstance(audio, str) and not os.path.exists(audio):
+                prefix = audio
+            else:
+                source = audio if isinstance(audio, DecodedAudio) else DecodedAudio(audio)
+                prefix = self.audio_key(source)
+
+        return self._remove(prefix + "-" if prefix else None)
+
+
+def build_cache(cache_config):
+    """
+    config.json の "cache" セクションから TranscriptionCache を作成する。無効なら None を返す。
+    """
+    cache_config = cache_config or {}
+    if not cache_config.get("enabled", True):
+        return None
+    return TranscriptionCache(
+        cache_dir=cache_config.get("dir"),
+        max_bytes=int(cache_config.get("max_mb", 512) * 1024 * 1024)
+    )
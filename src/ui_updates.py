@@ -0,0 +1,129 @@
+import collections
+import queue
+
+# 画面を更新する間隔（ミリ秒）。約20fpsで、まとめて1回だけ描画します
+FLUSH_INTERVAL_MS = 50
+# 1回の更新で挿入する最大文字数（キャッシュから一度に大量のテキストが届いても画面を固めないため）
+MAX_CHARS_PER_FLUSH = 64 * 1024
+
+APPEND = "append"
+SET = "set"
+CALL = "call"
+
+
+class UIUpdateCoalescer:
+    """
+    ワーカースレッドからの画面更新をキューにため、メインスレッドで一定間隔ごとにまとめて反映する。
+
+    - append(key, text): テキストの追加。同じ key への追加は1回の挿入にまとめる
+    - set(key, value): 進捗などの値の更新。1回の更新では最後の値だけを反映する
+    - call(func, *args): それ以外の処理。それより前の追加・値の更新を反映してから、順番を保って実行する
+
+    キューへの追加はどのスレッドからでもよく、Tkへのアクセスは start() を呼んだメインスレッドだけで行う。
+    """
+
+    def __init__(self, widget, interval_ms=FLUSH_INTERVAL_MS, max_chars=MAX_CHARS_PER_FLUSH):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.max_chars = max_chars
+        self.queue = queue.SimpleQueue()
+        # まだ反映していない更新（1回で挿入しきれなかったテキストの残りも含む）
+        self.backlog = collections.deque()
+        self.append_handlers = {}
+        self.set_handlers = {}
+        self.running = False
+
+    def on_append(self, key, handler):
+        self.append_handlers[key] = handler
+
+    def on_set(self, key, handler):
+        self.set_handlers[key] = handler
+
+    def append(self, key, text):
+        if text:
+            self.queue.put((APPEND, key, text))
+
+    def set(self, key, value):
+        self.queue.put((SET, key, value))
+
+    def call(self, func, *args):
+        self.queue.put((CALL, func, args))
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.widget.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        self.running = False
+
+    def _tick(self):
+        if not self.running:
+            return
+        try:
+            self.flush()
+        finally:
+            self.widget.after(self.interval_ms, self._tick)
+
+    @property
+    def pending(self):
+        return bool(self.backlog) or not self.queue.empty()
+
+    def flush(self):
+        """
+        たまっている更新を反映する。テキストは max_chars までしか挿入せず、残りは次の更新に回す。
+        """
+        while True:
+            try:
+                self.backlog.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        budget = self.max_chars
+        texts = {}
+        values = {}
+        while self.backlog:
+            kind, key, value = self.backlog[0]
+            if kind == APPEND:
+                if budget <= 0:
+                    break
+                part = value[:budget]
+                texts.setdefault(key, []).append(part)
+                budget -= len(part)
+                if len(part) < len(value):
+                    self.backlog[0] = (APPEND, key, value[len(part):])
+                    break
+                self.backlog.popleft()
+            elif kind == SET:
+                values[key] = value
+                self.backlog.popleft()
+            else:
+                # 画面を消すなどの処理より前に届いたテキストと値は、先に反映しておきます
+                self._apply_texts(texts)
+                self._apply_values(values)
+                texts = {}
+                values = {}
+                self.backlog.popleft()
+                key(*value)
+
+        self._apply_texts(texts)
+        self._apply_values(values)
+
+    def _apply_texts(self, texts):
+        for key, parts in texts.items():
+            self.append_handlers[key]("".join(parts))
+
+    def _apply_values(self, values):
+        for key, value in values.items():
+            self.set_handlers[key](value)
+
+
+def append_to_textbox(textbox, text):
+    """
+    テキストボックスの末尾に追加する。末尾を表示していたときだけ自動でスクロールし、
+    ユーザーが上の方を読んでいるときは表示位置を動かさない。
+    """
+    at_bottom = textbox.yview()[1] >= 0.999
+    textbox.insert("end", text)
+    if at_bottom:
+        textbox.see("end")
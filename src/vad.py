@@ -0,0 +1,157 @@
+import numpy as np
+
+from .audio import SAMPLE_RATE
+
+# 音量を計算するフレームの長さ（30ms）
+FRAME_SECONDS = 0.03
+
+
+def frame_energies(samples, frame_seconds=FRAME_SECONDS):
+    """
+    PCMをフレームに区切り、フレームごとの音量（dBFS）を返す。
+    """
+    frame_length = int(frame_seconds * SAMPLE_RATE)
+    n_frames = len(samples) // frame_length
+    if n_frames == 0:
+        return np.zeros(0)
+    frames = np.asarray(samples[:n_frames * frame_length], dtype=np.float32).reshape(n_frames, frame_length)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def _runs(mask):
+    """
+    真偽値の配列から、True が続く区間の (開始, 終了) フレーム番号の配列を返す。
+    """
+    padded = np.concatenate(([False], mask, [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    return changes.reshape(-1, 2)
+
+
+def detect_speech(samples, threshold_db=None, min_speech=0.25, min_silence=0.5, padding=0.2,
+                  frame_seconds=FRAME_SECONDS):
+    """
+    音量ベースの簡易VADで発話区間を検出し、(開始サンプル, 終了サンプル) のリストを返す。
+
+    threshold_db を省略した場合は、静かなフレーム（下位10%）の音量を雑音レベルとみなし、
+    そこから 12dB 以上大きいフレームを発話とする（ただし -50dBFS 未満は常に無音扱い）。
+    min_silence より短い無音は発話に含め、min_speech より短い発話は捨てる。
+    区間の前後には padding 秒の余白を付ける。
+    """
+    energies = frame_energies(samples, frame_seconds)
+    if len(energies) == 0:
+        return []
+
+    if threshold_db is None:
+        noise_floor = np.percentile(energies, 10)
+        threshold_db = max(noise_floor + 12.0, -50.0)
+
+    runs = _runs(energies > threshold_db)
+    if len(runs) == 0:
+        return []
+
+    # 短い無音をはさんだ発話同士をつなげます
+    min_silence_frames = int(min_silence / frame_seconds)
+    merged = [list(runs[0])]
+    for start, end in runs[1:]:
+        if start - merged[-1][1] < min_silence_frames:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    frame_length = int(frame_seconds * SAMPLE_RATE)
+    min_speech_frames = int(min_speech / frame_seconds)
+    pad = int(padding * SAMPLE_RATE)
+    total = len(samples)
+
+    regions = []
+    for start, end in merged:
+        if end - start < min_speech_frames:
+            continue
+        region_start = max(0, start * frame_length - pad)
+        region_end = min(total, end * frame_length + pad)
+        if regions and region_start <= regions[-1][1]:
+            # 余白を付けた結果重なった区間はまとめます
+            regions[-1] = (regions[-1][0], region_end)
+        else:
+            regions.append((region_start, region_end))
+    return regions
+
+
+def find_split_points(samples, chunk_seconds, search_seconds=None, frame_seconds=FRAME_SECONDS):
+    """
+    音声をおよそ chunk_seconds ごとに区切るための分割位置（サンプル番号）のリストを返す。
+    各目標位置の前後 search_seconds の範囲で最も静かなフレームの中央を分割位置にするため、
+    発話の途中で切れにくい。
+    """
+    total = len(samples)
+    if total <= chunk_seconds * SAMPLE_RATE:
+        return []
+
+    search_seconds = search_seconds if search_seconds is not None else chunk_seconds * 0.15
+    energies = frame_energies(samples, frame_seconds)
+    frame_length = int(frame_seconds * SAMPLE_RATE)
+    search_frames = max(1, int(search_seconds / frame_seconds))
+
+    points = []
+    target = chunk_seconds * SAMPLE_RATE
+    while target < total - chunk_seconds * SAMPLE_RATE * 0.25:
+        center = int(target // frame_length)
+        low = max(0, center - search_frames)
+        high = min(len(energies), center + search_frames + 1)
+        if high <= low:
+            break
+        quietest = low + int(np.argmin(energies[low:high]))
+        point = quietest * frame_length + frame_length // 2
+        if points and point <= points[-1]:
+            point = int(target)
+        points.append(point)
+        target = point + chunk_seconds * SAMPLE_RATE
+    return points
+
+
+class SpeechTimeline:
+    """
+    発話区間だけをつなげた音声と、元の音声との時刻の対応を表す。
+    つなげた音声上の時刻（Whisperが返すタイムスタンプ）を to_original で元の時刻に戻せる。
+    """
+
+    def __init__(self, regions, total_samples):
+        self.regions = list(regions)
+        self.total_samples = total_samples
+        lengths = np.array([end - start for start, end in self.regions], dtype=np.int64)
+        # つなげた音声上での各区間の開始位置
+        self.compact_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(lengths) else np.zeros(0, dtype=np.int64)
+        self.speech_samples = int(lengths.sum())
+
+    @property
+    def speech_seconds(self):
+        return self.speech_samples / SAMPLE_RATE
+
+    @property
+    def skipped_seconds(self):
+        return (self.total_samples - self.speech_samples) / SAMPLE_RATE
+
+    def compact(self, samples):
+        """
+        発話区間だけをつなげたPCMを返す。
+        """
+        if not self.regions:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate([samples[start:end] for start, end in self.regions])
+
+    def to_original(self, seconds, is_end=False):
+        """
+        つなげた音声上の時刻（秒）を元の音声の時刻（秒）に変換する。
+        区間のつなぎ目ちょうどの時刻は、開始時刻なら後ろの区間の先頭に、
+        終了時刻（is_end=True）なら前の区間の末尾に対応させる。
+        """
+        if not self.regions:
+            return seconds
+        position = seconds * SAMPLE_RATE
+        side = "left" if is_end else "right"
+        index = max(0, int(np.searchsorted(self.compact_starts, position, side=side)) - 1)
+        start, end = self.regions[index]
+        # 区間の長さを超える位置（末尾の丸め誤差など）はその区間の終わりに収めます
+        original = start + min(position - self.compact_starts[index], end - start)
+        return original / SAMPLE_RATE
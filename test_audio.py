@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import patch
+
+from src.audio import DecodedAudio, SAMPLE_RATE
+
+class TestDecodedAudio(unittest.TestCase):
+    @patch("src.audio.probe_duration")
+    @patch("src.audio.whisper")
+    def test_duration_from_metadata_without_decoding(self, mock_whisper, mock_probe):
+        mock_probe.return_value = 7200.0
+
+        audio = DecodedAudio("meeting.m4a")
+
+        # メタデータから長さを取得し、デコードは行われないこと
+        self.assertEqual(audio.duration, 7200.0)
+        mock_whisper.load_audio.assert_not_called()
+
+    @patch("src.audio.probe_duration")
+    @patch("src.audio.whisper")
+    def test_decode_only_once(self, mock_whisper, mock_probe):
+        mock_probe.return_value = None
+        mock_whisper.load_audio.return_value = [0.0] * (SAMPLE_RATE * 2)
+
+        audio = DecodedAudio("meeting.wav")
+        first = audio.samples
+        second = audio.samples
+
+        # 何度アクセスしても同じ配列を返し、ffmpegによるデコードは1回だけ
+        self.assertIs(first, second)
+        self.assertEqual(mock_whisper.load_audio.call_count, 1)
+        # メタデータが読めない場合はPCMの長さから求める
+        self.assertAlmostEqual(audio.duration, 2.0)
+
+    def test_from_source_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            DecodedAudio.from_source("does_not_exist.mp3")
+
+    def test_from_source_passthrough(self):
+        audio = DecodedAudio("meeting.wav")
+        self.assertIs(DecodedAudio.from_source(audio), audio)
+
+if __name__ == "__main__":
+    unittest.main()
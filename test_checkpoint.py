@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from src.audio import DecodedAudio, SAMPLE_RATE
+from src.checkpoint import CheckpointStore
+from src.transcriber import Transcriber
+
+TOTAL_SECONDS = 150
+
+
+def ramp_audio():
+    # サンプルの値から音声の先頭からの位置がわかる音声（フェイクモデルが使う）
+    total = TOTAL_SECONDS * SAMPLE_RATE
+    return (0.2 + 0.5 * np.arange(total) / total).astype(np.float32)
+
+
+class WindowModel:
+    """
+    30秒の窓ごとに14秒のセグメントを2つ返すフェイクのWhisperモデル。
+    crash_at 回目の呼び出しで例外を投げ、途中で止まったジョブを再現する。
+    """
+
+    def __init__(self, crash_at=None):
+        self.crash_at = crash_at
+        self.offsets = []
+
+    def transcribe(self, audio, **kwargs):
+        if len(self.offsets) + 1 == self.crash_at:
+            raise MemoryError("out of memory")
+        offset = round((float(audio[0]) - 0.2) / 0.5 * TOTAL_SECONDS * SAMPLE_RATE) / SAMPLE_RATE
+        self.offsets.append(offset)
+        return {"language": "ja", "segments": [
+            {"start": 0.0, "end": 14.0, "text": f"{offset:.0f}秒から。"},
+            {"start": 14.0, "end": 28.0, "text": f"{offset + 14:.0f}秒から。"},
+        ]}
+
+
+class TestCheckpointResume(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.audio_path = os.path.join(self.tmp.name, "long.wav")
+        with open(self.audio_path, "wb") as f:
+            f.write(b"recording")
+        # 毎回の窓でディスクに書き込みます
+        self.store = CheckpointStore(os.path.join(self.tmp.name, "checkpoints"), interval=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def audio(self):
+        return DecodedAudio.from_samples(ramp_audio(), self.audio_path)
+
+    @patch("src.transcriber.whisper")
+    def test_resumes_from_last_window_after_failure(self, mock_whisper):
+        mock_whisper.load_model.return_value = WindowModel(crash_at=4)
+        with self.assertRaises(MemoryError):
+            Transcriber(checkpoints=self.store).transcribe(self.audio(), "tiny")
+
+        interrupted = self.store.interrupted()
+        self.assertEqual(len(interrupted), 1)
+        self.assertEqual(interrupted[0].state["audio_path"], os.path.abspath(self.audio_path))
+        self.assertEqual(interrupted[0].seek, 90 * SAMPLE_RATE)
+        self.assertAlmostEqual(interrupted[0].state["progress"], 88 / TOTAL_SECONDS)
+
+        model = WindowModel()
+        mock_whisper.load_model.return_value = model
+        texts = []
+        result = Transcriber(checkpoints=self.store).transcribe(self.audio(), "tiny", text_callback=texts.append)
+
+        # 完了済みの3つの窓はデコードし直さないこと
+        self.assertEqual(model.offsets, [90.0, 120.0])
+        starts = [segment["start"] for segment in result["segments"]]
+        self.assertEqual(starts, [0, 14, 30, 44, 60, 74, 90, 104, 120, 134])
+        self.assertEqual([segment["id"] for segment in result["segments"]], list(range(10)))
+        self.assertEqual(texts[0], "0秒から。")
+        self.assertEqual(len(texts), 10)
+        # 最後まで終わったらチェックポイントは削除されること
+        self.assertEqual(self.store.interrupted(), [])
+
+    @patch("src.transcriber.whisper")
+    def test_checkpoint_is_keyed_by_model(self, mock_whisper):
+        mock_whisper.load_model.return_value = WindowModel(crash_at=3)
+        with self.assertRaises(MemoryError):
+            Transcriber(checkpoints=self.store).transcribe(self.audio(), "tiny")
+
+        model = WindowModel()
+        mock_whisper.load_model.return_value = model
+        Transcriber(checkpoints=self.store).transcribe(self.audio(), "base")
+
+        # 別のモデルでは最初から文字起こしし、tiny のチェックポイントは残ること
+        self.assertEqual(model.offsets[0], 0.0)
+        self.assertEqual([c.state["model"] for c in self.store.interrupted()], ["tiny"])
+
+    @patch("src.transcriber.whisper")
+    def test_audio_without_file_is_not_checkpointed(self, mock_whisper):
+        mock_whisper.load_model.return_value = WindowModel(crash_at=2)
+        with self.assertRaises(MemoryError):
+            Transcriber(checkpoints=self.store).transcribe(DecodedAudio.from_samples(ramp_audio()), "tiny")
+        self.assertFalse(os.path.exists(self.store.checkpoint_dir))
+
+    @patch("src.transcriber.detect_speech")
+    @patch("src.transcriber.whisper")
+    def test_vad_speech_shorter_than_parallel_threshold_is_checkpointed(self, mock_whisper, mock_detect_speech):
+        # 元の音声（150秒）はチャンク並列の長さだが、発話（80秒）だけなら1プロセスで文字起こしする場合
+        mock_detect_speech.return_value = [(0, 80 * SAMPLE_RATE)]
+        mock_whisper.load_model.return_value = WindowModel(crash_at=3)
+        transcriber = Transcriber(checkpoints=self.store, vad_filter=True, parallel_workers=4, chunk_seconds=60)
+        with self.assertRaises(MemoryError):
+            transcriber.transcribe(self.audio(), "tiny")
+
+        # 実際にデコードした音声で判断し、チェックポイントを残すこと
+        self.assertIsNone(transcriber.parallel)
+        interrupted = self.store.interrupted()
+        self.assertEqual(len(interrupted), 1)
+        self.assertEqual(interrupted[0].seek, 60 * SAMPLE_RATE)
+
+    def test_update_appends_only_new_segments(self):
+        checkpoint = self.store.open(self.audio(), "tiny")
+        segments = [{"id": 0, "start": 0.0, "end": 14.0, "text": "一つ目。"}]
+        checkpoint.update(30 * SAMPLE_RATE, "一つ目。", "ja", segments)
+        first = checkpoint.segments[0]
+        segments.append({"id": 1, "start": 30.0, "end": 44.0, "text": "二つ目。"})
+        checkpoint.update(60 * SAMPLE_RATE, "二つ目。", "ja", segments)
+
+        # 記録済みのセグメントはコピーし直さず、呼び出し側のリストとは別に持つこと
+        self.assertIs(checkpoint.segments[0], first)
+        self.assertEqual(checkpoint.segments, segments)
+        segments[0]["speaker"] = "SPEAKER_00"
+        self.assertNotIn("speaker", checkpoint.segments[0])
+        self.assertEqual(self.store.open(self.audio(), "tiny").segments, checkpoint.segments)
+
+
+if __name__ == "__main__":
+    unittest.main()
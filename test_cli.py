@@ -0,0 +1,105 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src import cli
+
+class TestCli(unittest.TestCase):
+    def test_no_gui_imports(self):
+        # CLIの起動でGUI関連のモジュールが読み込まれないこと
+        code = (
+            "import sys, src.cli;"
+            "bad = [m for m in ('customtkinter', 'tkinterdnd2', 'tkinter', 'src.app') if m in sys.modules];"
+            "print(','.join(bad))"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(out.stdout.strip(), "")
+
+    @patch("src.transcriber.Transcriber")
+    def test_jsonl_and_result_layout(self, mock_transcriber_cls):
+        mock_transcriber_cls.return_value.transcribe.return_value = {"text": "今日は重要な会議です。\n結論として、予算を見直します。"}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ["a.mp3", "b.mp3"]:
+                open(os.path.join(tmp, name), "w").close()
+
+            out = io.StringIO()
+            args = cli.build_parser().parse_args([os.path.join(tmp, "*.mp3"), "--simple", "--output-dir", tmp])
+            exit_code = cli.run(args, out=out)
+
+            self.assertEqual(exit_code, 0)
+            records = [json.loads(line) for line in out.getvalue().splitlines()]
+            self.assertEqual([os.path.basename(r["input"]) for r in records], ["a.mp3", "b.mp3"])
+
+            with open(os.path.join(tmp, "a.json"), encoding="utf-8") as f:
+                saved = json.load(f)
+            # App.save_to_file と同じキー構成であること
+            self.assertEqual(set(saved), {"original", "simple_summary", "local_summary", "gemini_summary"})
+            self.assertEqual(saved["original"], records[0]["original"])
+
+    @patch("src.transcriber.Transcriber")
+    def test_stdout_has_only_jsonl(self, mock_transcriber_cls):
+        mock_transcriber_cls.return_value.transcribe.return_value = {"text": "今日は重要な会議です。\n結論として、予算を見直します。"}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            open(os.path.join(tmp, "a.mp3"), "w").close()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            with patch("sys.stdout", stdout), patch("sys.stderr", stderr):
+                exit_code = cli.main([os.path.join(tmp, "a.mp3"), "--simple", "--no-cache"])
+
+        self.assertEqual(exit_code, 0)
+        # 要約などのログは標準エラーに出て、標準出力はJSONLとして読めること
+        self.assertEqual(len([json.loads(line) for line in stdout.getvalue().splitlines()]), 1)
+        self.assertIn("finished", stderr.getvalue())
+
+    @patch("src.transcriber.Transcriber")
+    def test_segments_are_streamed_and_exported(self, mock_transcriber_cls):
+        segments = [{"id": 0, "start": 0.0, "end": 1.0, "text": "今日は会議です。"}]
+
+        def fake_transcribe(path, model_name, hf_token=None, timer=None, segment_callback=None):
+            for segment in segments:
+                segment_callback(segment)
+            return {"text": "今日は会議です。", "segments": segments}
+        mock_transcriber_cls.return_value.transcribe.side_effect = fake_transcribe
+
+        with tempfile.TemporaryDirectory() as tmp:
+            open(os.path.join(tmp, "a.mp3"), "w").close()
+            args = cli.build_parser().parse_args([os.path.join(tmp, "a.mp3"), "--export", "srt", "txt"])
+            self.assertEqual(cli.run(args, out=io.StringIO()), 0)
+
+            with open(os.path.join(tmp, "a.segments.jsonl"), encoding="utf-8") as f:
+                self.assertEqual([json.loads(line) for line in f], segments)
+            self.assertFalse(os.path.exists(os.path.join(tmp, "a.segments.jsonl.part")))
+            with open(os.path.join(tmp, "a.srt"), encoding="utf-8") as f:
+                self.assertEqual(f.read(), "1\n00:00:00,000 --> 00:00:01,000\n今日は会議です。\n\n")
+            with open(os.path.join(tmp, "a.txt"), encoding="utf-8") as f:
+                self.assertEqual(f.read(), "今日は会議です。\n")
+
+    def test_live_segments_get_running_ids(self):
+        from src.live_transcriber import LiveUpdate
+        from src.segment_events import SegmentEvent
+
+        def event(start, text):
+            return SegmentEvent(start=start, end=start + 1, text=text, avg_logprob=0.0, progress=0.0)
+
+        class FakeTranscriber:
+            def transcribe_live(self, source, model_name, update_callback=None, timer=None, **kwargs):
+                update_callback(LiveUpdate(committed=[event(0.0, "一つ目"), event(1.0, "二つ目")]))
+                update_callback(LiveUpdate(committed=[event(2.0, "三つ目")]))
+                return {"text": "", "segments": []}
+
+        received = []
+        with patch("sys.stderr", io.StringIO()):
+            cli.transcribe_live(FakeTranscriber(), __file__, "base", None, {}, segment_callback=received.append)
+
+        # 書き出すファイルの id が重複しないこと
+        self.assertEqual([s["id"] for s in received], [0, 1, 2])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src import diarization_worker
+from src.audio import DecodedAudio
+from src.diarization_worker import split_thread_budget
+from src.transcriber import Transcriber
+
+class TestConcurrentDiarization(unittest.TestCase):
+    def test_split_thread_budget(self):
+        self.assertEqual(split_thread_budget(cpu_count=12), (8, 4))
+        self.assertEqual(split_thread_budget(cpu_count=1), (1, 1))
+        self.assertEqual(split_thread_budget(whisper_threads=6, diarization_threads=2, cpu_count=32), (6, 2))
+
+    def test_shared_memory_roundtrip(self):
+        samples = np.arange(16000, dtype=np.float32)
+        audio = DecodedAudio.from_samples(samples, "meeting.wav")
+        shm_name, length = audio.share()
+
+        # ワーカー側では共有メモリ上の同じPCMを受け取ること
+        fake_diarizer = MagicMock()
+        fake_diarizer.diarize.side_effect = lambda a: [{"start": 0.0, "end": float(a.samples[-1]), "speaker": "SPEAKER_00"}]
+        with patch.object(diarization_worker, "_diarizer", fake_diarizer):
+            turns = diarization_worker._diarize_shared(shm_name, length, audio.path)
+
+        self.assertEqual(turns[0]["end"], 15999.0)
+        np.testing.assert_array_equal(audio.samples, samples)
+        audio.release()
+
+    @patch("src.audio.whisper")
+    @patch("src.transcriber.whisper")
+    @patch("os.path.exists")
+    def test_transcribe_merges_concurrent_result(self, mock_exists, mock_whisper, mock_audio_whisper):
+        mock_exists.return_value = True
+        mock_model = MagicMock()
+        mock_whisper.load_model.return_value = mock_model
+        mock_audio_whisper.load_audio.return_value = [0] * 16000 * 4
+        mock_model.transcribe.return_value = {"language": "ja", "segments": [
+            {"start": 0.0, "end": 2.0, "text": "こんにちは。"},
+            {"start": 2.0, "end": 4.0, "text": "はい。"},
+        ]}
+
+        future = Future()
+        future.set_result([
+            {"start": 0.0, "end": 2.0, "speaker": "SPEAKER_00"},
+            {"start": 2.0, "end": 4.0, "speaker": "SPEAKER_01"},
+        ])
+        transcriber = Transcriber()
+        with patch.object(Transcriber, "_start_concurrent_diarization", return_value=future) as mock_start:
+            result = transcriber.transcribe("dummy.mp3", "tiny", hf_token="token")
+
+        mock_start.assert_called_once()
+        self.assertEqual(result["text"], "Aさん:\nこんにちは。\n\n\nBさん:\nはい。\n")
+        self.assertEqual(result["segments"][1]["speaker"], "SPEAKER_01")
+
+    @patch("src.transcriber.warm_up")
+    def test_warm_up_starts_diarization_worker(self, mock_warm_up):
+        transcriber = Transcriber()
+        with patch("src.transcriber.DiarizationWorker") as mock_worker_cls:
+            transcriber.warm_up(hf_token="token")
+
+        # 別プロセスの話者分離は、そのプロセスを先に起動して pyannote を読み込んでおくこと
+        mock_worker_cls.return_value.warm_up.assert_called_once()
+        self.assertEqual(mock_worker_cls.call_args.kwargs["hf_token"], "token")
+        self.assertIs(transcriber.diarization_worker, mock_worker_cls.return_value)
+        self.assertEqual(len(mock_warm_up.call_args.args), 2)
+
+    @patch("src.transcriber.warm_up")
+    def test_warm_up_imports_pyannote_without_worker(self, mock_warm_up):
+        from src.diarizer import pyannote_audio
+
+        Transcriber(concurrent_diarization=False).warm_up(hf_token="token")
+        self.assertIn(pyannote_audio, mock_warm_up.call_args.args)
+
+    @patch("src.transcriber.warm_up")
+    def test_warm_up_skips_pyannote_without_token(self, mock_warm_up):
+        with patch.dict("os.environ", {}, clear=True):
+            transcriber = Transcriber()
+            transcriber.warm_up()
+
+        self.assertEqual(len(mock_warm_up.call_args.args), 2)
+        self.assertIsNone(transcriber.diarization_worker)
+
+if __name__ == "__main__":
+    unittest.main()
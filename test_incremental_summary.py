@@ -0,0 +1,126 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src import llm_summarizer
+from src.incremental_summary import IncrementalSummarizer
+from src.llm_client_pool import LLMClientPool
+from src.llm_summarizer import LocalLLMSummarizer
+from src.summarizer import SimpleSummarizer
+
+
+def segment(start, end, text):
+    return {"start": start, "end": end, "text": text}
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class RecordingUpdate:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, previous, text):
+        time.sleep(self.delay)
+        self.calls.append((previous, text))
+        return f"{previous}|{text}" if previous else text
+
+
+class TestIncrementalSummarizer(unittest.TestCase):
+    def test_updates_every_window_and_reuses_previous_summary(self):
+        update = RecordingUpdate()
+        updates = []
+        summarizer = IncrementalSummarizer(update, window_seconds=60,
+                                           update_callback=lambda summary, seconds: updates.append((summary, seconds)))
+
+        summarizer.add_segment(segment(0, 30, "a"))
+        summarizer.add_segment(segment(30, 61, "b"))
+        wait_for(lambda: summarizer.updates == 1)
+        summarizer.add_segment(segment(61, 100, "c"))
+        summarizer.add_segment(segment(100, 125, "d"))
+        wait_for(lambda: summarizer.updates == 2)
+        summarizer.add_segment(segment(125, 130, "e"))
+
+        self.assertEqual(summarizer.finish(timeout=2), "a\nb|c\nd|e")
+        # 前回の要約に新しい区間だけを足して更新すること
+        self.assertEqual(update.calls, [("", "a\nb"), ("a\nb", "c\nd"), ("a\nb|c\nd", "e")])
+        self.assertEqual(updates[0], ("a\nb", 61))
+        self.assertEqual(updates[-1][1], 130)
+        self.assertEqual(summarizer.updates, 3)
+
+    def test_pending_windows_are_merged_when_update_is_slow(self):
+        update = RecordingUpdate(delay=0.2)
+        summarizer = IncrementalSummarizer(update, window_seconds=10)
+
+        for i in range(6):
+            summarizer.add_segment(segment(i * 10, i * 10 + 10, str(i)))
+        summary = summarizer.finish(timeout=5)
+
+        # 要約が遅れている間に揃った区間は、まとめて1回で反映する
+        self.assertLess(len(update.calls), 6)
+        self.assertEqual(summary.replace("|", "\n").split("\n"), [str(i) for i in range(6)])
+
+    def test_failure_stops_updates(self):
+        update = MagicMock(side_effect=RuntimeError("LLM unavailable"))
+        summarizer = IncrementalSummarizer(update, window_seconds=10)
+        summarizer.add_segment(segment(0, 15, "a"))
+
+        self.assertIsNone(summarizer.finish(timeout=2))
+        self.assertEqual(summarizer.error, "LLM unavailable")
+        summarizer.add_segment(segment(15, 30, "b"))
+        self.assertEqual(update.call_count, 1)
+
+    def test_segments_from_worker_threads(self):
+        update = RecordingUpdate()
+        summarizer = IncrementalSummarizer(update, window_seconds=1000)
+        threads = [threading.Thread(target=summarizer.add_segment, args=(segment(i, i + 1, "x"),)) for i in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(summarizer.finish(timeout=2).count("x"), 50)
+
+
+class TestRollingUpdates(unittest.TestCase):
+    def test_simple_summarizer_updates_from_previous_summary(self):
+        summarizer = SimpleSummarizer()
+        summary = summarizer.update_summary("来年度の予算案を全会一致で承認した。", "次回は来週の月曜日に開催する。")
+        self.assertIn("来年度の予算案を全会一致で承認した", summary)
+        self.assertIn("次回は来週の月曜日に開催する", summary)
+
+    def test_llm_update_includes_previous_summary(self):
+        client = MagicMock()
+        prompts = []
+
+        def create(model, messages, stream):
+            prompts.append(messages[-1]["content"])
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="新しい要約"))])])
+
+        client.chat.completions.create.side_effect = create
+        llm = LocalLLMSummarizer(pool=LLMClientPool(factory=lambda base_url, api_key: client))
+
+        self.assertEqual(llm.update_summary("前の要約", "続きの発言。"), "新しい要約")
+        self.assertTrue(prompts[-1].startswith(llm_summarizer.ROLLING_PROMPT.format(summary="前の要約")))
+        self.assertTrue(prompts[-1].endswith("続きの発言。"))
+
+        # 最初の区間はこれまでの要約なしで要約する
+        llm.update_summary("", "最初の発言。")
+        self.assertNotIn("これまでの要約", prompts[-1])
+
+        # 失敗は例外として返し、途中経過の更新を止められるようにする
+        client.chat.completions.create.side_effect = ValueError("bad request")
+        with self.assertRaises(ValueError):
+            llm.update_summary("前の要約", "続き。")
+
+
+if __name__ == "__main__":
+    unittest.main()
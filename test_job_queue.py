@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.job_queue import JobQueue, BatchRunner, RUNNING, DONE, FAILED
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dir = self.tmpdir.name
+        self.state_file = os.path.join(self.dir, "job_queue.json")
+        for name in ["a.mp3", "b.wav", "notes.txt"]:
+            open(os.path.join(self.dir, name), "w").close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_add_directory_filters_extensions(self):
+        queue = JobQueue(self.state_file)
+        added = queue.add_directory(self.dir)
+
+        names = [os.path.basename(job["path"]) for job in added]
+        self.assertEqual(names, ["a.mp3", "b.wav"])
+        # 同じファイルを再度追加しても重複しない
+        self.assertEqual(queue.add_directory(self.dir), [])
+
+    def test_resume_after_crash(self):
+        queue = JobQueue(self.state_file)
+        jobs = queue.add_directory(self.dir)
+        queue.update(jobs[0], status=DONE)
+        queue.update(jobs[1], status=RUNNING)
+
+        # 実行中のまま落ちたジョブは、読み込み直すと未処理に戻る
+        reloaded = JobQueue(self.state_file)
+        pending = reloaded.pending_jobs()
+        self.assertEqual([job["id"] for job in pending], [jobs[1]["id"]])
+
+    def test_clear_drops_pending_jobs(self):
+        queue = JobQueue(self.state_file)
+        jobs = queue.add_directory(self.dir)
+        queue.update(jobs[0], status=DONE)
+
+        # 再開しないことを選んだら、次に起動したときに残りのジョブが出てこないこと
+        queue.clear()
+        self.assertEqual(JobQueue(self.state_file).jobs, [])
+        self.assertEqual(len(queue.add_directory(self.dir)), 2)
+
+    @patch("src.job_queue.DecodedAudio")
+    def test_batch_runner_reuses_transcriber(self, mock_audio_cls):
+        mock_audio_cls.from_source.return_value.duration = 60.0
+        transcriber = MagicMock()
+        transcriber.transcribe.side_effect = [{"text": "一件目"}, RuntimeError("decode error")]
+
+        queue = JobQueue(self.state_file)
+        queue.add_directory(self.dir)
+        job_callback = MagicMock()
+        stats = BatchRunner(transcriber, queue, model_name="tiny", job_callback=job_callback).run()
+
+        self.assertEqual(transcriber.transcribe.call_count, 2)
+        # 1件目の処理中は "1/2" と表示されること
+        self.assertEqual([call.args[1:] for call in job_callback.call_args_list], [(1, 2), (1, 2), (2, 2), (2, 2)])
+        self.assertEqual(stats["done"], 1)
+        self.assertEqual(stats["failed"], 1)
+        self.assertGreater(stats["throughput"], 0)
+
+        statuses = [job["status"] for job in queue.jobs]
+        self.assertEqual(statuses, [DONE, FAILED])
+        with open(os.path.join(self.dir, "a.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["original"], "一件目")
+
+if __name__ == "__main__":
+    unittest.main()
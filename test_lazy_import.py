@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from src.lazy_import import LazyModule, warm_up
+
+class TestLazyImport(unittest.TestCase):
+    def test_heavy_modules_not_loaded_at_import(self):
+        # モジュールを読み込んだだけでは whisper / torch / pyannote / openai がインポートされないこと
+        code = (
+            "import sys, src.transcriber, src.diarizer, src.llm_summarizer, src.gemini_summarizer;"
+            "heavy = ('torch', 'whisper', 'pyannote.audio', 'openai', 'google.generativeai');"
+            "print(','.join(m for m in heavy if m in sys.modules))"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertEqual(out.stdout.strip(), "")
+
+    def test_lazy_module_loads_on_access(self):
+        module = LazyModule("json")
+        self.assertFalse(module.is_loaded)
+        self.assertEqual(module.dumps([1]), "[1]")
+        self.assertTrue(module.is_loaded)
+
+    def test_warm_up(self):
+        module = LazyModule("colorsys")
+        warm_up(module).join(timeout=10)
+        self.assertTrue(module.is_loaded)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src.audio import DecodedAudio, SAMPLE_RATE
+from src.live_transcriber import FileReplaySource, LiveTranscriptionStream, MicrophoneSource, microphone_available
+from src.transcriber import Transcriber
+
+TOTAL_SECONDS = 12
+SENTENCE_SECONDS = 2.0
+
+
+def ramp_audio(seconds=TOTAL_SECONDS):
+    # サンプルの値から録音開始からの位置がわかる音声（フェイクモデルが使う）
+    total = int(seconds * SAMPLE_RATE)
+    return (0.2 + 0.5 * np.arange(total) / total).astype(np.float32)
+
+
+class ListSource:
+    """
+    音声を block_seconds ずつ待たずに返す音声ソース。
+    """
+
+    def __init__(self, samples, block_seconds=0.5):
+        self.samples = samples
+        self.block = int(block_seconds * SAMPLE_RATE)
+        self.position = 0
+        self.closed = False
+
+    def read(self, timeout=0.5):
+        if self.closed or self.position >= len(self.samples):
+            return None
+        chunk = self.samples[self.position:self.position + self.block]
+        self.position += len(chunk)
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+class SentenceModel:
+    """
+    2秒ごとに1文を話している音声としてデコードするフェイクのWhisperモデル。
+    バッファの終端で切れている文は「途中」として返す。
+    """
+
+    def __init__(self, total_seconds=TOTAL_SECONDS):
+        self.total = int(total_seconds * SAMPLE_RATE)
+        self.buffer_lengths = []
+        self.prompts = []
+
+    def transcribe(self, audio, **kwargs):
+        self.buffer_lengths.append(len(audio))
+        self.prompts.append(kwargs.get("initial_prompt"))
+        offset = round((float(audio[0]) - 0.2) / 0.5 * self.total) / SAMPLE_RATE
+        end = offset + len(audio) / SAMPLE_RATE
+
+        segments = []
+        index = int(offset // SENTENCE_SECONDS)
+        while index * SENTENCE_SECONDS < end:
+            start = index * SENTENCE_SECONDS
+            stop = start + SENTENCE_SECONDS
+            complete = stop <= end + 1e-6
+            if stop > offset + 0.05:
+                segments.append({
+                    "start": max(start - offset, 0.0),
+                    "end": min(stop, end) - offset,
+                    "text": f"文{index}。" if complete else f"文{index}の途中",
+                })
+            index += 1
+        return {"language": "ja", "segments": segments}
+
+
+class TestLiveTranscriptionStream(unittest.TestCase):
+    def test_commits_stable_transcript_without_redecoding_history(self):
+        model = SentenceModel()
+        stream = LiveTranscriptionStream(model, ListSource(ramp_audio()), step_seconds=1.0)
+        updates = list(stream)
+
+        texts = [event.text for update in updates for event in update.committed]
+        self.assertEqual(texts, [f"文{i}。" for i in range(6)])
+        # 確定したセグメントの時刻は録音開始からの秒数になること
+        self.assertAlmostEqual(stream.segments[2].start, 4.0, places=2)
+        # 確定した部分は取り除かれるので、バッファは録音全体より十分短いまま
+        self.assertLess(max(model.buffer_lengths), 6 * SAMPLE_RATE)
+        # 途中の文は仮のテキストとして表示されること
+        self.assertTrue(any("途中" in update.tentative for update in updates))
+        self.assertEqual(updates[-1].tentative, "")
+        # 確定したテキストを次のデコードの文脈として渡すこと
+        self.assertIn("文0。", model.prompts[-1])
+
+    def test_forces_commit_when_buffer_grows(self):
+        class UnstableModel:
+            # 毎回違うテキストを返すため、前回との一致では確定しない
+            def __init__(self):
+                self.calls = 0
+                self.buffer_lengths = []
+
+            def transcribe(self, audio, **kwargs):
+                self.calls += 1
+                self.buffer_lengths.append(len(audio))
+                seconds = len(audio) / SAMPLE_RATE
+                return {"segments": [
+                    {"start": 0.0, "end": seconds / 2, "text": f"前半{self.calls}"},
+                    {"start": seconds / 2, "end": seconds, "text": f"後半{self.calls}"},
+                ]}
+
+        model = UnstableModel()
+        stream = LiveTranscriptionStream(model, ListSource(ramp_audio()), step_seconds=1.0, max_buffer_seconds=4.0)
+        list(stream)
+
+        self.assertTrue(stream.segments)
+        self.assertLessEqual(max(model.buffer_lengths), 5 * SAMPLE_RATE)
+
+    def test_silence_is_not_decoded(self):
+        class NoCallModel:
+            def transcribe(self, audio, **kwargs):
+                raise AssertionError("silence should not be decoded")
+
+        samples = np.zeros(10 * SAMPLE_RATE, dtype=np.float32)
+        stream = LiveTranscriptionStream(NoCallModel(), ListSource(samples))
+        updates = list(stream)
+
+        self.assertEqual(stream.segments, [])
+        self.assertEqual(updates[-1].committed, [])
+        # 無音は末尾だけ残して捨てること
+        self.assertLessEqual(len(stream.buffer), SAMPLE_RATE)
+
+    def test_stop_flushes_tentative_text(self):
+        model = SentenceModel()
+        source = ListSource(ramp_audio())
+        stream = LiveTranscriptionStream(model, source, step_seconds=1.0)
+        iterator = iter(stream)
+        next(iterator)
+        stream.stop()
+        rest = list(iterator)
+
+        # 止めた時点までの音声はすべて確定させること
+        self.assertEqual(rest[-1].tentative, "")
+        self.assertTrue(stream.segments)
+
+
+class TestFileReplaySource(unittest.TestCase):
+    def test_replays_at_realtime_speed(self):
+        audio = DecodedAudio.from_samples(np.ones(int(0.3 * SAMPLE_RATE), dtype=np.float32))
+        source = FileReplaySource(audio, block_seconds=0.1)
+
+        start = time.monotonic()
+        received = 0
+        while (chunk := source.read()) is not None:
+            received += len(chunk)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(received, int(0.3 * SAMPLE_RATE))
+        self.assertGreaterEqual(elapsed, 0.25)
+
+
+class TestMicrophoneSource(unittest.TestCase):
+    def test_reports_missing_sounddevice(self):
+        with patch("importlib.util.find_spec", return_value=None):
+            self.assertFalse(microphone_available())
+
+    def test_start_explains_missing_dependency(self):
+        mock_sounddevice = MagicMock()
+        mock_sounddevice.InputStream.side_effect = ImportError("No module named 'sounddevice'")
+        with patch("src.live_transcriber.sounddevice", mock_sounddevice), self.assertRaisesRegex(RuntimeError, "mojiokoshi\\[live\\]"):
+            MicrophoneSource().start()
+
+
+class TestTranscribeLive(unittest.TestCase):
+    @patch("src.transcriber.whisper")
+    def test_returns_result_and_pushes_updates(self, mock_whisper):
+        mock_whisper.load_model.return_value = SentenceModel()
+        updates = []
+
+        result = Transcriber().transcribe_live(ListSource(ramp_audio()), "tiny", update_callback=updates.append)
+
+        self.assertEqual([s["text"] for s in result["segments"]], [f"文{i}。" for i in range(6)])
+        self.assertEqual(result["text"].splitlines()[0], "文0。")
+        self.assertEqual(result["language"], "ja")
+        self.assertEqual(result["timing"]["audio_seconds"], TOTAL_SECONDS)
+        self.assertEqual([s["stage"] for s in result["timing"]["stages"]], ["load_model", "live", "format"])
+        self.assertTrue(updates)
+
+
+if __name__ == "__main__":
+    unittest.main()
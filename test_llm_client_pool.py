@@ -0,0 +1,121 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src.llm_client_pool import LLMClientPool, LLMEndpoint, is_transient_error
+from src.llm_summarizer import LocalLLMSummarizer
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+class APIStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def models_response(*ids):
+    return SimpleNamespace(data=[SimpleNamespace(id=model_id) for model_id in ids])
+
+
+class TestLLMClientPool(unittest.TestCase):
+    def test_clients_are_shared_per_endpoint(self):
+        factory = MagicMock(side_effect=lambda base_url, api_key: MagicMock())
+        pool = LLMClientPool(factory=factory)
+
+        first = LocalLLMSummarizer(base_url="http://a/v1", api_key="k", pool=pool)
+        second = LocalLLMSummarizer(base_url="http://a/v1", api_key="k", model="other", pool=pool)
+        other = LocalLLMSummarizer(base_url="http://b/v1", api_key="k", pool=pool)
+
+        # 同じエンドポイントでは要約のたびにクライアント（と接続）を作り直さないこと
+        self.assertIs(first.client, second.client)
+        self.assertIsNot(first.client, other.client)
+        self.assertEqual(factory.call_count, 2)
+
+        pool.close()
+        first.client.close.assert_called_once()
+        other.client.close.assert_called_once()
+
+    def test_in_flight_requests_are_capped(self):
+        endpoint = LLMEndpoint(MagicMock(), max_in_flight=2)
+        in_flight = 0
+        max_in_flight = 0
+        lock = threading.Lock()
+
+        def request(emitted):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+
+        threads = [threading.Thread(target=endpoint.call, args=(request,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(max_in_flight, 2)
+
+    def test_transient_errors_are_retried(self):
+        endpoint = LLMEndpoint(MagicMock(), retries=3, backoff_seconds=0)
+        request = MagicMock(side_effect=[APIConnectionError("refused"), APIStatusError(503), "ok"])
+
+        self.assertEqual(endpoint.call(request), "ok")
+        self.assertEqual(request.call_count, 3)
+
+    def test_permanent_and_mid_stream_errors_are_not_retried(self):
+        endpoint = LLMEndpoint(MagicMock(), retries=3, backoff_seconds=0)
+        request = MagicMock(side_effect=APIStatusError(401))
+        with self.assertRaises(APIStatusError):
+            endpoint.call(request)
+        self.assertEqual(request.call_count, 1)
+
+        # 途中の結果を画面に出した後は、出力が重複しないようにやり直さない
+        calls = []
+
+        def streaming_request(emitted):
+            calls.append(1)
+            emitted()
+            raise APIConnectionError("connection reset")
+
+        with self.assertRaises(APIConnectionError):
+            endpoint.call(streaming_request)
+        self.assertEqual(len(calls), 1)
+
+    def test_retries_are_limited(self):
+        endpoint = LLMEndpoint(MagicMock(), retries=2, backoff_seconds=0)
+        request = MagicMock(side_effect=APIStatusError(429))
+        with self.assertRaises(APIStatusError):
+            endpoint.call(request)
+        self.assertEqual(request.call_count, 3)
+
+    def test_models_are_cached_until_ttl(self):
+        client = MagicMock()
+        client.models.list.side_effect = [models_response("llama3"), models_response("llama3", "qwen2")]
+        endpoint = LLMEndpoint(client, models_ttl=60)
+
+        self.assertEqual(endpoint.list_models(), ["llama3"])
+        self.assertEqual(endpoint.list_models(), ["llama3"])
+        self.assertEqual(client.models.list.call_count, 1)
+
+        endpoint.models_fetched_at -= 61
+        self.assertEqual(endpoint.list_models(), ["llama3", "qwen2"])
+        self.assertEqual(client.models.list.call_count, 2)
+
+    def test_transient_error_detection(self):
+        self.assertTrue(is_transient_error(APIConnectionError()))
+        self.assertTrue(is_transient_error(TimeoutError()))
+        self.assertTrue(is_transient_error(APIStatusError(500)))
+        self.assertFalse(is_transient_error(APIStatusError(400)))
+        self.assertFalse(is_transient_error(ValueError()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src import llm_summarizer
+from src.llm_client_pool import LLMClientPool
+from src.llm_summarizer import LocalLLMSummarizer
+from src.text_chunker import TokenCounter, split_transcript
+
+
+def stream_chunks(text, size=4):
+    for i in range(0, len(text), size):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i:i + size]))])
+
+
+class FakeCompletions:
+    """
+    プロンプトの種類に応じた要約をストリームで返し、同時に処理しているリクエスト数を記録する。
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def create(self, model, messages, stream):
+        prompt = messages[-1]["content"]
+        with self.lock:
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+
+        if prompt.startswith(llm_summarizer.REDUCE_PROMPT):
+            return stream_chunks("全体の要約です。")
+        index = prompt.split("（")[1].split("）")[0]
+        return stream_chunks(f"部分{index}の要約。")
+
+
+def speaker_transcript(blocks=8, sentences=6):
+    parts = []
+    for block in range(blocks):
+        name = "AB"[block % 2] + "さん:"
+        body = "\n".join(f"これは{block}番目の発言の{i}文目で、議題について話しています。" for i in range(sentences))
+        parts.append(f"{name}\n{body}\n")
+    return "\n".join(parts)
+
+
+class TestSplitTranscript(unittest.TestCase):
+    def test_chunks_fit_budget_and_keep_speaker_headers(self):
+        counter = TokenCounter()
+        text = speaker_transcript()
+        chunks = split_transcript(text, 120, counter)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(counter.count(chunk), 120)
+            # 途中で区切ったチャンクも話者の見出しから始まること
+            self.assertRegex(chunk, r"^[AB]さん:")
+        # 文の途中では区切らないこと
+        self.assertTrue(all(chunk.endswith("。") for chunk in chunks))
+        joined = "".join(chunks).replace("\n", "")
+        for block in range(8):
+            self.assertIn(f"これは{block}番目の発言の5文目", joined)
+
+    def test_text_without_boundaries_is_split_by_tokens(self):
+        counter = TokenCounter()
+        chunks = split_transcript("あ" * 250, 100, counter)
+        self.assertEqual("".join(chunks), "あ" * 250)
+        self.assertTrue(all(counter.count(chunk) <= 100 for chunk in chunks))
+
+    def test_fallback_never_undercounts(self):
+        counter = TokenCounter()
+        counter._unavailable = True
+        # cl100k では漢字1文字が2トークン以上になることがあるので、文字数ではなくバイト数で数えること
+        self.assertEqual(counter.count("会議"), 6)
+        chunks = counter.split("議事録" * 10, 10)
+        self.assertEqual("".join(chunks), "議事録" * 10)
+        self.assertTrue(all(counter.count(chunk) <= 10 for chunk in chunks))
+
+
+class TestHierarchicalSummary(unittest.TestCase):
+    def make_summarizer(self, completions, **kwargs):
+        client = MagicMock()
+        client.chat.completions = completions
+        summarizer = LocalLLMSummarizer(pool=LLMClientPool(factory=lambda base_url, api_key: client), **kwargs)
+        # tiktoken の有無で分割数が変わらないよう、UTF-8 のバイト数で数えます
+        summarizer.token_counter._unavailable = True
+        return summarizer
+
+    def test_short_text_is_summarized_in_one_request(self):
+        completions = FakeCompletions()
+        completions.create = MagicMock(return_value=stream_chunks("短い要約"))
+        summarizer = self.make_summarizer(completions)
+        streamed = []
+
+        summary = summarizer.summarize("今日は会議です。", stream_callback=streamed.append)
+
+        self.assertEqual(summary, "短い要約")
+        self.assertEqual("".join(streamed), "短い要約")
+        self.assertEqual(completions.create.call_count, 1)
+
+    def test_long_text_is_mapped_concurrently_and_reduced(self):
+        completions = FakeCompletions(delay=0.05)
+        summarizer = self.make_summarizer(completions, chunk_tokens=600, max_parallel=2)
+        streamed = []
+        progress = []
+
+        summary = summarizer.summarize(speaker_transcript(), stream_callback=streamed.append,
+                                       progress_callback=lambda done, total: progress.append((done, total)))
+
+        map_header = llm_summarizer.MAP_PROMPT.split("（")[0]
+        map_prompts = [p for p in completions.prompts if p.startswith(map_header)]
+        total = len(map_prompts)
+        self.assertGreater(total, 2)
+        # 同時に送るリクエストは max_parallel 件まで
+        self.assertEqual(completions.max_in_flight, 2)
+        self.assertEqual(progress[-1], (total, total))
+
+        # 最後のまとめの段階だけをストリームで返すこと
+        self.assertEqual(summary, "全体の要約です。")
+        self.assertEqual("".join(streamed), summary)
+        reduce_prompt = completions.prompts[-1]
+        self.assertTrue(reduce_prompt.startswith(llm_summarizer.REDUCE_PROMPT))
+        # 部分の要約は元の順番で並ぶこと
+        self.assertLess(reduce_prompt.index(f"部分1/{total}の要約"), reduce_prompt.index(f"部分{total}/{total}の要約"))
+
+    def test_long_partial_summaries_are_grouped_before_reduce(self):
+        completions = FakeCompletions()
+        summarizer = self.make_summarizer(completions, chunk_tokens=150, max_parallel=2)
+
+        summary = summarizer.summarize(speaker_transcript())
+
+        group_header = llm_summarizer.GROUP_PROMPT.split("（")[0]
+        group_prompts = [p for p in completions.prompts if p.startswith(group_header)]
+        self.assertGreater(len(group_prompts), 1)
+        self.assertEqual(summary, "全体の要約です。")
+        # まとめ直した要約が1チャンクに収まってから最後のまとめを行うこと
+        reduce_prompt = completions.prompts[-1]
+        self.assertTrue(reduce_prompt.startswith(llm_summarizer.REDUCE_PROMPT))
+        self.assertLessEqual(summarizer.token_counter.count(reduce_prompt[len(llm_summarizer.REDUCE_PROMPT):]), 150)
+
+
+if __name__ == "__main__":
+    unittest.main()
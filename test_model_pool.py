@@ -0,0 +1,84 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import torch
+
+from src.model_pool import ModelPool, model_bytes
+from src.transcriber import Transcriber
+
+
+def fake_model(n_floats):
+    return torch.nn.Linear(n_floats, 1, bias=False)
+
+
+class TestModelPool(unittest.TestCase):
+    def test_model_bytes(self):
+        self.assertEqual(model_bytes(fake_model(100)), 400)
+        self.assertEqual(model_bytes(object()), 0)
+
+    def test_models_stay_resident_within_budget(self):
+        loader = MagicMock(side_effect=lambda name: fake_model(100))
+        pool = ModelPool(loader, max_bytes=1000)
+
+        tiny = pool.get("tiny")
+        pool.get("small")
+        self.assertIs(pool.get("tiny"), tiny)
+        self.assertEqual(loader.call_count, 2)
+        self.assertEqual(pool.resident(), ["small", "tiny"])
+
+    def test_lru_eviction(self):
+        loader = MagicMock(side_effect=lambda name: fake_model(100))
+        pool = ModelPool(loader, max_bytes=800)
+
+        pool.get("tiny")
+        pool.get("base")
+        pool.get("tiny")
+        # 3つ目を読み込むと、最後に使ったのが古い base が解放されること
+        pool.get("small")
+        self.assertEqual(pool.resident(), ["tiny", "small"])
+
+    def test_model_larger_than_budget_is_kept(self):
+        pool = ModelPool(lambda name: fake_model(1000), max_bytes=100)
+        pool.get("large")
+        self.assertEqual(pool.resident(), ["large"])
+
+    def test_concurrent_get_loads_once(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_loader(name):
+            started.set()
+            release.wait()
+            return fake_model(10)
+
+        loader = MagicMock(side_effect=slow_loader)
+        pool = ModelPool(loader)
+        thread = pool.preload("small")
+        started.wait()
+
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(pool.get("small")))
+        waiter.start()
+        release.set()
+        thread.join()
+        waiter.join()
+
+        self.assertEqual(loader.call_count, 1)
+        self.assertIs(results[0], pool.get("small"))
+
+    @patch("src.transcriber.whisper")
+    def test_transcriber_switching_models_does_not_reload(self, mock_whisper):
+        mock_whisper.load_model.side_effect = lambda name, device: MagicMock(name=name)
+        transcriber = Transcriber()
+
+        transcriber.load_model("tiny")
+        transcriber.load_model("small")
+        transcriber.load_model("tiny")
+
+        self.assertEqual(mock_whisper.load_model.call_count, 2)
+        self.assertEqual(transcriber.current_model_name, "tiny")
+
+
+if __name__ == "__main__":
+    unittest.main()
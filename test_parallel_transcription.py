@@ -0,0 +1,146 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src import parallel_transcriber
+from src.audio import DecodedAudio, SAMPLE_RATE
+from src.parallel_transcriber import ParallelTranscriber, plan_chunks, stitch_segments
+from src.transcriber import Transcriber
+from src.vad import detect_speech, find_split_points
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds):
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 1e-4).astype(np.float32)
+
+
+class TestVad(unittest.TestCase):
+    def test_detect_speech_regions(self):
+        samples = np.concatenate([silence(2), tone(3), silence(0.2), tone(1), silence(4), tone(2), silence(1)])
+        regions = detect_speech(samples, padding=0.0)
+
+        # 短い無音（0.2秒）でつながった発話は1つの区間になること
+        self.assertEqual(len(regions), 2)
+        self.assertAlmostEqual(regions[0][0] / SAMPLE_RATE, 2.0, delta=0.05)
+        self.assertAlmostEqual(regions[0][1] / SAMPLE_RATE, 6.2, delta=0.05)
+        self.assertAlmostEqual(regions[1][0] / SAMPLE_RATE, 10.2, delta=0.05)
+
+    def test_detect_speech_all_silence(self):
+        self.assertEqual(detect_speech(np.zeros(SAMPLE_RATE * 3, dtype=np.float32)), [])
+
+    def test_split_points_fall_in_silence(self):
+        samples = np.concatenate([tone(9), silence(1), tone(9), silence(1), tone(10)])
+        points = find_split_points(samples, chunk_seconds=10)
+
+        self.assertEqual(len(points), 2)
+        self.assertTrue(9 <= points[0] / SAMPLE_RATE <= 10)
+        self.assertTrue(19 <= points[1] / SAMPLE_RATE <= 20)
+
+    def test_short_audio_is_not_split(self):
+        self.assertEqual(find_split_points(tone(5), chunk_seconds=10), [])
+
+
+class TestStitching(unittest.TestCase):
+    def _chunks(self, *bounds, overlap=2):
+        total = bounds[-1] * SAMPLE_RATE
+        return [
+            (a * SAMPLE_RATE, b * SAMPLE_RATE, max(0, (a - overlap) * SAMPLE_RATE), min(total, (b + overlap) * SAMPLE_RATE))
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def seg(self, start, end, text):
+        return {"start": start, "end": end, "text": text, "avg_logprob": 0.0, "no_speech_prob": 0.0}
+
+    def test_overlapping_segments_are_not_duplicated(self):
+        chunks = self._chunks(0, 10, 20)
+        first = [self.seg(0, 4, "a"), self.seg(4, 9.5, "b"), self.seg(9.5, 10.5, "c")]
+        second = [self.seg(8.2, 9.5, "b'"), self.seg(9.6, 10.6, "c'"), self.seg(10.6, 20, "d")]
+
+        texts = [s["text"] for s in stitch_segments([(chunks[0], first), (chunks[1], second)])]
+        self.assertEqual(texts, ["a", "b", "c", "d"])
+
+    def test_segment_cut_at_decode_edge_is_taken_from_next_chunk(self):
+        chunks = self._chunks(0, 10, 20)
+        # 1つ目のチャンクはデコード範囲の終端（12秒）で途中まで聞こえた発話を含む
+        first = [self.seg(0, 9, "a"), self.seg(9, 12, "b (cut)")]
+        second = [self.seg(8, 9, "a tail"), self.seg(9, 13, "b"), self.seg(13, 20, "c")]
+
+        texts = [s["text"] for s in stitch_segments([(chunks[0], first), (chunks[1], second)])]
+        self.assertEqual(texts, ["a", "b", "c"])
+
+    def test_segments_after_core_end_are_left_to_next_chunk(self):
+        chunks = self._chunks(0, 10, 20)
+        first = [self.seg(0, 9.8, "a"), self.seg(10.5, 11.5, "b early")]
+        second = [self.seg(10.5, 11.5, "b"), self.seg(11.5, 20, "c")]
+
+        texts = [s["text"] for s in stitch_segments([(chunks[0], first), (chunks[1], second)])]
+        self.assertEqual(texts, ["a", "b", "c"])
+
+    def test_plan_chunks_covers_audio(self):
+        samples = np.concatenate([tone(9), silence(1), tone(9), silence(1), tone(10)])
+        chunks = plan_chunks(samples, chunk_seconds=10, overlap_seconds=1)
+
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(samples))
+        for previous, current in zip(chunks, chunks[1:]):
+            self.assertEqual(previous[1], current[0])
+            self.assertEqual(current[2], current[0] - SAMPLE_RATE)
+
+
+class TestParallelStream(unittest.TestCase):
+    def test_chunks_are_transcribed_with_global_timestamps(self):
+        samples = np.concatenate([tone(9), silence(1), tone(9), silence(1), tone(10)])
+        audio = DecodedAudio.from_samples(samples, "long.wav")
+
+        # モデルは各チャンクの先頭からの時刻で1つのセグメントを返す
+        fake_model = MagicMock()
+        fake_model.transcribe.side_effect = lambda chunk, **kwargs: {
+            "language": "ja",
+            "segments": [{"start": 0.0, "end": len(chunk) / SAMPLE_RATE, "text": f"{len(chunk) / SAMPLE_RATE:.0f}秒"}],
+        }
+
+        parallel = ParallelTranscriber("tiny", workers=2, chunk_seconds=10)
+        # テストではプロセスの代わりにスレッドで動かします（共有メモリの受け渡しは同じ）
+        parallel.executor = ThreadPoolExecutor(max_workers=2)
+        with patch.object(parallel_transcriber, "_model", fake_model), \
+                patch.object(parallel_transcriber, "CHUNK_OVERLAP_SECONDS", 0.0):
+            stream = parallel.stream(audio)
+            events = list(stream)
+        parallel.shutdown()
+        audio.release()
+
+        self.assertEqual(stream.language, "ja")
+        self.assertEqual(len(events), 3)
+        self.assertEqual(events[0].start, 0.0)
+        self.assertAlmostEqual(events[-1].end, 30.0, places=3)
+        for previous, current in zip(events, events[1:]):
+            self.assertAlmostEqual(previous.end, current.start, places=3)
+        self.assertEqual(events[-1].progress, 1.0)
+
+    @patch("src.transcriber.torch")
+    def test_parallel_only_for_long_audio(self, mock_torch):
+        mock_torch.cuda.is_available.return_value = False
+        transcriber = Transcriber(parallel_workers=4, chunk_seconds=10)
+
+        self.assertFalse(transcriber._use_parallel("tiny", DecodedAudio.from_samples(tone(12))))
+        self.assertTrue(transcriber._use_parallel("tiny", DecodedAudio.from_samples(tone(30))))
+        # 判定だけではワーカーを用意しないこと
+        self.assertIsNone(transcriber.parallel)
+        parallel = transcriber._get_parallel("tiny")
+        self.assertIsInstance(parallel, ParallelTranscriber)
+        self.assertEqual(parallel.workers, 4)
+
+        # 並列ワーカー数やデコードの設定を指定した場合は使わないこと
+        self.assertFalse(Transcriber()._use_parallel("tiny", DecodedAudio.from_samples(tone(30))))
+        self.assertFalse(transcriber._use_parallel("tiny", DecodedAudio.from_samples(tone(30)), {"beam_size": 5}))
+
+
+if __name__ == '__main__':
+    unittest.main()
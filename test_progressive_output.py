@@ -18,9 +18,10 @@ class TestProgressiveOutput(unittest.TestCase):
         print(f"Callback received: {text}")
         self.captured_text.append(text)
 
+    @patch("src.audio.whisper")
     @patch("src.transcriber.whisper")
     @patch("os.path.exists")
-    def test_transcribe_progressive_output(self, mock_exists, mock_whisper):
+    def test_transcribe_progressive_output(self, mock_exists, mock_whisper, mock_audio_whisper):
         # Setup mocks
         mock_exists.return_value = True
         
@@ -29,28 +30,75 @@ class TestProgressiveOutput(unittest.TestCase):
         mock_whisper.load_model.return_value = mock_model
         
         # Mock audio load
-        mock_whisper.load_audio.return_value = [0] * 16000 # 1 sec
+        mock_audio_whisper.load_audio.return_value = [0] * 16000 # 1 sec
         
-        # Mock transcribe side effect to simulate verbose output
+        # Mock transcribe to return segments for the decoded window
         def simulate_transcribe(*args, **kwargs):
-            # Simulate Whisper verbose output
-            # Note: transcriber redirects stdout, so print here should be caught by ProgressCapture
-            print("[00:00.000 --> 00:02.000] Hello World")
-            print("[00:02.000 --> 00:04.000] This is a test")
-            return {"text": "Hello World\nThis is a test", "segments": []}
+            # Printing must not affect the callbacks any more
+            print("[00:00.000 --> 00:02.000] noise from another thread")
+            return {
+                "text": " Hello World This is a test",
+                "language": "en",
+                "segments": [
+                    {"start": 0.0, "end": 0.5, "text": " Hello World", "avg_logprob": -0.2},
+                    {"start": 0.5, "end": 1.0, "text": " This is a test", "avg_logprob": -0.3},
+                ],
+            }
             
         mock_model.transcribe.side_effect = simulate_transcribe
         
+        progress = []
+        segments = []
         # Run transcribe with text_callback
         result = self.transcriber.transcribe(
             "dummy.mp3", 
             model_name="tiny", 
-            text_callback=self.text_callback
+            text_callback=self.text_callback,
+            progress_callback=progress.append,
+            segment_callback=segments.append
         )
         
         # Verify
         expected_calls = ["Hello World", "This is a test"]
         self.assertEqual(self.captured_text, expected_calls)
+        self.assertEqual(progress, [0.5, 1.0])
+        self.assertEqual([(s["start"], s["end"], s["text"]) for s in segments],
+                         [(0.0, 0.5, "Hello World"), (0.5, 1.0, "This is a test")])
+        self.assertEqual(result["language"], "en")
+
+    @patch("src.audio.whisper")
+    @patch("src.transcriber.whisper")
+    @patch("os.path.exists")
+    def test_iter_segments_window_edges(self, mock_exists, mock_whisper, mock_audio_whisper):
+        mock_exists.return_value = True
+        mock_model = MagicMock()
+        mock_whisper.load_model.return_value = mock_model
+        # 40 sec -> two windows
+        mock_audio_whisper.load_audio.return_value = [0] * (16000 * 40)
+
+        windows = [
+            # The last segment touches the end of the 30s window, so it is decoded again
+            {"language": "ja", "segments": [
+                {"start": 0.0, "end": 20.0, "text": "前半", "avg_logprob": -0.1},
+                {"start": 20.0, "end": 29.8, "text": "途中で切れた", "avg_logprob": -0.9},
+            ]},
+            {"language": "ja", "segments": [
+                {"start": 0.0, "end": 12.0, "text": "続きの文", "avg_logprob": -0.2},
+                {"start": 12.0, "end": 20.0, "text": "最後", "avg_logprob": -0.2},
+            ]},
+        ]
+        mock_model.transcribe.side_effect = windows
+
+        events = list(self.transcriber.iter_segments("dummy.mp3", model_name="tiny"))
+
+        self.assertEqual([e.text for e in events], ["前半", "続きの文", "最後"])
+        # The second window starts where the cut segment started
+        self.assertEqual([(e.start, e.end) for e in events], [(0.0, 20.0), (20.0, 32.0), (32.0, 40.0)])
+        self.assertEqual(events[-1].progress, 1.0)
+        second_call = mock_model.transcribe.call_args_list[1]
+        self.assertEqual(len(second_call.args[0]), 16000 * 20)
+        self.assertEqual(second_call.kwargs["language"], "ja")
+        self.assertEqual(second_call.kwargs["initial_prompt"], "前半")
 
 if __name__ == "__main__":
     unittest.main()
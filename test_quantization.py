@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import torch
+from whisper.model import ModelDimensions, Whisper
+
+from src.model_pool import model_bytes
+from src.quantization import base_model_name, is_quantized, load_quantized_model, quantize_model
+
+
+def small_whisper():
+    # テスト用の小さなWhisper（重みはランダム）
+    dims = ModelDimensions(n_mels=80, n_audio_ctx=50, n_audio_state=64, n_audio_head=2, n_audio_layer=1,
+                           n_vocab=51865, n_text_ctx=16, n_text_state=64, n_text_head=2, n_text_layer=1)
+    torch.manual_seed(0)
+    return Whisper(dims).eval()
+
+
+class TestQuantization(unittest.TestCase):
+    def test_model_names(self):
+        self.assertTrue(is_quantized("small-int8"))
+        self.assertFalse(is_quantized("small"))
+        self.assertEqual(base_model_name("small-int8"), "small")
+        self.assertEqual(base_model_name("large"), "large")
+
+    def test_linear_layers_are_quantized(self):
+        model = small_whisper()
+        mel = torch.randn(1, 80, 100)
+        with torch.no_grad():
+            expected = model.encoder(mel)
+
+        quantized = quantize_model(model)
+        mlp = quantized.encoder.blocks[0].mlp[0]
+        self.assertEqual(type(mlp).__module__, "torch.ao.nn.quantized.dynamic.modules.linear")
+        with torch.no_grad():
+            actual = quantized.encoder(mel)
+        # int8 でも float32 とほぼ同じ出力になること
+        self.assertLess((actual - expected).abs().mean().item(), 0.05)
+        self.assertGreater(model_bytes(quantized), 0)
+
+    def test_quantized_model_is_cached_on_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch("src.quantization.whisper") as mock_whisper:
+                mock_whisper.load_model.side_effect = lambda name, device: small_whisper()
+                first = load_quantized_model("tiny-int8", model_dir=tmp)
+                second = load_quantized_model("tiny-int8", model_dir=tmp)
+
+            # float32 のモデルの読み込みと量子化は初回だけであること
+            mock_whisper.load_model.assert_called_once_with("tiny", device="cpu")
+            self.assertEqual(len([name for name in os.listdir(tmp) if name.endswith(".pt")]), 1)
+            mel = torch.randn(1, 80, 100)
+            with torch.no_grad():
+                torch.testing.assert_close(first.encoder(mel), second.encoder(mel))
+
+
+if __name__ == "__main__":
+    unittest.main()
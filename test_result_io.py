@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from src.result_io import (ResultWriter, build_result_data, export_segments, prune_results, read_segments,
+                           segments_path)
+
+
+def segment(i, start, end, text, **extra):
+    return dict({"id": i, "start": start, "end": end, "text": text}, **extra)
+
+
+class TestResultWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "out", "meeting.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_segments_are_on_disk_before_finalize(self):
+        writer = ResultWriter(self.output)
+        writer.add_segment(segment(0, 0.0, 1.5, "こんにちは"))
+        writer.add_segment(segment(1, 1.5, 3.0, "会議を始めます"))
+
+        # 確定前でも、書き出し済みのセグメントは .part から読めること
+        self.assertFalse(os.path.exists(self.output))
+        self.assertEqual([s["text"] for s in read_segments(writer.part_path)], ["こんにちは", "会議を始めます"])
+
+        writer.finalize(build_result_data("こんにちは\n会議を始めます"))
+        self.assertFalse(os.path.exists(writer.part_path))
+        self.assertEqual(writer.segments_path, segments_path(self.output))
+        self.assertEqual(len(list(read_segments(writer.segments_path))), 2)
+        with open(self.output, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["original"], "こんにちは\n会議を始めます")
+
+    def test_finalize_rewrites_with_final_segments(self):
+        writer = ResultWriter(self.output)
+        writer.add_segment(segment(0, 0.0, 1.0, "はい"))
+        final = [segment(0, 0.0, 1.0, "はい", speaker="SPEAKER_01")]
+        writer.finalize(build_result_data("はい"), final)
+
+        self.assertEqual(list(read_segments(writer.segments_path)), final)
+
+    def test_incomplete_last_line_is_skipped(self):
+        writer = ResultWriter(self.output)
+        writer.add_segment(segment(0, 0.0, 1.0, "最後まで書けた行"))
+        writer.close()
+        # 書き込み中に落ちた状態を再現します
+        with open(writer.part_path, "a", encoding="utf-8") as f:
+            f.write('{"id": 1, "start": 1.0, "te')
+
+        self.assertEqual([s["text"] for s in read_segments(writer.part_path)], ["最後まで書けた行"])
+
+
+class TestPruneResults(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_result(self, stem, age_days, size=10):
+        writer = ResultWriter(os.path.join(self.tmp.name, f"{stem}.json"))
+        writer.add_segment(segment(0, 0.0, 1.0, "あ" * size))
+        writer.finalize(build_result_data("あ" * size))
+        mtime = time.time() - age_days * 24 * 3600
+        for path in (writer.file_path, writer.segments_path):
+            os.utime(path, (mtime, mtime))
+
+    def test_old_results_are_removed_together(self):
+        self.write_result("old.v1_20260101_000000", age_days=10)
+        self.write_result("new_20260110_000000", age_days=1)
+        # 関係のないファイルは消さないこと
+        open(os.path.join(self.tmp.name, "notes.md"), "w").close()
+
+        self.assertEqual(prune_results(self.tmp.name, max_age_days=7), 1)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), [
+            "new_20260110_000000.json", "new_20260110_000000.segments.jsonl", "notes.md"])
+
+    def test_oldest_results_are_removed_over_size_limit(self):
+        for i in range(3):
+            self.write_result(f"r{i}", age_days=3 - i, size=1000)
+        size = sum(os.path.getsize(os.path.join(self.tmp.name, name)) for name in os.listdir(self.tmp.name))
+
+        prune_results(self.tmp.name, max_age_days=7, max_bytes=size * 2 // 3)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), [
+            "r1.json", "r1.segments.jsonl", "r2.json", "r2.segments.jsonl"])
+
+    def test_missing_directory(self):
+        self.assertEqual(prune_results(os.path.join(self.tmp.name, "none")), 0)
+
+
+class TestExportSegments(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.segments = [
+            segment(0, 0.0, 2.5, " おはようございます", speaker="SPEAKER_01"),
+            segment(1, 2.5, 3661.25, "議題に入ります", speaker="SPEAKER_00"),
+            segment(2, 3661.25, 3662.0, "", speaker="SPEAKER_00"),
+            segment(3, 3662.0, 3663.0, "了解です", speaker=None),
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def export(self, fmt, segments=None):
+        path = os.path.join(self.tmp.name, f"meeting.{fmt}")
+        export_segments(iter(segments or self.segments), path, fmt)
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_srt(self):
+        self.assertEqual(self.export("srt"), (
+            "1\n00:00:00,000 --> 00:00:02,500\nAさん: おはようございます\n\n"
+            "2\n00:00:02,500 --> 01:01:01,250\nBさん: 議題に入ります\n\n"
+            "3\n01:01:02,000 --> 01:01:03,000\n不明: 了解です\n\n"
+        ))
+
+    def test_vtt(self):
+        text = self.export("vtt")
+        self.assertTrue(text.startswith("WEBVTT\n\n00:00:00.000 --> 00:00:02.500\nAさん: おはようございます\n"))
+
+    def test_txt_without_speakers(self):
+        segments = [segment(0, 0.0, 1.0, "一行目"), segment(1, 1.0, 2.0, "二行目")]
+        self.assertEqual(self.export("txt", segments), "一行目\n二行目\n")
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_segments([], os.path.join(self.tmp.name, "meeting.docx"), "docx")
+
+
+if __name__ == "__main__":
+    unittest.main()
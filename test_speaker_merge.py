@@ -0,0 +1,48 @@
+import random
+import unittest
+
+from src.speaker_merge import assign_speakers
+from src.transcriber import Transcriber
+
+class TestSpeakerMerge(unittest.TestCase):
+    def test_matches_per_segment_scan(self):
+        # 1件ずつ全区間を走査する従来の方法と同じ話者になること
+        random.seed(0)
+        turns = []
+        t = 0.0
+        for _ in range(200):
+            length = random.uniform(0.5, 8.0)
+            start = max(0.0, t - random.uniform(0, 1.0))  # ときどき重なる
+            turns.append({"start": start, "end": start + length, "speaker": f"SPEAKER_0{random.randint(0, 3)}"})
+            t = start + length
+        segments = []
+        t = 0.0
+        while t < turns[-1]["end"] + 5:
+            length = random.uniform(0.3, 6.0)
+            segments.append({"start": t, "end": t + length})
+            t += length
+
+        transcriber = Transcriber()
+        assignments = assign_speakers(segments, turns)
+        for segment, assignment in zip(segments, assignments):
+            expected = transcriber._get_speaker_for_segment(segment["start"], segment["end"], turns)
+            self.assertEqual(assignment["speaker"], expected)
+
+    def test_overlap_fraction(self):
+        turns = [
+            {"start": 0.0, "end": 6.0, "speaker": "SPEAKER_00"},
+            {"start": 4.0, "end": 10.0, "speaker": "SPEAKER_01"},
+        ]
+        segments = [{"start": 0.0, "end": 4.0}, {"start": 2.0, "end": 8.0}, {"start": 12.0, "end": 13.0}]
+
+        a, b, c = assign_speakers(segments, turns)
+
+        self.assertEqual(a["speaker"], "SPEAKER_00")
+        self.assertEqual(a["overlap_fraction"], 0.0)
+        self.assertAlmostEqual(a["speaker_fraction"], 1.0)
+        # 4〜6秒の2秒間が重なっている（6秒のセグメントの1/3）
+        self.assertAlmostEqual(b["overlap_fraction"], 2.0 / 6.0)
+        self.assertIsNone(c["speaker"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src import cli
+from src.audio import DecodedAudio
+from src.stage_timer import StageTimer, current_rss
+from src.transcriber import Transcriber
+
+
+class TestStageTimer(unittest.TestCase):
+    def test_records_wall_cpu_and_memory(self):
+        timer = StageTimer()
+        with timer.stage("whisper", model="tiny"):
+            time.sleep(0.05)
+        with timer.stage("format"):
+            sum(i * i for i in range(200000))
+
+        whisper, fmt = timer.stages
+        self.assertEqual(whisper["stage"], "whisper")
+        self.assertEqual(whisper["model"], "tiny")
+        self.assertGreaterEqual(whisper["wall_seconds"], 0.05)
+        # sleep はCPUを使わないこと
+        self.assertLess(whisper["cpu_seconds"], whisper["wall_seconds"])
+        self.assertGreater(fmt["cpu_seconds"], 0)
+
+        data = timer.to_dict(audio_seconds=10.0)
+        self.assertAlmostEqual(data["rtf"], data["total_wall_seconds"] / 10.0)
+        self.assertTrue(timer.summary(10.0).startswith("RTF "))
+        self.assertIn("Whisper", timer.summary())
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "RSSの取得はLinuxで確認")
+    def test_peak_memory_during_stage(self):
+        timer = StageTimer()
+        with timer.stage("audio_decode"):
+            data = np.ones(64 * 1024 * 1024 // 8)
+            time.sleep(0.1)
+            del data
+
+        stage = timer.stages[0]
+        self.assertIsNotNone(current_rss())
+        # 一時的に確保した64MBがピークに現れること
+        self.assertGreater(stage["rss_delta_mb"], 48)
+
+    def test_stage_is_recorded_on_error(self):
+        timer = StageTimer()
+        with self.assertRaises(ValueError):
+            with timer.stage("diarization"):
+                raise ValueError("failed")
+        self.assertEqual(timer.stages[0]["stage"], "diarization")
+
+    def test_discard_replaces_repeated_stage(self):
+        timer = StageTimer()
+        with timer.stage("whisper"):
+            pass
+        with timer.stage("local_summary"):
+            pass
+        # 要約をやり直すときは前回の記録を消してから計測し、同じ段階が重複しないこと
+        timer.discard("local_summary")
+        with timer.stage("local_summary"):
+            pass
+        self.assertEqual([s["stage"] for s in timer.stages], ["whisper", "local_summary"])
+
+
+class TestTranscriptionTiming(unittest.TestCase):
+    @patch("src.transcriber.whisper")
+    def test_transcribe_reports_stages(self, mock_whisper):
+        mock_model = MagicMock()
+        mock_whisper.load_model.return_value = mock_model
+        mock_model.transcribe.return_value = {"language": "ja", "segments": [
+            {"start": 0.0, "end": 2.0, "text": "こんにちは。"},
+        ]}
+
+        audio = DecodedAudio.from_samples(np.zeros(16000 * 4, dtype=np.float32), "meeting.wav")
+        result = Transcriber().transcribe(audio, "tiny")
+
+        stages = [s["stage"] for s in result["timing"]["stages"]]
+        self.assertEqual(stages, ["audio_decode", "load_model", "whisper", "format"])
+        self.assertEqual(result["timing"]["audio_seconds"], 4.0)
+
+    @patch("src.transcriber.Transcriber")
+    def test_cli_writes_timing_next_to_result(self, mock_transcriber_cls):
+        def fake_transcribe(path, model_name, hf_token=None, timer=None, segment_callback=None):
+            with timer.stage("whisper"):
+                pass
+            return {"text": "今日は会議です。", "timing": {"audio_seconds": 60.0}}
+        mock_transcriber_cls.return_value.transcribe.side_effect = fake_transcribe
+
+        with tempfile.TemporaryDirectory() as tmp:
+            open(os.path.join(tmp, "a.mp3"), "w").close()
+            out = io.StringIO()
+            args = cli.build_parser().parse_args([os.path.join(tmp, "a.mp3"), "--simple", "--no-cache"])
+            self.assertEqual(cli.run(args, out=out), 0)
+
+            with open(os.path.join(tmp, "a.timing.json"), encoding="utf-8") as f:
+                timing = json.load(f)
+            self.assertEqual([s["stage"] for s in timing["stages"]], ["whisper", "simple_summary"])
+            self.assertEqual(timing["audio_seconds"], 60.0)
+            self.assertIn("timing", json.loads(out.getvalue()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 
 import unittest
+
+import numpy as np
 from src.summarizer import SimpleSummarizer
 
 class TestSimpleSummarizer(unittest.TestCase):
@@ -56,6 +58,65 @@ class TestSimpleSummarizer(unittest.TestCase):
         # 短い文が除去されていることだけ確認
         self.assertNotIn("無視", summary)
 
+    def test_textrank_matches_dense_power_iteration(self):
+        """疎行列でのPageRankが、密行列で素朴に計算した結果と一致するかテスト"""
+        sentences = [
+            "プロジェクトの進捗を確認します。",
+            "プロジェクトの予算を確認します。",
+            "来週の会議で予算を議論します。",
+            "音声認識の精度が課題です。",
+            "精度の改善を来週までに検討します。",
+        ]
+        rows, cols, weights = self.summarizer._build_similarity_graph(sentences)
+        scores = self.summarizer._textrank(len(sentences), rows, cols, weights)
+
+        n = len(sentences)
+        dense = np.zeros((n, n))
+        dense[rows, cols] = weights
+        out = dense.sum(axis=1)
+        expected = np.ones(n)
+        for _ in range(200):
+            incoming = np.array([sum(expected[j] * dense[j][i] / out[j] for j in range(n) if out[j] > 0) for i in range(n)])
+            expected = 0.15 + 0.85 * incoming
+
+        np.testing.assert_allclose(scores, expected, atol=1e-5)
+
+    def test_similarity_graph_matches_pairwise(self):
+        """転置インデックスで絞り込んだグラフが、全組み合わせを比較した結果と一致するかテスト"""
+        sentences = [
+            "プロジェクトの進捗を確認します。",
+            "プロジェクトの予算を確認します。",
+            "来週の会議で予算を議論します。",
+            "音声認識の精度が課題です。",
+            "精度の改善を来週までに検討します。",
+            "ABCの件",
+            "重要なポイントはUIデザインです。",
+            "UIデザインのポイントを再確認。",
+        ]
+        rows, cols, weights = self.summarizer._build_similarity_graph(sentences)
+        got = {(int(i), int(j)): w for i, j, w in zip(rows, cols, weights) if i < j}
+
+        expected = {}
+        for i in range(len(sentences)):
+            for j in range(i + 1, len(sentences)):
+                sim = self.summarizer._calculate_similarity(sentences[i], sentences[j])
+                if sim > 0.2:
+                    expected[(i, j)] = sim
+
+        self.assertEqual(got.keys(), expected.keys())
+        for key, sim in expected.items():
+            self.assertAlmostEqual(got[key], sim)
+
+    def test_mmr_select_skips_duplicates(self):
+        """選択済みの文と類似度が高い文はMMRで後回しになるかテスト"""
+        scores = np.array([1.0, 0.99, 0.5])
+        # 0と1はほぼ同じ内容、2は無関係
+        rows = np.array([0, 1])
+        cols = np.array([1, 0])
+        weights = np.array([0.9, 0.9])
+        selected = self.summarizer._mmr_select(scores, rows, cols, weights, target_count=2)
+        self.assertEqual(selected, [0, 2])
+
     def test_summarize_empty(self):
         self.assertEqual(self.summarizer.summarize(""), "")
 
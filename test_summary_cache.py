@@ -0,0 +1,94 @@
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src.llm_client_pool import LLMClientPool
+from src.llm_summarizer import LocalLLMSummarizer
+from src.result_io import build_result_data
+from src.summary_cache import SummaryCache
+from src.summary_orchestrator import SummaryBackend, SummaryOrchestrator
+
+
+def stream_chunks(text):
+    return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])])
+
+
+class TestSummaryCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SummaryCache(cache_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_summarizer(self, client, model="llama3"):
+        pool = LLMClientPool(factory=lambda base_url, api_key: client)
+        return LocalLLMSummarizer(model=model, pool=pool, cache=self.cache)
+
+    def test_key_depends_on_transcript_model_prompt_and_params(self):
+        key = self.cache.key("本文", "local_llm", "llama3", "要約:", {"chunk_tokens": 3000})
+        self.assertEqual(key, self.cache.key("本文", "local_llm", "llama3", "要約:", {"chunk_tokens": 3000}))
+        self.assertNotEqual(key, self.cache.key("本文2", "local_llm", "llama3", "要約:", {"chunk_tokens": 3000}))
+        self.assertNotEqual(key, self.cache.key("本文", "local_llm", "qwen2", "要約:", {"chunk_tokens": 3000}))
+        self.assertNotEqual(key, self.cache.key("本文", "local_llm", "llama3", "箇条書き:", {"chunk_tokens": 3000}))
+        self.assertNotEqual(key, self.cache.key("本文", "local_llm", "llama3", "要約:", {"chunk_tokens": 1000}))
+        self.assertNotEqual(key, self.cache.key("本文", "gemini", "llama3", "要約:", {"chunk_tokens": 3000}))
+
+    def test_hit_replays_without_calling_llm(self):
+        client = MagicMock()
+        client.chat.completions.create.side_effect = lambda **kwargs: stream_chunks("要約です")
+
+        first = self.make_summarizer(client)
+        self.assertEqual(first.summarize("会議の文字起こし"), "要約です")
+        self.assertEqual(first.cache_status, "miss")
+
+        second = self.make_summarizer(client)
+        streamed = []
+        self.assertEqual(second.summarize("会議の文字起こし", stream_callback=streamed.append), "要約です")
+        self.assertEqual(second.cache_status, "hit")
+        # 保存しておいた要約を一度に画面へ流すこと
+        self.assertEqual(streamed, ["要約です"])
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+
+        # モデルが違えば要約し直す
+        other = self.make_summarizer(client, model="qwen2")
+        other.summarize("会議の文字起こし")
+        self.assertEqual(other.cache_status, "miss")
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        client = MagicMock()
+        client.chat.completions.create.side_effect = ValueError("bad request")
+        summarizer = self.make_summarizer(client)
+
+        with self.assertRaises(ValueError):
+            summarizer.summarize("本文")
+        self.assertEqual(self.cache.total_bytes(), 0)
+
+    def test_cache_is_size_bounded(self):
+        cache = SummaryCache(cache_dir=self.tmp.name, max_bytes=1500)
+        for i in range(10):
+            cache.put_summary(cache.key(f"本文{i}", "local_llm", "llama3", ""), "あ" * 100)
+        self.assertLessEqual(cache.total_bytes(), 1500)
+        self.assertIsNotNone(cache.get_summary(cache.key("本文9", "local_llm", "llama3", "")))
+        self.assertIsNone(cache.get_summary(cache.key("本文0", "local_llm", "llama3", "")))
+
+    def test_cache_status_is_recorded_in_results(self):
+        backends = [
+            SummaryBackend("ローカルLLM", "local_summary", lambda text, stream_callback: ("要約", "hit")),
+            SummaryBackend("簡易要約", "simple_summary", lambda text, stream_callback: "簡易"),
+        ]
+        results = SummaryOrchestrator(backends).run("本文")
+
+        self.assertEqual(results["ローカルLLM"]["summary"], "要約")
+        self.assertEqual(results["ローカルLLM"]["cache"], "hit")
+        self.assertIsNone(results["簡易要約"]["cache"])
+
+        data = build_result_data("本文", local_summary="要約", summary_cache={"local_summary": "hit"})
+        self.assertEqual(data["summary_cache"], {"local_summary": "hit"})
+        self.assertNotIn("summary_cache", build_result_data("本文"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import threading
+import time
+import unittest
+
+from src.stage_timer import StageTimer
+from src.summary_orchestrator import SummaryBackend, SummaryOrchestrator, latency_summary
+
+
+def streaming_backend(name, chunks, delay=0.0):
+    def summarize(text, stream_callback):
+        result = ""
+        for chunk in chunks:
+            time.sleep(delay)
+            result += chunk
+            stream_callback(chunk)
+        return result
+    return SummaryBackend(name, f"{name}_summary", summarize)
+
+
+class TestSummaryOrchestrator(unittest.TestCase):
+    def test_backends_run_concurrently_and_stream_separately(self):
+        started = threading.Barrier(3, timeout=2)
+
+        def waiting_backend(name):
+            def summarize(text, stream_callback):
+                # 3つとも同時に始まっていなければ BrokenBarrierError になる
+                started.wait()
+                stream_callback(f"{name}:")
+                stream_callback(text)
+                return f"{name}:{text}"
+            return SummaryBackend(name, f"{name}_summary", summarize)
+
+        backends = [waiting_backend(name) for name in ("simple", "local", "gemini")]
+        streamed = {}
+        lock = threading.Lock()
+
+        def stream_callback(name, chunk):
+            with lock:
+                streamed[name] = streamed.get(name, "") + chunk
+
+        results = SummaryOrchestrator(backends).run("本文", stream_callback=stream_callback)
+
+        self.assertEqual(list(results), ["simple", "local", "gemini"])
+        for name in ("simple", "local", "gemini"):
+            self.assertEqual(results[name]["status"], "done")
+            self.assertEqual(results[name]["summary"], f"{name}:本文")
+            self.assertEqual(streamed[name], f"{name}:本文")
+
+    def test_failure_and_slow_backend_do_not_block_others(self):
+        def broken(text, stream_callback):
+            raise RuntimeError("connection refused")
+
+        def failing_summarizer(text, stream_callback):
+            # 途中まで流してから失敗しても、失敗として扱われること
+            stream_callback("途中")
+            raise TimeoutError("timeout")
+
+        backends = [
+            streaming_backend("slow", ["a", "b"], delay=0.2),
+            SummaryBackend("broken", "broken_summary", broken),
+            SummaryBackend("error", "error_summary", failing_summarizer),
+            streaming_backend("fast", ["x"]),
+        ]
+        finished = []
+        results = SummaryOrchestrator(backends, max_workers=4).run(
+            "本文", done_callback=lambda name, result: finished.append(name))
+
+        # 速い要約や失敗した要約は、遅い要約を待たずに返ること
+        self.assertEqual(finished[-1], "slow")
+        self.assertEqual(results["slow"]["summary"], "ab")
+        self.assertEqual(results["broken"]["status"], "failed")
+        self.assertEqual(results["broken"]["error"], "connection refused")
+        self.assertEqual(results["error"]["status"], "failed")
+        self.assertEqual(results["error"]["error"], "timeout")
+        self.assertEqual(results["fast"]["status"], "done")
+
+    def test_records_first_output_and_total_latency(self):
+        backends = [
+            streaming_backend("local", ["first", "second"], delay=0.1),
+            SummaryBackend("simple", "simple_summary", lambda text, stream_callback: "要約"),
+        ]
+        timer = StageTimer()
+        results = SummaryOrchestrator(backends, max_workers=1).run("本文", timer=timer)
+
+        local = results["local"]
+        self.assertGreaterEqual(local["ttft_seconds"], 0.1)
+        self.assertGreaterEqual(local["total_seconds"], local["ttft_seconds"] + 0.1)
+        # ストリームしない要約は、結果が返ったときが最初の出力
+        self.assertEqual(results["simple"]["ttft_seconds"], results["simple"]["total_seconds"])
+
+        stages = {stage["stage"]: stage for stage in timer.to_dict()["stages"]}
+        self.assertEqual(set(stages), {"local_summary", "simple_summary"})
+        self.assertEqual(stages["local_summary"]["ttft_seconds"], local["ttft_seconds"])
+        self.assertEqual(stages["local_summary"]["status"], "done")
+
+        summary = latency_summary(backends, results)
+        self.assertIn("初回", summary)
+        self.assertIn("簡易要約", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
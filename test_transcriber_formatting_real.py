@@ -13,9 +13,10 @@ class TestTranscriberFormatting(unittest.TestCase):
     def setUp(self):
         self.transcriber = Transcriber()
         
+    @patch("src.audio.whisper")
     @patch("src.transcriber.whisper")
     @patch("os.path.exists")
-    def test_transcribe_formatting_no_diarization(self, mock_exists, mock_whisper):
+    def test_transcribe_formatting_no_diarization(self, mock_exists, mock_whisper, mock_audio_whisper):
         # モックのセットアップ
         mock_exists.return_value = True
         
@@ -24,7 +25,7 @@ class TestTranscriberFormatting(unittest.TestCase):
         mock_whisper.load_model.return_value = mock_model
         
         # 音声ロードのモック（長さが必要なだけ）
-        mock_whisper.load_audio.return_value = [0] * 16000 # 1 sec
+        mock_audio_whisper.load_audio.return_value = [0] * 16000 # 1 sec
         
 
         # 文字起こし結果のモック - 句読点なし
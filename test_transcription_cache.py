@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src import transcription_cache
+from src.audio import DecodedAudio
+from src.transcriber import Transcriber
+from src.transcription_cache import TranscriptionCache, hash_file
+
+
+class TestTranscriptionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_file(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_partial_hash_of_large_file(self):
+        data = bytearray(os.urandom(1024 * 1024))
+        with patch.object(transcription_cache, "FULL_HASH_MAX_BYTES", 64 * 1024), \
+                patch.object(transcription_cache, "SAMPLE_BLOCK_BYTES", 4096):
+            path = self.write_file("a.wav", data)
+            first = hash_file(path)
+            copy = self.write_file("copy.wav", data)
+            mtime_ns = os.stat(path).st_mtime_ns
+            os.utime(copy, ns=(mtime_ns, mtime_ns))
+            self.assertEqual(first, hash_file(copy))
+            # 先頭や末尾が変わればハッシュも変わること
+            data[-1] ^= 0xFF
+            changed = self.write_file("b.wav", data)
+            os.utime(changed, ns=(mtime_ns, mtime_ns))
+            self.assertNotEqual(first, hash_file(changed))
+
+            # 読まなかった部分だけを編集した同じ大きさのファイルも、更新時刻が変われば別のキーになること
+            data[-1] ^= 0xFF
+            data[4096 + 100] ^= 0xFF
+            edited = self.write_file("edited.wav", data)
+            os.utime(edited, ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+            self.assertNotEqual(first, hash_file(edited))
+
+    def test_roundtrip_keyed_by_model_and_options(self):
+        cache = TranscriptionCache(self.cache_dir)
+        key = cache.audio_key(DecodedAudio(self.write_file("a.wav", b"audio")))
+        cache.put_transcription(key, "small", {"vad_filter": False}, {"segments": [{"text": "こんにちは"}], "language": "ja"})
+
+        self.assertEqual(cache.get_transcription(key, "small", {"vad_filter": False})["language"], "ja")
+        self.assertIsNone(cache.get_transcription(key, "tiny", {"vad_filter": False}))
+        self.assertIsNone(cache.get_transcription(key, "small", {"vad_filter": True}))
+
+        cache.put_turns(key, [{"start": 0.0, "end": 1.0, "speaker": "SPEAKER_00"}])
+        self.assertEqual(cache.get_turns(key)[0]["speaker"], "SPEAKER_00")
+
+    def test_lru_eviction(self):
+        cache = TranscriptionCache(self.cache_dir, max_bytes=10 ** 9)
+        payload = {"segments": [{"text": "x" * 1000}]}
+        for i, name in enumerate(["old", "middle", "new"]):
+            cache.put_transcription(name, "small", {}, payload)
+            for entry in os.listdir(self.cache_dir):
+                if entry.startswith(name + "-"):
+                    os.utime(os.path.join(self.cache_dir, entry), (1000 + i, 1000 + i))
+        # 読み込んだエントリーは最近使ったものとして扱われること
+        cache.get_transcription("old", "small", {})
+
+        cache.max_bytes = cache.total_bytes() - 1
+        cache.evict()
+
+        remaining = sorted(name.split("-")[0] for name in os.listdir(self.cache_dir))
+        self.assertEqual(remaining, ["new", "old"])
+
+    def test_invalidate(self):
+        cache = TranscriptionCache(self.cache_dir)
+        path = self.write_file("a.wav", b"audio")
+        key = cache.audio_key(DecodedAudio(path))
+        cache.put_transcription(key, "small", {}, {"segments": []})
+        cache.put_turns(key, [])
+        cache.put_transcription("other", "small", {}, {"segments": []})
+
+        self.assertEqual(cache.invalidate(path), 2)
+        self.assertIsNone(cache.get_transcription(key, "small", {}))
+        self.assertEqual(cache.invalidate(), 1)
+
+    @patch("src.audio.whisper")
+    @patch("src.transcriber.whisper")
+    def test_repeat_run_skips_decoding(self, mock_whisper, mock_audio_whisper):
+        mock_model = MagicMock()
+        mock_whisper.load_model.return_value = mock_model
+        mock_audio_whisper.load_audio.return_value = np.zeros(16000 * 4, dtype=np.float32)
+        mock_model.transcribe.return_value = {"language": "ja", "segments": [
+            {"start": 0.0, "end": 2.0, "text": "こんにちは。"},
+        ]}
+        path = self.write_file("meeting.wav", b"RIFF")
+
+        transcriber = Transcriber(cache=TranscriptionCache(self.cache_dir))
+        first = transcriber.transcribe(path, "tiny")
+
+        texts = []
+        second = transcriber.transcribe(path, "tiny", text_callback=texts.append)
+
+        self.assertEqual(mock_model.transcribe.call_count, 1)
+        self.assertEqual(mock_audio_whisper.load_audio.call_count, 1)
+        self.assertEqual(second["text"], first["text"])
+        self.assertEqual(texts, ["こんにちは。"])
+
+        # 別のモデルではキャッシュを使わないこと
+        transcriber.transcribe(path, "small")
+        self.assertEqual(mock_model.transcribe.call_count, 2)
+
+        # 言語やデコードの設定が違う場合もキャッシュを使わないこと
+        transcriber.transcribe(path, "tiny", language="en")
+        transcriber.transcribe(path, "tiny", beam_size=5)
+        self.assertEqual(mock_model.transcribe.call_count, 4)
+        self.assertEqual(mock_model.transcribe.call_args.kwargs["beam_size"], 5)
+        transcriber.transcribe(path, "tiny", beam_size=5)
+        self.assertEqual(mock_model.transcribe.call_count, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import threading
+import unittest
+
+from src.ui_updates import UIUpdateCoalescer, append_to_textbox
+
+
+class FakeWidget:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func, *args):
+        self.scheduled.append((ms, func, args))
+
+
+class FakeTextbox:
+    def __init__(self, view_end=1.0):
+        self.text = ""
+        self.view_end = view_end
+        self.seen = []
+
+    def yview(self):
+        return (0.0, self.view_end)
+
+    def insert(self, index, text):
+        self.text += text
+
+    def see(self, index):
+        self.seen.append(index)
+
+
+class TestUIUpdateCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.widget = FakeWidget()
+        self.coalescer = UIUpdateCoalescer(self.widget, max_chars=1000)
+        self.events = []
+        self.coalescer.on_append("text", lambda text: self.events.append(("text", text)))
+        self.coalescer.on_set("progress", lambda value: self.events.append(("progress", value)))
+
+    def test_coalesces_appends_and_keeps_last_value(self):
+        for i in range(100):
+            self.coalescer.append("text", f"{i}\n")
+            self.coalescer.set("progress", i / 100)
+        self.coalescer.flush()
+
+        # 100件のセグメントを1回の挿入で、進捗は最後の値だけを反映すること
+        self.assertEqual(self.events, [
+            ("text", "".join(f"{i}\n" for i in range(100))),
+            ("progress", 0.99),
+        ])
+
+    def test_calls_keep_order_with_appends(self):
+        self.coalescer.append("text", "前のファイル")
+        self.coalescer.call(self.events.append, ("clear", None))
+        self.coalescer.append("text", "次のファイル")
+        self.coalescer.flush()
+
+        self.assertEqual(self.events, [("text", "前のファイル"), ("clear", None), ("text", "次のファイル")])
+
+    def test_sets_before_call_are_applied_first(self):
+        # 最後の進捗の後に完了の処理が届いた場合、完了の表示が進捗で上書きされないこと
+        self.coalescer.set("progress", 0.5)
+        self.coalescer.set("progress", 1.0)
+        self.coalescer.call(self.events.append, ("complete", None))
+        self.coalescer.set("progress", 0.0)
+        self.coalescer.flush()
+
+        self.assertEqual(self.events, [("progress", 1.0), ("complete", None), ("progress", 0.0)])
+
+    def test_large_text_is_split_across_flushes(self):
+        self.coalescer.append("text", "あ" * 2500)
+        self.coalescer.call(self.events.append, ("done", None))
+
+        self.coalescer.flush()
+        self.assertEqual(self.events, [("text", "あ" * 1000)])
+        self.assertTrue(self.coalescer.pending)
+
+        self.coalescer.flush()
+        self.coalescer.flush()
+        self.assertEqual([len(text) for kind, text in self.events if kind == "text"], [1000, 1000, 500])
+        self.assertEqual(self.events[-1], ("done", None))
+        self.assertFalse(self.coalescer.pending)
+
+    def test_updates_from_worker_threads(self):
+        def worker():
+            for _ in range(500):
+                self.coalescer.append("text", "x")
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        while self.coalescer.pending:
+            self.coalescer.flush()
+
+        self.assertEqual(sum(len(text) for _, text in self.events), 2000)
+        self.assertEqual(len(self.events), 2)
+
+    def test_tick_reschedules_itself(self):
+        self.coalescer.start()
+        ms, tick, _ = self.widget.scheduled[-1]
+        self.coalescer.append("text", "a")
+        tick()
+
+        self.assertEqual(self.events, [("text", "a")])
+        self.assertEqual(len(self.widget.scheduled), 2)
+        self.assertEqual(ms, self.coalescer.interval_ms)
+
+
+class TestAppendToTextbox(unittest.TestCase):
+    def test_scrolls_only_when_at_bottom(self):
+        textbox = FakeTextbox(view_end=1.0)
+        append_to_textbox(textbox, "a")
+        self.assertEqual(textbox.seen, ["end"])
+
+        # 上の方を読んでいるときは表示位置を動かさないこと
+        textbox = FakeTextbox(view_end=0.5)
+        append_to_textbox(textbox, "a")
+        self.assertEqual(textbox.text, "a")
+        self.assertEqual(textbox.seen, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src.audio import DecodedAudio, SAMPLE_RATE
+from src.transcriber import Transcriber
+from src.vad import SpeechTimeline, detect_speech
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+class TestSpeechTimeline(unittest.TestCase):
+    def test_compact_and_remap(self):
+        samples = np.arange(10 * SAMPLE_RATE, dtype=np.float32)
+        timeline = SpeechTimeline([(2 * SAMPLE_RATE, 4 * SAMPLE_RATE), (7 * SAMPLE_RATE, 8 * SAMPLE_RATE)], len(samples))
+
+        compacted = timeline.compact(samples)
+        self.assertEqual(len(compacted), 3 * SAMPLE_RATE)
+        self.assertEqual(compacted[2 * SAMPLE_RATE], 7 * SAMPLE_RATE)
+        self.assertEqual(timeline.speech_seconds, 3.0)
+        self.assertEqual(timeline.skipped_seconds, 7.0)
+
+        self.assertEqual(timeline.to_original(0.5), 2.5)
+        self.assertEqual(timeline.to_original(2.5), 7.5)
+        # つなぎ目ちょうどの時刻は、開始なら後ろの区間、終了なら前の区間に対応すること
+        self.assertEqual(timeline.to_original(2.0), 7.0)
+        self.assertEqual(timeline.to_original(2.0, is_end=True), 4.0)
+
+    def test_vad_is_faster_than_real_time(self):
+        import time
+        samples = np.concatenate([tone(30), silence(30)] * 10)
+        start = time.perf_counter()
+        detect_speech(samples)
+        elapsed = time.perf_counter() - start
+        # 10分の音声を数秒以内に処理できること（実際には数十ミリ秒程度）
+        self.assertLess(elapsed, 5.0)
+
+
+class TestVadFilter(unittest.TestCase):
+    @patch("src.transcriber.whisper")
+    def test_only_speech_is_transcribed(self, mock_whisper):
+        samples = np.concatenate([silence(20), tone(5), silence(40), tone(5), silence(10)])
+        mock_model = MagicMock()
+        mock_whisper.load_model.return_value = mock_model
+        # 渡された音声（発話だけをつなげたもの）の長さを記録し、各発話に1つずつセグメントを返す
+        received = []
+
+        def fake_transcribe(chunk, **kwargs):
+            received.append(len(chunk))
+            return {"language": "ja", "segments": [
+                {"start": 0.2, "end": 5.2, "text": "一つ目。"},
+                {"start": 5.6, "end": 10.6, "text": "二つ目。"},
+            ]}
+        mock_model.transcribe.side_effect = fake_transcribe
+
+        transcriber = Transcriber(vad_filter=True)
+        result = transcriber.transcribe(DecodedAudio.from_samples(samples, "meeting.wav"), "tiny")
+
+        self.assertEqual(len(received), 1)
+        self.assertLess(received[0], 12 * SAMPLE_RATE)
+        self.assertAlmostEqual(result["vad"]["skipped_seconds"], 80 - result["vad"]["speech_seconds"])
+        self.assertGreater(result["vad"]["skipped_seconds"], 65)
+
+        # タイムスタンプは元の音声の時刻に戻っていること
+        first, second = result["segments"]
+        self.assertAlmostEqual(first["start"], 20.0, delta=0.3)
+        self.assertAlmostEqual(second["start"], 65.0, delta=0.5)
+        self.assertLessEqual(second["end"], 70.5)
+
+    @patch("src.transcriber.whisper")
+    def test_all_silence_skips_decoding(self, mock_whisper):
+        mock_model = MagicMock()
+        mock_whisper.load_model.return_value = mock_model
+
+        transcriber = Transcriber(vad_filter=True)
+        result = transcriber.transcribe(DecodedAudio.from_samples(silence(10), "quiet.wav"), "tiny")
+
+        mock_model.transcribe.assert_not_called()
+        self.assertEqual(result["segments"], [])
+        self.assertEqual(result["vad"]["skipped_seconds"], 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()